@@ -1,13 +1,42 @@
+"""Cache backends and helpers."""
+
+from __future__ import annotations
+
 from hashlib import blake2b
+from math import inf
 from pickle import UnpicklingError, dumps, loads
-from secrets import compare_digest
-from typing import Any, Tuple
+from secrets import compare_digest, token_hex
+from time import sleep, time
+from typing import (
+    TYPE_CHECKING, Any, Callable, Optional, Sequence, Tuple, TypeVar, Union
+)
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.cache.backends.memcached import PyLibMCCache
 from django.core.cache.backends.redis import (
     RedisCache, RedisCacheClient, RedisSerializer
 )
+from django.utils import timezone as tz
+
+if TYPE_CHECKING:  # pragma: no cover
+    from datetime import datetime  # isort:skip
+
+#: The number of seconds an expired value may be served
+#: while another worker is computing its replacement.
+STALE_TIMEOUT = 60
+
+#: The maximum number of seconds a value can take to compute
+#: before another worker is allowed to compute it as well.
+LOCK_TIMEOUT = 30
+
+_T = TypeVar('_T')
+
+_Timeout = Union[int, None, Callable[[Any], Optional[int]]]
+
+_POLLS = 10
+
+_POLL_INTERVAL = 0.05
 
 
 def _sign_data(data: bytes) -> bytes:
@@ -74,4 +103,108 @@ class SignedPyLibMCCache(PyLibMCCache):
         self._class = _SignedMCClient
 
 
-__all__ = ['SignedRedisCache', 'SignedPyLibMCCache']
+def tag_versions(*tags: str) -> str:
+    """
+    Get the current versions of the given tags.
+
+    The versions change whenever one of the
+    tags is passed to :func:`invalidate_tags`.
+
+    :param tags: The names of the tags.
+
+    :return: The versions of the tags, joined with dots.
+    """
+    keys = [f'tag.{tag}' for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # another worker may have created the tag first
+            cache.add(key, token_hex(4), None)
+            versions[key] = cache.get(key, '')
+    return '.'.join(versions[key] for key in keys)
+
+
+def invalidate_tags(*tags: str):
+    """
+    Invalidate every cached value that depends on the given tags.
+
+    The values themselves are left to expire, since
+    their keys are derived from the versions of the tags.
+
+    :param tags: The names of the tags.
+    """
+    cache.delete_many([f'tag.{tag}' for tag in tags])
+
+
+def timeout_until(date: Optional[datetime], default: int) -> int:
+    """
+    Get the number of seconds a value can be cached for until a date.
+
+    :param date: The date the value will change, if it's known.
+    :param default: The maximum number of seconds.
+
+    :return: The seconds until the date, capped to the default.
+    """
+    if date is None:
+        return default
+    remaining = (date - tz.now()).total_seconds()
+    return max(min(int(remaining) + 1, default), 1)
+
+
+def get_or_compute(key: str, func: Callable[[], _T],
+                   timeout: _Timeout = 300,
+                   tags: Sequence[str] = ()) -> _T:
+    """
+    Get a value from the cache, computing it only when it's needed.
+
+    Unlike :meth:`cache.get_or_set() <django.core.cache.cache.get_or_set>`,
+    the value is computed by calling ``func`` after the cache is checked,
+    and only one worker at a time computes the value of a key.
+    Once the timeout has passed, the other workers keep getting
+    the expired value for up to :const:`STALE_TIMEOUT` seconds,
+    while a key that is missing altogether makes them wait
+    up to half a second for the value instead.
+
+    The value is also invalidated when one of its
+    tags is passed to :func:`invalidate_tags`.
+
+    :param key: The cache key.
+    :param func: A function that computes the value.
+    :param timeout: The number of seconds the value is fresh for,
+                    ``None`` to keep it until it's deleted, or a
+                    function that gets it from the computed value.
+    :param tags: The tags the value depends on.
+
+    :return: The cached or computed value.
+    """
+    if tags:
+        key = f'{key}.{tag_versions(*tags)}'
+    entry = cache.get(key)
+    if entry is not None and entry[1] > time():
+        return entry[0]
+    lock = key + '.lock'
+    if not (locked := cache.add(lock, 1, LOCK_TIMEOUT)):
+        if entry is not None:
+            return entry[0]
+        for _ in range(_POLLS):
+            sleep(_POLL_INTERVAL)
+            if (entry := cache.get(key)) is not None:
+                return entry[0]
+    try:
+        value = func()
+        seconds = timeout(value) if callable(timeout) else timeout
+        if seconds is None:
+            cache.set(key, (value, inf), None)
+        else:
+            cache.set(key, (value, time() + seconds), seconds + STALE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock)
+    return value
+
+
+__all__ = [
+    'STALE_TIMEOUT', 'LOCK_TIMEOUT', 'get_or_compute',
+    'invalidate_tags', 'tag_versions', 'timeout_until',
+    'SignedRedisCache', 'SignedPyLibMCCache'
+]
@@ -0,0 +1,71 @@
+"""
+Entity tags derived from stable data.
+
+The tags only depend on the arguments and the version of the
+app, so every worker process generates the same tag for the
+same resource and conditional requests can be answered with
+:status:`304` responses without rendering anything.
+"""
+
+from __future__ import annotations
+
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Any
+
+from django.db.models import Count, Max, Sum
+
+from . import __version__
+
+if TYPE_CHECKING:  # pragma: no cover
+    from django.db.models.query import QuerySet  # isort:skip
+
+#: The version of the tags. Increase this when
+#: the responses change without a new release.
+ETAG_VERSION = 1
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """
+    Create an :header:`ETag` from the given values.
+
+    :param parts: The values the resource depends on.
+    :param weak: Whether the tag should be weak.
+
+    :return: The tag, including the quotes.
+    """
+    dgst = blake2b(f'{__version__}:{ETAG_VERSION}'.encode(), digest_size=16)
+    for part in parts:
+        dgst.update(b'\x1f' + str(part).encode())
+    tag = f'"{dgst.hexdigest()}"'
+    return 'W/' + tag if weak else tag
+
+
+def queryset_etag(queryset: QuerySet, *parts: Any,
+                  fields: tuple = ('modified',),
+                  totals: tuple = ()) -> str:
+    """
+    Create a weak :header:`ETag` from the rows of a queryset.
+
+    The tag depends on the number of rows and the latest
+    value of each of the fields, so it changes whenever a
+    row is added, removed, or saved.
+
+    :param queryset: The queryset of the resource.
+    :param parts: Other values the resource depends on.
+    :param fields: The date fields of the rows.
+    :param totals: The numeric fields that are summed,
+                   for values that change without a save.
+
+    :return: The weak tag, including the quotes.
+    """
+    aggregates = {f'etag_{i}': Max(f) for i, f in enumerate(fields)}
+    aggregates.update(
+        (f'etag_total_{i}', Sum(f)) for i, f in enumerate(totals)
+    )
+    values = queryset.order_by().aggregate(
+        etag_count=Count('pk', distinct=True), **aggregates
+    )
+    return make_etag(*parts, *sorted(values.items()), weak=True)
+
+
+__all__ = ['ETAG_VERSION', 'make_etag', 'queryset_etag']
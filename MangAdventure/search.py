@@ -4,8 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, List, NamedTuple, Tuple
 
-from django.db.models import Count, Max, Q, Sum
-from django.utils import timezone as tz
+from django.db.models import F, Q
 
 from reader.models import Series
 
@@ -110,13 +109,12 @@ def query(params: _SearchParams) -> QuerySet:
     """
     if not params:
         return Series.objects.none()
-    q = Q(chapters__published__lte=tz.now())
     return Series.objects.annotate(  # type: ignore
-        chapter_count=Count('chapters', filter=q),
-        latest_upload=Max('chapters__published', filter=q),
-        views=Sum('chapters__views', distinct=True)
+        chapter_count=F('stats__chapter_count'),
+        latest_upload=F('stats__latest_upload'),
+        views=F('stats__total_views')
     ).complex_filter(
-        qsfilter(params) & Q(chapter_count__gt=0)
+        qsfilter(params) & Q(stats__chapter_count__gt=0)
     ).defer(
         'licensed', 'manager', 'created', 'modified'
     ).distinct()
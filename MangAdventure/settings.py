@@ -276,6 +276,14 @@ MEDIA_URL = '/media/'
 #: See :setting:`MEDIA_ROOT`.
 MEDIA_ROOT = BASE_DIR / 'media'
 
+#: Internal URL prefix of the files in :const:`ARCHIVE_ROOT`,
+#: which is only used by :header:`X-Accel-Redirect`.
+ARCHIVE_URL = '/archives/'
+
+#: Absolute filesystem path to the directory that will hold the
+#: prebuilt chapter archives. It must not be served publicly.
+ARCHIVE_ROOT = BASE_DIR / 'archives'
+
 ##############################
 #    Internationalization    #
 ##############################
@@ -599,13 +607,26 @@ CONFIG = {
     'FONT_NAME': env['FONT_NAME'],
     'FONT_URL': env['FONT_URL'],
     'USE_CDN': CDN,
+    'RESIZE_CACHE_SIZE': env.int('RESIZE_CACHE_SIZE', 256),
     'UMAMI_URL': UMAMI_URL,
     'UMAMI_ID': env.get('UMAMI_ID'),
     'ALLOW_DLS': env.bool('ALLOW_DLS', True),
+    'SENDFILE': env.get('SENDFILE', '').lower(),
+    'BULK_DL_RATE': env.get('BULK_DL_RATE', '10/h'),
     'MAX_RELEASES': env.int('MAX_RELEASES', 10),
     'MAX_CHAPTERS': env.int('MAX_CHAPTERS', 1),
+    'MAX_SERIES': env.int('MAX_SERIES', 30),
     'SHOW_CREDITS': env.bool('SHOW_CREDITS', True),
     'ENABLE_API_V1': env.bool('ENABLE_API_V1', False),
+    'INGEST_MODE': env.get('INGEST_MODE', 'sync').lower(),
+    'INGEST_WORKERS': env.int('INGEST_WORKERS', 2),
+    'INGEST_PROCESSES': env.int('INGEST_PROCESSES', 0),
+    'DEDUP_PAGES': env.bool('DEDUP_PAGES', False),
+    'VIEWS_FLUSH_INTERVAL': env.int('VIEWS_FLUSH_INTERVAL', 60),
+    'PAGE_VARIANTS': [
+        f.strip().lower() for f in
+        env.list('PAGE_VARIANTS', []) if f.strip()
+    ],
 }
 
 ###############
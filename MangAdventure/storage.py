@@ -6,15 +6,21 @@ Custom storages.
     https://docs.djangoproject.com/en/4.1/ref/files/storage/
 """
 
+from hashlib import blake2b
+from os import utime
 from pathlib import Path
-from typing import Dict, Iterator, Optional, Tuple, cast
+from secrets import token_hex
+from threading import Lock
+from typing import Dict, Iterator, Optional, Set, Tuple, cast
 from urllib.parse import quote, urlencode
 
 from django.conf import settings
 from django.contrib.staticfiles.finders import FileSystemFinder
 from django.contrib.staticfiles.storage import StaticFilesStorage
 from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
 
+from PIL import Image
 from sass import compile as sassc
 
 #: Variables used to generate ``static/styles/_variables.scss``.
@@ -28,6 +34,15 @@ $font-family: %(FONT_NAME)s;
 """
 
 
+#: The name of the resized image cache inside
+#: :const:`~MangAdventure.settings.MEDIA_ROOT`.
+RESIZE_DIR = '.resized'
+
+_resize_lock = Lock()
+
+_resize_total: Optional[int] = None
+
+
 def _is_newer(a: Path, b: Path) -> bool:
     """Check if file ``a`` is newer than file ``b``."""
     return a.stat().st_mtime > b.stat().st_mtime
@@ -100,7 +115,8 @@ class CDNStorage(FileSystemStorage):
     """
     Storage class that may use an image CDN.
 
-    The options are statically_, weserv_ & photon_.
+    The options are statically_, weserv_, photon_ & ``resize``,
+    which resizes the images locally and caches them on disk.
 
     :param fit: A tuple of width & height to fit the image in.
 
@@ -108,11 +124,30 @@ class CDNStorage(FileSystemStorage):
     .. _weserv: https://images.weserv.nl/docs/
     .. _photon: https://developer.wordpress.com/docs/photon/
     """
+    #: The sizes that the images can be resized to.
+    sizes: Set[Tuple[int, int]] = set()
 
     def __init__(self, fit: Optional[Tuple[int, int]] = None):
         super().__init__()
         self._cdn = cast(str, settings.CONFIG['USE_CDN']).lower()
         self._fit = {'w': fit[0], 'h': fit[1]} if fit else {}
+        if fit:
+            self.sizes.add(fit)
+
+    def _local_url(self, name: str) -> str:
+        domain = settings.CONFIG['DOMAIN']
+        scheme = settings.ACCOUNT_DEFAULT_HTTP_PROTOCOL
+        return f'{scheme}://{domain}{self.base_url}{name}'
+
+    def _resize_url(self, name: str) -> str:
+        if not self._fit:
+            return self._local_url(name)
+        domain = settings.CONFIG['DOMAIN']
+        scheme = settings.ACCOUNT_DEFAULT_HTTP_PROTOCOL
+        url = reverse('resize', args=(
+            self._fit['w'], self._fit['h'], self.version(name), name
+        ))
+        return f'{scheme}://{domain}{url}'
 
     def _statically_url(self, name: str) -> str:
         domain = settings.CONFIG['DOMAIN']
@@ -150,13 +185,99 @@ class CDNStorage(FileSystemStorage):
         :return: The URL of the file.
         """
         if not hasattr(self, method := f'_{self._cdn}_url'):
-            domain = settings.CONFIG['DOMAIN']
-            scheme = settings.ACCOUNT_DEFAULT_HTTP_PROTOCOL
-            return f'{scheme}://{domain}{self.base_url}{name}'
+            return self._local_url(name)
         return getattr(self, method)(name)
 
+    def version(self, name: str) -> str:
+        """
+        Get a token that changes whenever a file is modified.
+
+        :param name: The name of the file.
+
+        :return: A short hex digest of the file's size & mtime.
+        """
+        try:
+            stat = Path(self.path(name)).stat()
+        except FileNotFoundError:
+            return '0'
+        key = f'{stat.st_size}:{stat.st_mtime_ns}'.encode()
+        return blake2b(key, digest_size=4).hexdigest()
+
+    def resize(self, name: str) -> Path:
+        """
+        Get a copy of an image that fits in the size of the storage.
+
+        The copy is rendered on first use and kept in
+        the :const:`RESIZE_DIR` cache which is limited to
+        :const:`RESIZE_CACHE_SIZE <MangAdventure.settings.CONFIG>`
+        megabytes by removing the least recently used images.
+
+        :param name: The name of the image.
+
+        :return: The path of the resized image, or the path of
+                 the original image if it already fits.
+
+        :raises FileNotFoundError: If the image does not exist.
+        """
+        src = Path(self.path(name))
+        if not self._fit:
+            return src
+        width, height = self._fit['w'], self._fit['h']
+        key = blake2b(
+            f'{name}\0{self.version(name)}\0{width}x{height}'.encode(),
+            digest_size=16
+        ).hexdigest()
+        target = settings.MEDIA_ROOT / RESIZE_DIR / key[:2] / \
+            (key + src.suffix.lower())
+        try:
+            utime(target)  # mark it as recently used
+            return target
+        except FileNotFoundError:
+            pass
+        with Image.open(src) as img:
+            if img.width <= width and img.height <= height:
+                return src
+            fmt = img.format
+            img.thumbnail((width, height))
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f'.{token_hex(4)}.part')
+            try:
+                img.save(tmp, fmt)
+                size = tmp.stat().st_size
+                tmp.replace(target)
+            finally:
+                tmp.unlink(missing_ok=True)
+        _track_resized(target, size)
+        return target
+
+
+def _track_resized(target: Path, size: int):
+    global _resize_total
+    limit = cast(int, settings.CONFIG['RESIZE_CACHE_SIZE']) << 20
+    with _resize_lock:
+        if _resize_total is not None:
+            _resize_total += size
+            if _resize_total <= limit:
+                return
+        # other processes share the cache so it's rescanned on overflow
+        files = []
+        for file in (settings.MEDIA_ROOT / RESIZE_DIR).glob('*/*'):
+            try:
+                files.append((file.stat(), file))
+            except FileNotFoundError:  # pragma: no cover
+                continue
+        _resize_total = sum(st.st_size for st, _ in files)
+        files.sort(key=lambda f: f[0].st_mtime)
+        for stat, file in files:
+            if _resize_total <= limit:
+                break
+            if file == target:
+                continue
+            file.unlink(missing_ok=True)
+            _resize_total -= stat.st_size
+
 
 __all__ = [
-    'SCSS_VARS', 'ProcessedStaticFilesFinder',
+    'SCSS_VARS', 'RESIZE_DIR', 'ProcessedStaticFilesFinder',
     'ProcessedStaticFilesStorage', 'CDNStorage'
 ]
@@ -2,7 +2,8 @@ from os import makedirs
 from shutil import rmtree
 
 from django.conf import settings
-from django.test import Client
+from django.core.cache import cache
+from django.test import Client, override_settings
 
 from pytest import mark
 
@@ -22,3 +23,31 @@ class MangadvTestBase:
     @classmethod
     def teardown_class(cls):
         rmtree(settings.MEDIA_ROOT)
+        rmtree(settings.ARCHIVE_ROOT, ignore_errors=True)
+
+
+class locmem_cache(override_settings):
+    """Replace the dummy cache of the tests with a local memory cache."""
+
+    def __init__(self):
+        super().__init__(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }})
+
+    def disable(self):
+        # the local memory caches outlive the settings
+        cache.clear()
+        super().disable()
+
+
+class CacheTestMixin:
+    """Mixin for the tests that need a working cache."""
+
+    def setup_method(self):
+        self._cache = locmem_cache()
+        self._cache.enable()
+        super().setup_method()
+
+    def teardown_method(self):
+        super().teardown_method()
+        self._cache.disable()
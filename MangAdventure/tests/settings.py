@@ -129,6 +129,10 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / 'tests' / 'media'
 
+ARCHIVE_URL = '/archives/'
+
+ARCHIVE_ROOT = BASE_DIR / 'tests' / 'archives'
+
 USE_I18N = False
 
 USE_TZ = True
@@ -297,13 +301,23 @@ CONFIG = {
     'FONT_NAME': 'Lato',
     'FONT_URL': 'https://fonts.googleapis.com/css?family=Lato&display=swap',
     'USE_CDN': 'none',
+    'RESIZE_CACHE_SIZE': 1,
     'UMAMI_URL': '',
     'UMAMI_ID': '',
     'ALLOW_DLS': True,
+    'SENDFILE': '',
+    'BULK_DL_RATE': '10/h',
     'MAX_RELEASES': 10,
     'MAX_CHAPTERS': 1,
+    'MAX_SERIES': 30,
     'SHOW_CREDITS': True,
-    'ENABLE_API_V1': True
+    'ENABLE_API_V1': True,
+    'INGEST_MODE': 'sync',
+    'INGEST_WORKERS': 1,
+    'INGEST_PROCESSES': 0,
+    'DEDUP_PAGES': False,
+    'PAGE_VARIANTS': ['webp'],
+    'VIEWS_FLUSH_INTERVAL': 0
 }
 
 del BOTS, VERSION
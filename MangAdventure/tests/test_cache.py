@@ -1,9 +1,19 @@
+from datetime import timedelta
+from math import inf
+from time import time
+from unittest.mock import Mock
+
+from django.core.cache import cache
 from django.core.cache.backends import memcached, redis
+from django.utils import timezone as tz
 
 from pytest import importorskip, raises
 
-from MangAdventure.cache import SignedPyLibMCCache, SignedRedisCache
-from MangAdventure.tests.base import MangadvTestBase
+from MangAdventure.cache import (
+    SignedPyLibMCCache, SignedRedisCache,
+    get_or_compute, invalidate_tags, timeout_until
+)
+from MangAdventure.tests.base import CacheTestMixin, MangadvTestBase
 
 
 class TestCache(MangadvTestBase):
@@ -59,3 +69,39 @@ class TestMemcached(MangadvTestBase):
         with raises(UnpicklingError):
             data, flag = self.og_client.serialize([])
             self.client.deserialize(data, flag)
+
+
+class TestGetOrCompute(CacheTestMixin, MangadvTestBase):
+    def test_lazy(self):
+        func = Mock(return_value=[1])
+        assert get_or_compute('test', func) == [1]
+        assert get_or_compute('test', func) == [1]
+        func.assert_called_once()
+
+    def test_stale(self):
+        func = Mock(return_value=2)
+        cache.set('test', (1, time() - 1), 60)
+        cache.add('test.lock', 1)
+        assert get_or_compute('test', func) == 1
+        func.assert_not_called()
+        cache.delete('test.lock')
+        assert get_or_compute('test', func) == 2
+        assert 'test.lock' not in cache
+
+    def test_timeout(self):
+        assert get_or_compute('test', lambda: None, lambda _: None) is None
+        assert cache.get('test') == (None, inf)
+
+    def test_tags(self):
+        func = Mock(side_effect=[1, 2])
+        assert get_or_compute('test', func, tags=('a', 'b')) == 1
+        invalidate_tags('c')
+        assert get_or_compute('test', func, tags=('a', 'b')) == 1
+        invalidate_tags('b')
+        assert get_or_compute('test', func, tags=('a', 'b')) == 2
+
+    def test_timeout_until(self):
+        assert timeout_until(None, 60) == 60
+        assert timeout_until(tz.now() + timedelta(hours=1), 60) == 60
+        assert 1 <= timeout_until(tz.now() + timedelta(seconds=5), 60) <= 6
+        assert timeout_until(tz.now() - timedelta(hours=1), 60) == 1
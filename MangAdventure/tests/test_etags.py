@@ -0,0 +1,8 @@
+from MangAdventure.etags import make_etag
+
+
+def test_make_etag():
+    etag = make_etag('series', 1.0)
+    assert etag == make_etag('series', 1.0)
+    assert etag != make_etag('series', 2.0)
+    assert make_etag('series', 1.0, weak=True) == 'W/' + etag
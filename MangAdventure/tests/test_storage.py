@@ -1,7 +1,13 @@
+from io import BytesIO
+from unittest.mock import patch
+
 from django.conf import settings
+from django.core.files.base import ContentFile
 
+from PIL import Image
 from pytest import mark
 
+from MangAdventure import storage
 from MangAdventure.storage import (
     CDNStorage, ProcessedStaticFilesFinder, ProcessedStaticFilesStorage
 )
@@ -54,3 +60,38 @@ class TestCDNStorage(MangadvTestBase):
         self.storage._cdn = name
         url = self.storage.url('test.jpeg')
         assert url.startswith(self._cdns[name])
+
+    def test_resize_url(self):
+        self.storage._cdn = 'resize'
+        url = self.storage.url('test.jpeg')
+        assert url.endswith('/resize/300x300/0/test.jpeg')
+
+    def test_resize(self):
+        name = self._save_image('large.png', (600, 400))
+        path = self.storage.resize(name)
+        assert path.parent.parent.name == storage.RESIZE_DIR
+        with Image.open(path) as img:
+            assert img.size == (300, 200)
+        assert self.storage.resize(name) == path
+        small = self._save_image('small.png', (200, 200))
+        assert str(self.storage.resize(small)) == self.storage.path(small)
+
+    def test_resize_evict(self):
+        storage._resize_total = None
+        try:
+            with patch.dict(settings.CONFIG, RESIZE_CACHE_SIZE=0):
+                first = self.storage.resize(
+                    self._save_image('first.png', (600, 600))
+                )
+                second = self.storage.resize(
+                    self._save_image('second.png', (600, 600))
+                )
+            assert not first.exists()
+            assert second.exists()
+        finally:
+            storage._resize_total = None
+
+    def _save_image(self, name: str, size: tuple) -> str:
+        buf = BytesIO()
+        Image.new('RGB', size, (0, 128, 255)).save(buf, 'PNG')
+        return self.storage.save(name, ContentFile(buf.getvalue()))
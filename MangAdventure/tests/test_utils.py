@@ -0,0 +1,20 @@
+from pytest import mark
+
+from MangAdventure.utils import parse_range
+
+
+@mark.parametrize('header, expected', (
+    ('bytes=0-99', [(0, 99)]),
+    ('bytes=100-', [(100, 999)]),
+    ('bytes=-100', [(900, 999)]),
+    ('bytes=0-1500', [(0, 999)]),
+    ('bytes=0-10, 5-20, 21-30', [(0, 30)]),
+    ('bytes=500-600,0-10', [(0, 10), (500, 600)]),
+    ('bytes=1000-', []),
+    ('bytes=10-5', None),
+    ('bytes=a-b', None),
+    ('items=0-10', None),
+    ('bytes=' + ','.join(['0-1'] * 9), None)
+))
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
@@ -1,11 +1,13 @@
 from operator import attrgetter
 from typing import Dict, List
 
+from django.conf import settings
 from django.core.cache import cache
 from django.urls import reverse
 
 from pytest import importorskip
 
+from MangAdventure.storage import CDNStorage
 from MangAdventure.utils import natsort
 
 from reader.models import Series
@@ -123,3 +125,37 @@ class TestManifest(MangadvViewTestBase):
         assert r.status_code == 200
         assert r['Content-Type'] == 'application/manifest+json'
         assert r.json()['name'] == 'MangAdventure'
+
+
+class TestResize(MangadvViewTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.storage = CDNStorage((300, 300))
+        self.storage._cdn = 'resize'
+        self.name = Series.objects.get(slug='series').cover.name
+
+    def test_get(self):
+        url = self.storage.url(self.name)
+        r = self.client.get(url)
+        assert r.status_code == 200
+        assert 'immutable' in r['Cache-Control']
+        r.close()
+
+    def test_get_outdated(self):
+        url = reverse('resize', args=(300, 300, 'outdated', self.name))
+        r = self.client.get(url)
+        assert r.status_code == 302
+        assert self.storage.url(self.name).endswith(r['Location'])
+
+    def test_get_not_found(self):
+        url = reverse('resize', args=(300, 300, '0', 'missing.png'))
+        assert self.client.get(url).status_code == 404
+        url = reverse('resize', args=(123, 456, '0', self.name))
+        assert self.client.get(url).status_code == 404
+
+    def test_get_invalid(self):
+        for name in ('invalid.png', 'archive.cbz'):
+            (settings.MEDIA_ROOT / name).write_bytes(b'not an image')
+            version = self.storage.version(name)
+            url = reverse('resize', args=(300, 300, version, name))
+            assert self.client.get(url).status_code == 404
@@ -0,0 +1,103 @@
+from datetime import datetime
+from io import BytesIO
+from zipfile import ZIP_STORED, ZipFile
+
+from pytest import raises
+
+from MangAdventure.zipstream import ZipMember, ZipStream
+
+
+def _members(tmp_path):
+    file = tmp_path / 'page.png'
+    file.write_bytes(b'\x89PNG' * 50000)
+    return [
+        ZipMember('001.png', file.stat().st_size, str(file)),
+        ZipMember.from_bytes('ComicInfo.xml', b'<ComicInfo/>')
+    ]
+
+
+def test_stream(tmp_path):
+    stream = ZipStream(_members(tmp_path), datetime(2020, 1, 2, 3, 4, 6))
+    data = b''.join(stream)
+    assert len(data) == len(stream)
+    with ZipFile(BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ['001.png', 'ComicInfo.xml']
+        info = zf.getinfo('ComicInfo.xml')
+        assert info.compress_type == ZIP_STORED
+        assert info.date_time == (2020, 1, 2, 3, 4, 6)
+        assert zf.read(info) == b'<ComicInfo/>'
+        for info in zf.infolist():
+            assert not info.flag_bits & 0x08
+            assert info.create_system == 3
+    assert b''.join(stream) == data
+
+
+def test_zip64():
+    members = [
+        ZipMember.from_bytes(f'{i:05}.txt', b'') for i in range(0x10000)
+    ]
+    stream = ZipStream(members, datetime(2020, 1, 1))
+    data = b''.join(stream)
+    assert len(data) == len(stream)
+    with ZipFile(BytesIO(data)) as zf:
+        assert len(zf.infolist()) == 0x10000
+        assert zf.read('65535.txt') == b''
+
+
+def test_tee(tmp_path):
+    stream = ZipStream(_members(tmp_path), datetime(2020, 1, 1))
+    target = tmp_path / 'test.cbz'
+    data = b''.join(stream.tee(target))
+    assert target.read_bytes() == data
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_changed_size(tmp_path):
+    members = _members(tmp_path)
+    members[0] = members[0]._replace(size=1)
+    target = tmp_path / 'test.cbz'
+    with raises(OSError):
+        ZipStream(members, datetime(2020, 1, 1)).save(target)
+    assert not target.exists()
+
+
+def test_modified(tmp_path):
+    members = _members(tmp_path)
+    stream = ZipStream(members, datetime(2020, 1, 1))
+    chunks = iter(stream)
+    next(chunks)
+    with open(members[0].path, 'r+b') as f:
+        f.write(b'PNG\x89')
+    with raises(OSError):
+        list(chunks)
+
+
+def test_known_crc():
+    member = ZipMember('001.png', 4, '/missing.png', crc=0x12345678)
+    stream = ZipStream([member], datetime(2020, 1, 1))
+    # the header is written without reading the file
+    assert next(iter(stream))[14:18] == b'\x78\x56\x34\x12'
+
+
+def test_offset(tmp_path):
+    stream = ZipStream(_members(tmp_path), datetime(2020, 1, 1))
+    target = tmp_path / 'test.cbz'
+    stream.save(target)
+    member = stream.members[0]._replace(
+        name='copy.png', path=str(target), offset=stream.locate(0)
+    )
+    data = b''.join(ZipStream([member], datetime(2020, 1, 1)))
+    with ZipFile(BytesIO(data)) as zf:
+        assert zf.read('copy.png') == b'\x89PNG' * 50000
+
+
+def test_slice(tmp_path):
+    stream = ZipStream(_members(tmp_path), datetime(2020, 1, 1))
+    data = b''.join(stream)
+    assert b''.join(stream.slice(0, 0)) == data[:1]
+    assert b''.join(stream.slice(70000, 140000)) == data[70000:140001]
+    assert b''.join(stream.slice(100, len(data) - 1)) == data[100:]
+    assert b''.join(stream.slice(200100, len(data) - 1)) == data[200100:]
+    assert b''.join(stream.slice(len(data) - 10, len(data) - 1)) == \
+        data[-10:]
@@ -2,9 +2,12 @@ from hashlib import blake2b
 from io import BytesIO
 from os import urandom
 from random import randint
+from typing import Tuple
 from zipfile import ZipFile
 
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile, TemporaryUploadedFile
+)
 
 from PIL import Image
 
@@ -47,6 +50,30 @@ def get_valid_zip_file() -> InMemoryUploadedFile:
     )
 
 
+def get_multi_page_zip(pages: int = 12, changed: Tuple[int, ...] = ()) \
+        -> TemporaryUploadedFile:
+    """
+    Get a dummy ``TemporaryUploadedFile`` of a zip file with many pages.
+
+    :param pages: The number of pages in the zip file.
+    :param changed: The numbers of pages that will have a different image.
+
+    :return: A dummy ``TemporaryUploadedFile``
+    """
+    file = TemporaryUploadedFile('file.zip', 'application/zip', 0, None)
+    with ZipFile(file.file, 'w') as zf:
+        zf.writestr('test/', '')
+        for i in range(pages, 0, -1):
+            img_file = BytesIO()
+            color = (255 if i in changed else i, i, i)
+            img = Image.new('RGB', size=(200, 200), color=color)
+            img.save(img_file, 'PNG')
+            zf.writestr(f'test/{i}.png', img_file.getvalue())
+    file.size = file.file.tell()
+    file.seek(0)
+    return file
+
+
 def get_multi_subdir_zip() -> InMemoryUploadedFile:
     """
     Get a dummy ``InMemoryUploadedFile`` of a zip file with more than one
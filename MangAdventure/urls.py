@@ -8,7 +8,9 @@ from django.views.decorators.cache import cache_control
 from reader import feeds
 
 from .sitemaps import MiscSitemap
-from .views import contribute, index, manifest, opensearch, robots, search
+from .views import (
+    contribute, index, manifest, opensearch, resize, robots, search
+)
 
 _sitemaps = {'sitemaps': {'main': MiscSitemap}}
 
@@ -28,6 +30,10 @@ urlpatterns = [
     path('contribute.json', contribute, name='contribute'),
     path('manifest.webmanifest', manifest, name='manifest'),
     path('robots.txt', robots, name='robots'),
+    path(
+        'resize/<int:width>x<int:height>/<str:version>/<path:name>',
+        resize, name='resize'
+    ),
     path('releases.atom', feeds.ReleasesAtom(), name='releases.atom'),
     path('releases.rss', feeds.ReleasesRSS(), name='releases.rss'),
     path('library.atom', feeds.LibraryAtom(), name='library.atom'),
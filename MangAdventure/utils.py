@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
-from re import split
-from typing import TYPE_CHECKING, Iterable, List, Union
+from re import compile as regex, split
+from secrets import token_hex
+from typing import (
+    TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Union
+)
+from urllib.parse import quote
 
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils.html import format_html
+from django.utils.http import (
+    content_disposition_header, http_date, parse_http_date_safe
+)
 
 if TYPE_CHECKING:  # pragma: no cover
-    from django.db.models.fields.files import ImageField
+    from pathlib import Path
+    from django.db.models.fields.files import ImageField  # isort:skip
+    from django.http import HttpRequest  # isort:skip
+    from django.http.response import HttpResponseBase  # isort:skip
 
 
 class HttpResponseUnauthorized(HttpResponse):
@@ -79,4 +90,174 @@ def natsort(original: Iterable[str]) -> List[str]:
     return sorted(original, key=alnum_key)
 
 
-__all__ = ['HttpResponseUnauthorized', 'img_tag', 'natsort']
+#: The maximum number of ranges that are served in a single response.
+MAX_RANGES = 8
+
+_RANGE_RE = regex(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse the value of a :header:`Range` header.
+
+    Overlapping and adjacent ranges are merged.
+
+    :param header: The value of the header.
+    :param size: The size of the resource in bytes.
+
+    :return: The first & last byte of each satisfiable range, an empty list
+             if none of them are satisfiable, or ``None`` if the header
+             is invalid or has more than :const:`MAX_RANGES` ranges.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not spec.strip():
+        return None
+    parts = spec.split(',')
+    if len(parts) > MAX_RANGES:
+        return None
+    ranges = []
+    for part in parts:
+        if not (match := _RANGE_RE.match(part)):
+            return None
+        start, end = match.groups()
+        if not start:
+            if not end:
+                return None
+            if (length := int(end)) > 0 and size > 0:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        first, last = int(start), int(end) if end else size - 1
+        if end and last < first:
+            return None
+        if first < size:
+            ranges.append((first, min(last, size - 1)))
+    merged: List[Tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _if_range(request: HttpRequest, etag: Optional[str], mtime: int) -> bool:
+    if (value := request.headers.get('If-Range')) is None:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    if value.startswith('W/'):
+        return False  # weak validators can't be used for ranges
+    return parse_http_date_safe(value) == mtime
+
+
+def _read_range(file: Path, first: int, last: int) -> Iterator[bytes]:
+    with open(file, 'rb') as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0 and (chunk := f.read(min(remaining, 1 << 16))):
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _multipart(file: Path, ranges: List[Tuple[int, int]],
+               headers: List[bytes], tail: bytes) -> Iterator[bytes]:
+    for (first, last), header in zip(ranges, headers):
+        yield header
+        yield from _read_range(file, first, last)
+        yield b'\r\n'
+    yield tail
+
+
+def _ranged_response(request: HttpRequest, file: Path, content_type: str,
+                     etag: Optional[str], mtime: int) -> HttpResponseBase:
+    size = file.stat().st_size
+    header = request.headers.get('Range')
+    ranges = None
+    if header and request.method == 'GET' and _if_range(request, etag, mtime):
+        ranges = parse_range(header, size)
+    if ranges is None:
+        return FileResponse(open(file, 'rb'), content_type=content_type)
+    if not ranges:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if len(ranges) == 1:
+        first, last = ranges[0]
+        response = StreamingHttpResponse(
+            _read_range(file, first, last), content_type, 206
+        )
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Length'] = last - first + 1
+        return response
+    boundary = token_hex(16)
+    headers = [(
+        f'--{boundary}\r\nContent-Type: {content_type}\r\n'
+        f'Content-Range: bytes {first}-{last}/{size}\r\n\r\n'
+    ).encode() for first, last in ranges]
+    tail = f'--{boundary}--\r\n'.encode()
+    response = StreamingHttpResponse(
+        _multipart(file, ranges, headers, tail),
+        f'multipart/byteranges; boundary={boundary}', 206
+    )
+    response['Content-Length'] = len(tail) + sum(
+        len(header) + last - first + 3
+        for (first, last), header in zip(ranges, headers)
+    )
+    return response
+
+
+def sendfile(request: HttpRequest, file: Path, filename: str,
+             content_type: str, etag: Optional[str] = None
+             ) -> HttpResponseBase:
+    """
+    Create a response that sends a file as an attachment.
+
+    Depending on :const:`SENDFILE <MangAdventure.settings.CONFIG>`,
+    the file is sent by the web server via :header:`X-Accel-Redirect`
+    (``nginx``) or :header:`X-Sendfile` (``apache``, ``lighttpd``).
+
+    Otherwise, it's streamed by Django in chunks, and
+    :header:`Range` requests are answered with :status:`206`
+    responses. The web servers handle them on their own.
+
+    :param request: The original request.
+    :param file: The absolute path of a file in
+                 :const:`~MangAdventure.settings.MEDIA_ROOT`
+                 or :const:`~MangAdventure.settings.ARCHIVE_ROOT`.
+    :param filename: The name of the downloaded file.
+    :param content_type: The MIME type of the file.
+    :param etag: A strong :header:`ETag` that changes with the file.
+
+    :return: A response that sends the file.
+    """
+    server = settings.CONFIG['SENDFILE']
+    mtime = int(file.stat().st_mtime)
+    if server == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        try:
+            rel = file.relative_to(settings.ARCHIVE_ROOT).as_posix()
+            url = settings.ARCHIVE_URL + rel
+        except ValueError:
+            rel = file.relative_to(settings.MEDIA_ROOT).as_posix()
+            url = settings.MEDIA_URL + rel
+        response['X-Accel-Redirect'] = quote(url)
+    elif server in ('apache', 'lighttpd'):
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(file)
+    else:
+        response = _ranged_response(
+            request, file, content_type, etag, mtime
+        )
+    response['Content-Disposition'] = \
+        content_disposition_header(True, filename)
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(mtime)
+    if etag:
+        response['ETag'] = etag
+    return response
+
+
+__all__ = [
+    'HttpResponseUnauthorized', 'img_tag', 'natsort',
+    'MAX_RANGES', 'parse_range', 'sendfile'
+]
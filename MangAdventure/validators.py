@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-from io import BytesIO
 from os import remove
 from typing import Any
 from zipfile import BadZipfile, ZipFile
@@ -13,8 +12,6 @@ from django.core.files import File
 from django.core.validators import RegexValidator
 from django.utils.deconstruct import deconstructible
 
-from PIL import Image
-
 
 def _remove_file(file: File):
     try:
@@ -81,43 +78,31 @@ def zipfile_validator(file: File):
     Validate a zip file:
 
     * It must be a valid :class:`~zipfile.ZipFile`.
-    * It must only contain image files.
     * It cannot contain more than 1 subfolder.
 
+    Only the central directory of the archive is read.
+    The images are verified when the archive is extracted.
+
     :param file: The file to be validated.
 
     :raises ValidationError: If any of the validations failed.
     """
     messages = (
         'The file cannot contain more than 1 subfolder.',
-        'The file must only contain image files.',
         'The file must be in zip/cbz format.'
     )
-    codes = ('no_multiple_subfolders', 'only_images', 'invalid_format')
-    zf = None
+    codes = ('no_multiple_subfolders', 'invalid_format')
     try:
         zf = ZipFile(file)
     except BadZipfile as err:
-        _remove_file(file)
-        raise ValidationError(messages[2], code=codes[2]) from err
-    else:
-        first_folder = True
-        for f in zf.namelist():
-            if zf.getinfo(f).is_dir():
-                if first_folder:
-                    first_folder = False
-                    continue
-                _remove_file(file)
-                raise ValidationError(messages[0], code=codes[0])
-            try:
-                data = BytesIO(zf.read(f))
-                Image.open(data).verify()
-            except Exception as exc:
+        if hasattr(file, 'path'):
+            _remove_file(file)
+        raise ValidationError(messages[1], code=codes[1]) from err
+    with zf:
+        if sum(info.is_dir() for info in zf.infolist()) > 1:
+            if hasattr(file, 'path'):
                 _remove_file(file)
-                raise ValidationError(messages[1], code=codes[1]) from exc
-    finally:
-        if zf:
-            zf.close()
+            raise ValidationError(messages[0], code=codes[0])
 
 
 class DiscordServerValidator(RegexValidator):
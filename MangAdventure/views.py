@@ -5,23 +5,32 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Dict, Optional, cast
 
 from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
 from django.db.models import Prefetch
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import render
-from django.utils import timezone as tz
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import redirect, render
+from django.utils.cache import patch_cache_control
 from django.utils.html import escapejs
 from django.views.decorators.cache import cache_control
 
+from PIL import Image
+
 from groups.models import Group
 from reader.models import Category, Chapter
 
 from .bad_bots import BOTS
 from .jsonld import breadcrumbs
 from .search import parse, query
+from .storage import CDNStorage
 
 if TYPE_CHECKING:  # pragma: no cover
     from django.http import HttpRequest
 
+_IMAGE_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.webp',
+    '.avif', '.bmp', '.tif', '.tiff'
+)
+
 
 def _error_context(msg: str, status: int = 500) -> Dict[str, Any]:
     return {'error_message': msg, 'error_status': status}
@@ -39,7 +48,7 @@ def index(request: HttpRequest) -> HttpResponse:
     max_ = cast(int, settings.CONFIG['MAX_RELEASES'])
     groups = Group.objects.only('name')
     latest = Chapter.objects.filter(
-        published__lte=tz.now(),
+        released=True,
         series__licensed=False
     ).order_by('-published').only(
         'title', 'number', 'volume', 'final', 'published',
@@ -151,6 +160,47 @@ def robots(request: HttpRequest) -> HttpResponse:
     return HttpResponse(content=robots_, content_type=ctype)
 
 
+def resize(request: HttpRequest, width: int, height: int,
+           version: str, name: str) -> HttpResponse:
+    """
+    View that serves a resized image.
+
+    This is used by :class:`~MangAdventure.storage.CDNStorage`
+    when :const:`USE_CDN <MangAdventure.settings.CONFIG>` is ``resize``.
+
+    :param request: The original request.
+    :param width: The maximum width of the image.
+    :param height: The maximum height of the image.
+    :param version: The version of the original image.
+    :param name: The name of the original image.
+
+    :return: A response with the resized image, or a redirect
+             to the current version of the image.
+
+    :raises Http404: If the size is not allowed or the image does not exist.
+    """
+    if (width, height) not in CDNStorage.sizes:
+        raise Http404('Invalid image size')
+    if not name.lower().endswith(_IMAGE_EXTENSIONS):
+        raise Http404('No such image')
+    storage = CDNStorage((width, height))
+    try:
+        if version != (current := storage.version(name)):
+            if not storage.exists(name):
+                raise Http404('No such image')
+            return redirect('resize', width, height, current, name)
+        path = storage.resize(name)
+    except (SuspiciousFileOperation, OSError,
+            Image.DecompressionBombError) as e:
+        # missing, unreadable or invalid images
+        raise Http404('No such image') from e
+    response = FileResponse(open(path, 'rb'))
+    patch_cache_control(
+        response, public=True, max_age=31536000, immutable=True
+    )
+    return response
+
+
 def handler400(request: HttpRequest, exception: Optional[Exception]
                = None, template_name: str = 'error.html'
                ) -> HttpResponse:  # pragma: no cover
@@ -232,7 +282,7 @@ def handler500(request: HttpRequest, exception: Optional[Exception]
 
 
 __all__ = [
-    'index', 'search', 'opensearch', 'robots',
-    'contribute', 'manifest', 'handler400',
+    'index', 'search', 'opensearch', 'robots', 'contribute',
+    'manifest', 'resize', 'handler400',
     'handler403', 'handler404', 'handler500'
 ]
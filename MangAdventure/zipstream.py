@@ -0,0 +1,311 @@
+"""
+Streaming zip archives.
+
+The members of the archives are stored without compression, so the
+size of an archive is known before any byte of it is generated and
+the same members always produce exactly the same bytes.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from os import fstat
+from pathlib import Path
+from secrets import token_hex
+from struct import pack
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional
+from zlib import crc32
+
+if TYPE_CHECKING:  # pragma: no cover
+    from datetime import datetime
+
+#: The size of the chunks read from the member files.
+CHUNK_SIZE = 1 << 16
+
+_LOCAL_HEADER = 30
+
+_CENTRAL_HEADER = 46
+
+_END_RECORD = 22
+
+_ZIP64_END = 56 + 20
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+
+_ZIP64_COUNT = 0xFFFF
+
+# bit 11: the names are encoded in UTF-8
+_FLAGS = 0x0800
+
+_VERSION = 20
+
+_ZIP64_VERSION = 45
+
+# host 3: Unix, so that the attributes are used
+_HOST = 3 << 8
+
+_ATTRIBUTES = 0o100644 << 16
+
+
+class ZipMember(NamedTuple):
+    """
+    A member of a zip archive.
+
+    :cvar name: The name of the member in the archive.
+    :cvar size: The size of the member in bytes.
+    :cvar path: The path of the file with the contents of the member.
+    :cvar data: The contents of the member if it's not a file.
+    :cvar offset: The position of the contents in the file.
+                  If it's ``0``, the whole file is the member.
+    :cvar crc: The CRC-32 checksum of the contents, if it's known.
+    """
+    name: str
+    size: int
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    offset: int = 0
+    crc: Optional[int] = None
+
+    @classmethod
+    def from_bytes(cls, name: str, data: bytes) -> ZipMember:
+        """
+        Create a member from in-memory contents.
+
+        :param name: The name of the member in the archive.
+        :param data: The contents of the member.
+
+        :return: A new member.
+        """
+        return cls(name, len(data), data=data, crc=crc32(data))
+
+
+class ZipStream:
+    """
+    A zip archive that is generated while it's being sent.
+
+    :param members: The members of the archive in order.
+    :param date_time: The modification time of the members.
+
+    The ZIP64 extensions are only used if the archive or
+    one of its members is too large for the zip format.
+    """
+
+    def __init__(self, members: List[ZipMember], date_time: datetime):
+        self.members = members
+        self._time = (
+            date_time.hour << 11 | date_time.minute << 5 |
+            date_time.second // 2
+        )
+        self._date = (
+            max(date_time.year - 1980, 0) << 9 |
+            date_time.month << 5 | date_time.day
+        )
+        self._names = [m.name.encode('utf-8') for m in members]
+        self._offsets: List[int] = []
+        self._crcs: Dict[int, int] = {}
+        offset = 0
+        for member, name in zip(members, self._names):
+            self._offsets.append(offset)
+            offset += _LOCAL_HEADER + len(name) + \
+                len(self._extra(member.size)) + member.size
+        self._directory = offset
+        self._size = sum(
+            _CENTRAL_HEADER + len(name) +
+            len(self._extra(member.size, offset))
+            for member, name, offset in zip(
+                members, self._names, self._offsets
+            )
+        )
+        self._zip64 = len(members) >= _ZIP64_COUNT or \
+            self._directory >= _ZIP64_LIMIT or self._size >= _ZIP64_LIMIT
+        self._length = self._directory + self._size + _END_RECORD + \
+            (_ZIP64_END if self._zip64 else 0)
+
+    def __len__(self) -> int:
+        """
+        Get the size of the archive.
+
+        :return: The exact number of bytes that will be generated.
+        """
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Generate the archive.
+
+        The data of each member is read in chunks of :const:`CHUNK_SIZE`
+        bytes. If the checksum of a member file isn't known, it's
+        calculated before its header is written, so the file is
+        read twice and is checked again while it's being sent.
+
+        :return: An iterator of the chunks of the archive.
+
+        :raises OSError: If a member file has been modified.
+        """
+        return self._generate(0)
+
+    @staticmethod
+    def _extra(size: int, offset: Optional[int] = None) -> bytes:
+        # the ZIP64 extra field holds the values that don't fit
+        values = [size, size] if size >= _ZIP64_LIMIT else []
+        if offset is not None and offset >= _ZIP64_LIMIT:
+            values.append(offset)
+        if not values:
+            return b''
+        return pack(
+            f'<HH{len(values)}Q', 0x0001, 8 * len(values), *values
+        )
+
+    def _read(self, member: ZipMember) -> Iterator[bytes]:
+        with open(member.path, 'rb') as f:  # type: ignore
+            if not member.offset and \
+                    fstat(f.fileno()).st_size != member.size:
+                raise OSError(f'{member.path} has been modified.')
+            f.seek(member.offset)
+            remaining = member.size
+            while remaining and (
+                chunk := f.read(min(remaining, CHUNK_SIZE))
+            ):
+                remaining -= len(chunk)
+                yield chunk
+        if remaining:
+            raise OSError(f'{member.path} has been truncated.')
+
+    def _checksum(self, index: int) -> int:
+        if index not in self._crcs:
+            member = self.members[index]
+            if member.crc is not None:
+                crc = member.crc
+            elif member.data is not None:
+                crc = crc32(member.data)
+            else:
+                crc = 0
+                for chunk in self._read(member):
+                    crc = crc32(chunk, crc)
+            self._crcs[index] = crc
+        return self._crcs[index]
+
+    def _generate(self, start: int) -> Iterator[bytes]:
+        for index in range(start, len(self.members)):
+            member, name = self.members[index], self._names[index]
+            crc = self._checksum(index)
+            extra = self._extra(member.size)
+            size = min(member.size, _ZIP64_LIMIT)
+            yield pack(
+                '<IHHHHHIIIHH', 0x04034B50,
+                _ZIP64_VERSION if extra else _VERSION, _FLAGS, 0,
+                self._time, self._date, crc, size, size,
+                len(name), len(extra)
+            ) + name + extra
+            if member.data is not None:
+                yield member.data
+                continue
+            if member.crc is not None:
+                yield from self._read(member)
+                continue
+            check = 0
+            for chunk in self._read(member):
+                check = crc32(chunk, check)
+                yield chunk
+            if check != crc:
+                raise OSError(f'{member.path} has been modified.')
+        directory = bytearray()
+        for index, (member, name, offset) in enumerate(
+            zip(self.members, self._names, self._offsets)
+        ):
+            extra = self._extra(member.size, offset)
+            version = _ZIP64_VERSION if extra else _VERSION
+            size = min(member.size, _ZIP64_LIMIT)
+            directory += pack(
+                '<IHHHHHHIIIHHHHHII', 0x02014B50, _HOST | version,
+                version, _FLAGS, 0, self._time, self._date,
+                self._checksum(index), size, size, len(name),
+                len(extra), 0, 0, 0, _ATTRIBUTES,
+                min(offset, _ZIP64_LIMIT)
+            ) + name + extra
+        count = len(self.members)
+        if self._zip64:
+            end = self._directory + self._size
+            directory += pack(
+                '<IQHHIIQQQQ', 0x06064B50, 44, _HOST | _ZIP64_VERSION,
+                _ZIP64_VERSION, 0, 0, count, count,
+                self._size, self._directory
+            ) + pack('<IIQI', 0x07064B50, 0, end, 1)
+        yield bytes(directory) + pack(
+            '<IHHHHIIH', 0x06054B50, 0, 0, min(count, _ZIP64_COUNT),
+            min(count, _ZIP64_COUNT), min(self._size, _ZIP64_LIMIT),
+            min(self._directory, _ZIP64_LIMIT), 0
+        )
+
+    def locate(self, index: int) -> int:
+        """
+        Get the position of the contents of a member in the archive.
+
+        :param index: The index of the member.
+
+        :return: The offset of the first byte of the member's data.
+        """
+        return self._offsets[index] + _LOCAL_HEADER + \
+            len(self._names[index]) + \
+            len(self._extra(self.members[index].size))
+
+    def slice(self, first: int, last: int) -> Iterator[bytes]:
+        """
+        Generate a range of the archive.
+
+        The members that end before the range are skipped.
+
+        :param first: The offset of the first byte.
+        :param last: The offset of the last byte.
+
+        :return: An iterator of the chunks of the range.
+        """
+        start = bisect_right(self._offsets, first) - 1
+        if start < 0 or first >= self._directory:
+            start = len(self.members)
+        pos = self._offsets[start] \
+            if start < len(self.members) else self._directory
+        chunks = self._generate(start)
+        try:
+            for chunk in chunks:
+                end = pos + len(chunk)
+                if end > first:
+                    yield chunk[max(first - pos, 0):last - pos + 1]
+                if end > last:
+                    break
+                pos = end
+        finally:
+            chunks.close()  # type: ignore
+
+    def tee(self, file: Path) -> Iterator[bytes]:
+        """
+        Generate the archive and save it to a file.
+
+        The file is only created once the whole archive has been
+        generated, so an interrupted stream leaves nothing behind.
+
+        :param file: The path of the file.
+
+        :return: An iterator of the chunks of the archive.
+        """
+        tmp = file.with_name(f'.{token_hex(8)}.part')
+        try:
+            with open(tmp, 'wb') as f:
+                for chunk in self:
+                    f.write(chunk)
+                    yield chunk
+            tmp.replace(file)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def save(self, file: Path):
+        """
+        Write the archive to a file.
+
+        :param file: The path of the file.
+        """
+        for _ in self.tee(file):
+            pass
+
+
+__all__ = ['CHUNK_SIZE', 'ZipMember', 'ZipStream']
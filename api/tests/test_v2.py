@@ -1,10 +1,17 @@
 import warnings
 
 from django.core.cache import cache
+from django.test import modify_settings
 from django.urls import reverse
 
 from pytest import mark
 
+from MangAdventure.tests.base import locmem_cache
+
+from groups.models import Group
+from reader.counters import ViewCounter
+from reader.models import Series, ViewCount
+
 from . import APITestBase
 
 # TODO: write the rest of the tests
@@ -33,3 +40,91 @@ class TestOpenAPI(APIViewTestBase):
         r = self.client.get(reverse('api:v2:rapidoc'))
         assert r.status_code == 200
         assert b'<rapi-doc' in r.content
+
+
+class TestETags(APIViewTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+        self.series.chapters.create(title='chapter', number=1)
+
+    @mark.parametrize('name, kwargs', (
+        ('series-list', {}),
+        ('series-detail', {'slug': 'series'}),
+        ('chapters-list', {})
+    ))
+    def test_not_modified(self, name, kwargs):
+        url = reverse(f'api:v2:{name}', kwargs=kwargs)
+        r = self.client.get(url)
+        assert r.status_code == 200
+        etag = r['ETag']
+        assert etag.startswith('W/"')
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 304
+        assert r['ETag'] == etag
+        self.series.chapters.create(title='other', number=2)
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 200
+
+    def test_unused_params(self):
+        url = reverse('api:v2:series-list')
+        etag = self.client.get(url)['ETag']
+        assert self.client.get(url + '?foo=bar')['ETag'] == etag
+        assert self.client.get(url + '?status=completed')['ETag'] != etag
+
+    @locmem_cache()
+    @modify_settings(MIDDLEWARE={'remove': [
+        'django.middleware.cache.UpdateCacheMiddleware',
+        'django.middleware.cache.FetchFromCacheMiddleware'
+    ]})
+    @mark.parametrize('name, kwargs', (
+        ('series-detail', {'slug': 'series'}),
+        ('chapters-list', {})
+    ))
+    def test_views(self, name, kwargs):
+        url = reverse(f'api:v2:{name}', kwargs=kwargs)
+        etag = self.client.get(url)['ETag']
+        counter = ViewCounter()
+        counter.add(self.series.chapters.get().id)
+        counter.flush()
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 200
+        assert r['ETag'] != etag
+
+    @locmem_cache()
+    @modify_settings(MIDDLEWARE={'remove': [
+        'django.middleware.cache.UpdateCacheMiddleware',
+        'django.middleware.cache.FetchFromCacheMiddleware'
+    ]})
+    def test_group_renamed(self):
+        group = Group.objects.create(name='group')
+        self.series.chapters.get().groups.add(group)
+        url = reverse('api:v2:chapters-list')
+        etag = self.client.get(url)['ETag']
+        group.name = 'renamed'
+        group.save()
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 200
+        assert r['ETag'] != etag
+
+
+class TestPopular(APIViewTestBase):
+    def setup_method(self):
+        super().setup_method()
+        series = Series.objects.create(title='series')
+        self.chapter = series.chapters.create(title='chapter', number=1)
+        series.chapters.create(title='other', number=2)
+        ViewCount.objects.add({self.chapter.id: 2})
+
+    @mark.parametrize('name', ('trending', 'most-read'))
+    def test_list(self, name):
+        r = self.client.get(reverse(f'api:v2:chapters-{name}'))
+        assert r.status_code == 200
+        results = r.json()['results']
+        assert [c['id'] for c in results] == [self.chapter.id]
+        assert results[0]['recent_views'] == 2
+
+    def test_invalid_days(self):
+        url = reverse('api:v2:chapters-trending')
+        assert self.client.get(url, {'days': 'x'}).status_code == 400
+        assert self.client.get(url, {'days': 0}).status_code == 400
@@ -8,7 +8,6 @@ from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Count, Q
 from django.http import JsonResponse
-from django.utils import timezone as tz
 from django.utils.http import http_date
 from django.views.decorators.cache import cache_control
 from django.views.decorators.http import last_modified
@@ -16,6 +15,7 @@ from django.views.decorators.http import last_modified
 from MangAdventure.search import get_response
 
 from groups.models import Group, Member
+from reader import lastmod
 from reader.models import Artist, Author, Category, Chapter, Series, Status
 
 from .response import JsonError, deprecate_api, require_methods_api
@@ -30,27 +30,9 @@ if TYPE_CHECKING:  # pragma: no cover
 def _latest(request: HttpRequest, slug: Optional[str] = None,
             vol: Optional[int] = None, num: Optional[float] = None
             ) -> Optional[datetime]:
-    try:
-        if slug is None:
-            q = Q(chapters__published__lte=tz.now())
-            return Series.objects.only('modified').alias(
-                chapter_count=Count('chapters', filter=q)
-            ).filter(chapter_count__gt=0).latest().modified
-        if vol is None:
-            return Series.objects.only('modified').filter(
-                chapters__published__lte=tz.now(), slug=slug
-            ).distinct().get().modified
-        if num is None:
-            return Chapter.objects.only('modified').filter(
-                series__slug=slug, volume=vol or None,
-                published__lte=tz.now()
-            ).latest().modified
-        return Chapter.objects.only('modified').filter(
-            series__slug=slug, volume=vol or None,
-            number=num, published__lte=tz.now()
-        ).latest().modified
-    except ObjectDoesNotExist:
-        return None
+    if slug is None:
+        return lastmod.site_modified()
+    return lastmod.series_modified(slug, vol, num)
 
 
 def _chapter_response(request: HttpRequest, _chapter: Chapter) -> Dict:
@@ -91,7 +73,7 @@ def _series_response(request: HttpRequest, _series: Series) -> Dict:
         'completed': _series.status in (Status.COMPLETED, Status.CANCELED),
         'volumes': {},
     }
-    chapters = _series.chapters.filter(published__lte=tz.now())
+    chapters = _series.chapters.filter(released=True)
     for _chapter in chapters:
         if _chapter.volume not in response['volumes']:
             response['volumes'][_chapter.volume] = _volume_response(
@@ -150,7 +132,7 @@ def _group_response(request: HttpRequest, _group: Group) -> Dict:
     }
     _series = []
     for _chapter in _group.releases.prefetch_related('series__aliases') \
-            .filter(published__lte=tz.now()).all():
+            .filter(released=True).all():
         if _chapter.series_id not in _series:
             response['series'].append({
                 'slug': _chapter.series.slug,
@@ -174,7 +156,7 @@ def all_releases(request: HttpRequest) -> JsonResponse:
     :return: A JSON-formatted response with the releases.
     """
     response = []
-    q = Q(chapters__published__lte=tz.now())
+    q = Q(chapters__released=True)
     _series = Series.objects.alias(
         chapter_count=Count('chapters', filter=q)
     ).filter(chapter_count__gt=0).distinct()
@@ -258,7 +240,7 @@ def volume(request: HttpRequest, slug: str, vol: int) -> JsonResponse:
     except ObjectDoesNotExist:
         return JsonError('Not found', 404)
     chapters = _series.chapters.filter(
-        volume=vol or None, published__lte=tz.now()
+        volume=vol or None, released=True
     )
     if not chapters:
         return JsonError('Not found', 404)
@@ -284,7 +266,7 @@ def chapter(request: HttpRequest, slug: str,
     try:
         _chapter = Chapter.objects.prefetch_related('pages').get(
             series__slug=slug, volume=vol or None,
-            number=num, published__lte=tz.now()
+            number=num, released=True
         )
     except ObjectDoesNotExist:
         return JsonError('Not found', 404)
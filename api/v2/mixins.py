@@ -1,7 +1,13 @@
 """API mixin classes."""
 
-from functools import wraps
-from typing import Callable, Dict
+from functools import partial, wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+
+from MangAdventure.cache import get_or_compute, tag_versions
+from MangAdventure.etags import make_etag, queryset_etag
 
 
 class CORSMixin:
@@ -37,7 +43,123 @@ class CORSMixin:
         return inner
 
 
+class ETagMixin:
+    """
+    Mixin that answers conditional requests for
+    lists & details with :status:`304` responses.
+
+    The entity tags are derived from the filtered rows and the
+    versions of their cache tags, so they are checked without
+    serializing anything, and they are cached until the rows
+    are modified or the tags are invalidated. The related rows
+    invalidate the tags of the rows they belong to.
+
+    Only the query parameters used by the filters and the
+    pagination of the view are part of the tags, so other
+    parameters don't create more cache entries.
+    """
+
+    #: The date fields the responses depend on.
+    etag_fields: Tuple[str, ...] = ('modified',)
+
+    #: The numeric fields the responses depend on.
+    #: The ``views`` tag is also used if there are any,
+    #: since the view counters only invalidate that one.
+    etag_totals: Tuple[str, ...] = ()
+
+    #: The cache tags of the lists.
+    etag_tags: Tuple[str, ...] = ('library',)
+
+    #: The cache tag of a single object,
+    #: formatted with the value of its lookup field.
+    etag_tag: Optional[str] = None
+
+    #: The maximum number of seconds the entity tags are cached for.
+    etag_timeout = 86400
+
+    def get_etag_timeout(self) -> int:
+        """
+        Get the number of seconds the entity tag can be cached for.
+
+        :return: The value of :attr:`etag_timeout`.
+        """
+        return self.etag_timeout
+
+    def get_etag(self, request) -> Optional[str]:
+        """
+        Get the entity tag of the response.
+
+        :param request: The original request.
+
+        :return: A weak tag, or ``None`` if the lookup is invalid.
+        """
+        tags = self.etag_tags
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if self.etag_tag and lookup in self.kwargs:
+            tags = (self.etag_tag.format(self.kwargs[lookup]),)
+        if self.etag_totals:
+            tags += ('views',)
+        parts = (
+            request.path, self._etag_params(request),
+            request.accepted_media_type, request.user.pk
+        )
+        key = make_etag(*parts)
+        return get_or_compute(
+            f'api.etag.{key[1:-1]}',
+            partial(self._compute_etag, parts, tags),
+            lambda _: self.get_etag_timeout(), tags=tags
+        )
+
+    def _etag_params(self, request) -> List[Tuple[str, str]]:
+        names = {
+            param['name'] for backend in self.filter_backends
+            for param in backend().get_schema_operation_parameters(self)
+        }
+        if self.paginator is not None:
+            names.update(
+                param['name'] for param in
+                self.paginator.get_schema_operation_parameters(self)
+            )
+        return sorted(
+            (name, value) for name in names
+            for value in request.query_params.getlist(name)
+        )
+
+    def _compute_etag(self, parts: Tuple,
+                      tags: Tuple[str, ...]) -> Optional[str]:
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            if lookup in self.kwargs:
+                queryset = queryset.filter(**{
+                    self.lookup_field: self.kwargs[lookup]
+                })
+            return queryset_etag(
+                queryset, *parts, tag_versions(*tags),
+                fields=self.etag_fields, totals=self.etag_totals
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def _conditional(self, handler: Callable,
+                     request, *args, **kwargs) -> HttpResponse:
+        if (etag := self.get_etag(request)) is None:
+            return handler(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs) -> HttpResponse:
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs) -> HttpResponse:
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+
 #: The allowed HTTP request methods.
 METHODS = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
-__all__ = ['CORSMixin', 'METHODS']
+__all__ = ['CORSMixin', 'ETagMixin', 'METHODS']
@@ -0,0 +1,85 @@
+"""Page metadata backfill command."""
+
+from __future__ import annotations
+
+from os import cpu_count
+from typing import TYPE_CHECKING, List
+
+from django.core.management import BaseCommand
+from django.db.models import Q
+
+from reader import ingest
+from reader.models import Chapter, Page
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+_FIELDS = ingest.ImageInfo._fields
+
+
+class Command(BaseCommand):
+    """Command used to store the metadata of existing pages."""
+    help = 'Stores the dimensions, size, type and checksum of page images.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Update the pages that already have metadata.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=cpu_count() or 1,
+            help='The number of processes that read the images.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='The number of pages to update per query.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        pages = Page.objects.order_by('id')
+        if not options['all']:
+            pages = pages.filter(
+                Q(width__isnull=True) | Q(height__isnull=True) |
+                Q(size__isnull=True) | Q(mime_type='') |
+                Q(crc32__isnull=True)
+            )
+        rows = list(pages.values_list('id', 'image', 'chapter_id'))
+        storage = Page.image.field.storage
+        paths = [storage.path(image) for _, image, _ in rows]
+        batch_size = max(int(options['batch_size']), 1)
+        batch, updated, failed = [], 0, 0
+        results = ingest.probe_files(paths, int(options['workers']))
+        for (pk, image, cid), info in zip(rows, results):
+            if info is None:
+                failed += 1
+                self.stderr.write(f'Could not read {image}')
+                continue
+            batch.append(Page(id=pk, chapter_id=cid, **info._asdict()))
+            if len(batch) == batch_size:
+                updated += self._update(batch)
+        if batch:
+            updated += self._update(batch)
+        self.stdout.write(f'Updated {updated} pages ({failed} failed).')
+
+    @staticmethod
+    def _update(batch: List[Page]) -> int:
+        updated = Page.objects.bulk_update(batch, _FIELDS)
+        Chapter.objects.filter(
+            id__in={p.chapter_id for p in batch}
+        ).invalidate()
+        batch.clear()
+        return updated
+
+
+__all__ = ['Command']
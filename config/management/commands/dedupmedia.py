@@ -0,0 +1,80 @@
+"""Page deduplication command."""
+
+from __future__ import annotations
+
+from os import link
+from pathlib import Path
+from typing import TYPE_CHECKING, Set
+
+from django.core.management import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from reader import ingest
+from reader.models import Page
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+
+class Command(BaseCommand):
+    """Command used to move existing pages to the shared store."""
+    help = 'Deduplicates page images using the shared store.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how much disk space would be saved.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        dry_run = options['dry_run']
+        storage = Page.image.field.storage
+        names = Page.objects.order_by().values_list('image', flat=True)
+        planned: Set[Path] = set()
+        scanned = linked = saved = 0
+        for name in names.distinct().iterator():
+            file = Path(storage.path(name))
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                self.stderr.write(f'Missing file: {name}')
+                continue
+            scanned += 1
+            digest = ingest.file_digest(file)
+            shared = ingest.store_path(digest + file.suffix)
+            if shared.exists() and shared.samefile(file):
+                continue
+            if shared in planned or shared.exists():
+                if not dry_run:
+                    tmp = file.with_name(f'.{file.name}.link')
+                    link(shared, tmp)
+                    tmp.replace(file)
+                linked += 1
+                # the space is only freed when the last link is removed
+                if stat.st_nlink == 1:
+                    saved += stat.st_size
+            elif dry_run:
+                planned.add(shared)
+            else:
+                shared.parent.mkdir(parents=True, exist_ok=True)
+                link(file, shared)
+        removed = ingest.collect()[1] if not dry_run else 0
+        verb = 'would be' if dry_run else 'were'
+        self.stdout.write(
+            f'Scanned {scanned} files: {linked} duplicates {verb} '
+            f'linked, saving {filesizeformat(saved + removed)}.'
+        )
+
+
+__all__ = ['Command']
@@ -0,0 +1,129 @@
+"""Page variant encoding command."""
+
+from __future__ import annotations
+
+from itertools import groupby
+from operator import itemgetter
+from os import cpu_count
+from typing import TYPE_CHECKING, List
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from reader import ingest
+from reader.models import Chapter, Page
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+
+class Command(BaseCommand):
+    """Command used to encode the variants of existing pages."""
+    help = 'Converts pages to smaller formats and reports the bytes saved.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            '--report', action='store_true',
+            help='Only report the bytes saved per chapter.'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Update the pages that already have variants.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=cpu_count() or 1,
+            help='The number of processes that encode the images.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='The number of pages to update per query.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        if not options['report']:
+            self._encode(
+                bool(options['all']), int(options['workers']),
+                max(int(options['batch_size']), 1)
+            )
+        self._report()
+
+    def _encode(self, update_all: bool, workers: int, batch_size: int):
+        if not settings.CONFIG['PAGE_VARIANTS']:
+            self.stderr.write('No page variants are enabled.')
+            return
+        pages = Page.objects.order_by('id')
+        if not update_all:
+            # skip the pages that were already tried with these formats
+            formats = ','.join(settings.CONFIG['PAGE_VARIANTS'])
+            pages = pages.exclude(variant_formats=formats)
+        rows = list(pages.values_list('id', 'image', 'chapter_id'))
+        storage = Page.image.field.storage
+        paths = [storage.path(image) for _, image, _ in rows]
+        batch, updated, failed = [], 0, 0
+        results = ingest.encode_files(paths, workers)
+        for (pk, image, cid), variants in zip(rows, results):
+            if variants is None:
+                failed += 1
+                self.stderr.write(f'Could not encode {image}')
+                continue
+            batch.append(Page(id=pk, chapter_id=cid, **variants._asdict()))
+            if len(batch) == batch_size:
+                updated += self._update(batch)
+        if batch:
+            updated += self._update(batch)
+        self.stdout.write(f'Encoded {updated} pages ({failed} failed).')
+
+    @staticmethod
+    def _update(batch: List[Page]) -> int:
+        updated = Page.objects.bulk_update(batch, ingest.Variants._fields)
+        Chapter.objects.filter(
+            id__in={p.chapter_id for p in batch}
+        ).invalidate()
+        batch.clear()
+        return updated
+
+    def _report(self):
+        rows = Page.objects.order_by('chapter_id').values_list(
+            'chapter_id', 'size', 'webp_size', 'avif_size'
+        )
+        totals = {}
+        for cid, group in groupby(rows.iterator(), itemgetter(0)):
+            original = smallest = 0
+            for _, size, *variants in group:
+                size = size or 0
+                original += size
+                smallest += min((v for v in variants if v), default=size)
+            totals[cid] = (original, smallest)
+        chapters = Chapter.objects.select_related('series').in_bulk(totals)
+        original = smallest = 0
+        for cid, (size, best) in totals.items():
+            original += size
+            smallest += best
+            self.stdout.write(
+                f'- {chapters[cid]}: {filesizeformat(size)} -> '
+                f'{filesizeformat(best)} ({self._saved(size, best)})'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Total: {filesizeformat(original)} -> '
+            f'{filesizeformat(smallest)} ({self._saved(original, smallest)})'
+        ))
+
+    @staticmethod
+    def _saved(size: int, best: int) -> str:
+        percent = (size - best) / size * 100 if size else 0
+        return f'saved {filesizeformat(size - best)}, {percent:.1f}%'
+
+
+__all__ = ['Command']
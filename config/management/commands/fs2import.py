@@ -2,22 +2,42 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
-from os.path import abspath, join
-from typing import TYPE_CHECKING, List
+from os.path import abspath, basename, join
+from typing import (
+    TYPE_CHECKING, Dict, Iterable, Iterator, List, Set, Tuple, Type, TypeVar
+)
 
 from django.core.files import File
 from django.core.management import BaseCommand, CommandError, call_command
 from django.db.utils import IntegrityError
 
-from defusedxml import ElementTree as ET
+from defusedxml.ElementTree import iterparse
 
 from groups.models import Group
+from reader import ingest
 from reader.models import Chapter, Page, Series
 
 if TYPE_CHECKING:  # pragma: no cover
     from argparse import ArgumentParser
     from xml.etree.ElementTree import Element
+    from django.db.models import Model  # isort:skip
+
+#: The columns that are read from each table.
+_COLUMNS = {
+    'teams': ('id', 'name', 'url', 'twitter', 'irc'),
+    'comics': ('id', 'name', 'stub', 'uniqid', 'description', 'thumbnail'),
+    'chapters': (
+        'id', 'comic_id', 'team_id', 'chapter', 'subchapter',
+        'volume', 'name', 'stub', 'uniqid'
+    ),
+    'pages': ('id', 'chapter_id', 'filename')
+}
+
+_Rows = Iterator[Dict[str, str]]
+
+_T = TypeVar('_T')
 
 
 class Command(BaseCommand):
@@ -42,6 +62,18 @@ class Command(BaseCommand):
             '--noinput', '--no-input', action='store_true',
             help='Do NOT prompt the user for input of any kind.'
         )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Keep the existing data and skip the imported rows.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='The number of threads that copy the page files.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='The number of rows to insert per query.'
+        )
 
     def handle(self, *args: str, **options: str):
         """
@@ -53,148 +85,204 @@ class Command(BaseCommand):
         call_command('migrate', stdout=StringIO())  # Set up database
         root = abspath(options['root'])
         data = abspath(options['data'])
-        tables = ET.parse(data).findall('database/table')
+        self._resume = bool(options['resume'])
+        self._workers = max(int(options['workers']), 1)
+        self._batch_size = max(int(options['batch_size']), 1)
+        self._data = data
         content = join(root, 'content', 'comics')
-        directories = {'series': [], 'chapters': []}  # type: dict
-        elements = {
-            'series': self._get_element(tables, 'comics'),
-            'chapters': self._get_element(tables, 'chapters'),
-            'pages': self._get_element(tables, 'pages'),
-            'groups': self._get_element(tables, 'teams')
-        }
-
-        if not options['noinput']:  # pragma: no cover
-            self._print_warning(
-                'Importing FoolSlide2 data requires an empty database.\n'
-                'This command will wipe any existing data in the database.\n'
-                'Are you sure you want to proceed?\n'
-            )
-            answer = input("    Type 'yes' to continue, or 'no' to cancel: ")
-            if answer.lower() != 'yes':
-                self._print('Import cancelled.')
-                return
-        call_command('flush', '--no-input')
 
+        if not self._resume:
+            if not options['noinput']:  # pragma: no cover
+                self._print_warning(
+                    'Importing FoolSlide2 data requires an empty database.\n'
+                    'This command will wipe any existing data in the '
+                    'database.\nAre you sure you want to proceed?\n'
+                )
+                answer = input(
+                    "    Type 'yes' to continue, or 'no' to cancel: "
+                )
+                if answer.lower() != 'yes':
+                    self._print('Import cancelled.')
+                    return
+            call_command('flush', '--no-input')
+
+        self._import_groups(self._parse('teams'))
+        series = self._import_series(self._parse('comics'), content)
+        chapters = self._import_chapters(self._parse('chapters'), series)
+        self._import_pages(self._parse('pages'), chapters)
+        self._print_success('Successfully imported FoolSlide2 data.')
+
+    def _import_groups(self, rows: _Rows):
         self._print(f'Importing {self._sql_name("Groups")}...')
-        all_groups = []
-        for g in elements['groups']:
-            group = Group(
-                id=self._get_column(g, 'id'),
-                name=self._get_column(g, 'name'),
-                website=self._get_column(g, 'url'),
-                twitter=self._get_column(g, 'twitter'),
-                irc=self._get_column(g, 'irc')
-            )
-            self._print(f'- Found {self._sql_name("Group")}: {group}')
-            all_groups.append(group)
-        try:
-            Group.objects.bulk_create(all_groups)
-            self._print_success('Groups successfully imported.')
-        except IntegrityError as e:  # pragma: no cover
-            raise CommandError('Failed to insert groups') from e
+        skip = self._existing(Group)
 
+        def groups() -> Iterator[Group]:
+            for g in rows:
+                if int(g['id']) in skip:
+                    continue
+                group = Group(
+                    id=int(g['id']), name=g['name'], website=g['url'],
+                    twitter=g['twitter'], irc=g['irc']
+                )
+                self._print(f'- Found {self._sql_name("Group")}: {group}')
+                yield group
+
+        for batch in self._batched(groups()):
+            self._insert(Group, batch, 'groups')
+        self._print_success('Groups successfully imported.')
+
+    def _import_series(self, rows: _Rows,
+                       content: str) -> Dict[int, Tuple[str, str]]:
         self._print(f'Importing {self._sql_name("Series")}...')
-        all_series = []
-        for s in elements['series']:
-            slug = self._get_column(s, 'stub')
-            series = Series(
-                id=self._get_column(s, 'id'), slug=slug,
-                title=self._get_column(s, 'name'),
-                description=self._get_column(s, 'description'),
-            )
-            self._print(f'- Found {self._sql_name("Series")}: {series}')
-            thumb = self._get_column(s, 'thumbnail')
-            series_dir = join(
-                content, f'{slug}_{self._get_column(s, "uniqid")}'
-            )
-            cover = join(series_dir, thumb)
-            with open(cover, 'rb') as f:
-                series.cover.save(thumb, File(f), save=False)
-            all_series.append(series)
-            directories['series'].append(
-                (self._get_column(s, 'id'), series_dir)
-            )
-        try:
-            Series.objects.bulk_create(all_series)
-            self._print_success('Series successfully imported.')
-        except IntegrityError as e:  # pragma: no cover
-            raise CommandError('Failed to insert series') from e
+        skip = self._existing(Series)
+        series_info = {}
 
+        def series() -> Iterator[Series]:
+            for s in rows:
+                sid = int(s['id'])
+                series_dir = join(content, f'{s["stub"]}_{s["uniqid"]}')
+                series_info[sid] = (s['name'], series_dir)
+                if sid in skip:
+                    continue
+                obj = Series(
+                    id=sid, slug=s['stub'], title=s['name'],
+                    description=s['description']
+                )
+                self._print(f'- Found {self._sql_name("Series")}: {obj}')
+                thumb = s['thumbnail']
+                with open(join(series_dir, thumb), 'rb') as f:
+                    obj.cover.save(thumb, File(f), save=False)
+                yield obj
+
+        for batch in self._batched(series()):
+            self._insert(Series, batch, 'series')
+        self._print_success('Series successfully imported.')
+        return series_info
+
+    def _import_chapters(self, rows: _Rows, series:
+                         Dict[int, Tuple[str, str]]) -> Dict[int, str]:
         self._print(f'Importing {self._sql_name("Chapters")}...')
-        all_chapters = []
-        chapter_groups = []
+        skip = self._existing(Chapter)
+        chapter_dirs = {}
         groups_through = Chapter.groups.through
-        for c in elements['chapters']:
-            cid = self._get_column(c, 'id')
-            sid = self._get_column(c, 'comic_id')
-            number = float('{chapter}.{subchapter}'.format(
-                chapter=self._get_column(c, 'chapter') or '0',
-                subchapter=self._get_column(c, 'subchapter') or '0'
-            ))
-            volume = int(self._get_column(c, 'volume') or '0')
-            chapter = Chapter(
-                id=cid, series_id=sid,
-                title=self._get_column(c, 'name'),
-                volume=volume or None, number=number
-            )
-            self._print(
-                f'- Found {self._sql_name("Chapter")}: {chapter.series} '
-                f'- {chapter.volume}/{chapter.number:g} - {chapter.title}'
-            )
-            if gid := self._get_column(c, 'team_id'):
-                chapter_groups.append(
-                    groups_through(chapter_id=cid, group_id=gid)
+
+        def chapters() -> Iterator[Tuple[Chapter, List[Model]]]:
+            for c in rows:
+                cid, sid = int(c['id']), int(c['comic_id'])
+                title, series_dir = series[sid]
+                chapter_dirs[cid] = join(
+                    series_dir, f'{c["stub"]}_{c["uniqid"]}'
                 )
-            dir_ = next(d[1] for d in directories['series'] if d[0] == sid)
-            directories['chapters'].append((
-                cid, join(dir_, '{stub}_{uniqid}'.format(
-                    stub=self._get_column(c, 'stub'),
-                    uniqid=self._get_column(c, 'uniqid')
+                if cid in skip:
+                    continue
+                number = float('{chapter}.{subchapter}'.format(
+                    chapter=c['chapter'] or '0',
+                    subchapter=c['subchapter'] or '0'
                 ))
-            ))
-            all_chapters.append(chapter)
-        try:
-            Chapter.objects.bulk_create(all_chapters)
-            groups_through.objects.bulk_create(chapter_groups)  # type: ignore
-            self._print_success('Chapters successfully imported.')
-        except IntegrityError as e:  # pragma: no cover
-            raise CommandError('Failed to insert chapters') from e
+                volume = int(c['volume'] or '0')
+                chapter = Chapter(
+                    id=cid, series_id=sid, title=c['name'],
+                    volume=volume or None, number=number
+                )
+                self._print(
+                    f'- Found {self._sql_name("Chapter")}: {title} - '
+                    f'{chapter.volume}/{chapter.number:g} - {chapter.title}'
+                )
+                gid = c['team_id']
+                yield chapter, [
+                    groups_through(chapter_id=cid, group_id=int(gid))
+                ] if gid else []
+
+        for batch in self._batched(chapters()):
+            self._insert(Chapter, [c for c, _ in batch], 'chapters')
+            self._insert(groups_through, [
+                g for _, groups in batch for g in groups
+            ], 'chapter groups')
+        self._print_success('Chapters successfully imported.')
+        return chapter_dirs
 
+    def _import_pages(self, rows: _Rows, chapters: Dict[int, str]):
         self._print(f'Importing {self._sql_name("Pages")}...')
-        all_pages = []
-        page_numbers = {}  # type: dict
-        for p in self._sort_children(elements['pages'], 'filename'):
-            pid = self._get_column(p, 'id')
-            cid = self._get_column(p, 'chapter_id')
-            page_numbers[cid] = page_numbers.get(cid, 0) + 1
-            page = Page(id=pid, chapter_id=cid, number=page_numbers[cid])
-            self._print(f'- Found {self._sql_name("Page")}: {page}')
-            dir_ = next(d[1] for d in directories['chapters'] if d[0] == cid)
-            fname = self._get_column(p, 'filename')
-            with open(join(dir_, fname), 'rb') as f:
-                page.image.save(fname, File(f), save=False)
-            all_pages.append(page)
-        try:
-            Page.objects.bulk_create(all_pages)
-            self._print_success('Chapter pages successfully imported.')
-        except IntegrityError as e:  # pragma: no cover
-            raise CommandError('Failed to insert pages') from e
-        self._print_success('Successfully imported FoolSlide2 data.')
+        skip = self._existing(Page)
+        # only the file names are kept, to number the pages in order
+        files: Dict[int, List[Tuple[str, int]]] = {}
+        for p in rows:
+            cid, pid = int(p['chapter_id']), int(p['id'])
+            if cid not in chapters:  # pragma: no cover
+                self._print_warning(f'- Skipped orphan page: {pid}')
+                continue
+            files.setdefault(cid, []).append((p['filename'], pid))
+        total = sum(
+            pid not in skip for names in files.values() for _, pid in names
+        )
 
-    @staticmethod
-    def _get_element(tables: List[Element], name: str) -> List[Element]:
-        return list(filter(
-            lambda t: t.attrib['name'].endswith(name), tables
-        ))
+        def pages() -> Iterator[Tuple[Page, str]]:
+            for cid, names in files.items():
+                for number, (name, pid) in enumerate(sorted(names), 1):
+                    if pid in skip:
+                        continue
+                    page = Page(id=pid, chapter_id=cid, number=number)
+                    yield page, join(chapters[cid], name)
 
-    @staticmethod
-    def _get_column(table: Element, name: str) -> str:
-        elem = table.find(f'column[@name="{name}"]')
-        return getattr(elem, 'text', None) or ''
+        done = 0
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            for batch in self._batched(pages()):
+                self._insert(Page, list(
+                    pool.map(self._copy_page, batch)
+                ), 'pages')
+                done += len(batch)
+                self._print(f'- Imported {done}/{total} pages')
+        self._print_success('Chapter pages successfully imported.')
 
     @staticmethod
-    def _sort_children(tables: List[Element], name: str) -> List[Element]:
-        return sorted(tables, key=lambda p: Command._get_column(p, name))
+    def _copy_page(item: Tuple[Page, str]) -> Page:
+        page, src = item
+        with open(src, 'rb') as f:
+            page.width, page.height, page.mime_type = ingest.probe(f)
+            f.seek(0)
+            page.image.save(basename(src), File(f), save=False)
+            page.size = page.image.size
+        return page
+
+    def _parse(self, table: str) -> _Rows:
+        columns = _COLUMNS[table]
+        parents: List[Element] = []
+        for event, elem in iterparse(self._data, ('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                continue
+            parents.pop()
+            # the schema tables are namespaced
+            if elem.tag != 'table':
+                continue
+            if elem.attrib.get('name', '').endswith(table):
+                values = {c.attrib['name']: c.text for c in elem}
+                yield {col: values.get(col) or '' for col in columns}
+            # drop the parsed rows so that the tree doesn't grow
+            parents[-1].clear()
+
+    def _batched(self, objs: Iterable[_T]) -> Iterator[List[_T]]:
+        batch: List[_T] = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) == self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _existing(self, model: Type[Model]) -> Set[int]:
+        if not self._resume:
+            return set()
+        return set(model.objects.values_list('id', flat=True))
+
+    def _insert(self, model: Type[Model], objs: List[Model], label: str):
+        if not objs:
+            return
+        try:
+            model.objects.bulk_create(objs)
+        except IntegrityError as e:  # pragma: no cover
+            raise CommandError(f'Failed to insert {label}') from e
 
     def _print(self, text: str, **kwargs):
         self.stdout.write(text, **kwargs)
@@ -0,0 +1,211 @@
+"""Chapter archive importer."""
+
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from re import IGNORECASE, compile as regex
+from shutil import rmtree
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.management import BaseCommand, CommandError
+from django.db import close_old_connections, transaction
+from django.template.defaultfilters import filesizeformat
+from django.utils.text import slugify
+
+from MangAdventure.utils import natsort
+
+from reader import ingest
+from reader.models import Chapter, Series
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+_EXTENSIONS = ('.cbz', '.zip')
+
+_VOLUME_RE = regex(r'^vol(?:ume)?\.?\s*(\d+)$', IGNORECASE)
+
+_CHAPTER_RE = regex(
+    r'^(?:ch(?:apter)?\.?\s*)?(\d+(?:\.\d+)?)\s*(?:[-:_]\s*)?(.*)$',
+    IGNORECASE
+)
+
+
+class _Archive(NamedTuple):
+    path: Path
+    series: str
+    slug: str
+    volume: Optional[int]
+    number: float
+    title: str
+
+
+class Command(BaseCommand):
+    """Command used to import a directory of chapter archives."""
+    help = 'Imports chapters from a directory of zip/cbz archives.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            'root', type=str, help=(
+                'The path to the directory of the archives. '
+                'They must be laid out as "Series/Vol N/Ch M.cbz" '
+                'or "Series/Ch M.cbz" if the series has no volumes.'
+            )
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.CONFIG['INGEST_WORKERS'],
+            help='The number of archives to import concurrently.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        root = Path(options['root']).resolve()
+        if not root.is_dir():
+            raise CommandError(f'{root} is not a directory.')
+        archives = list(self._scan(root))
+        workers = max(int(options['workers']), 1)
+        # the series are created by the first archive that is imported
+        func = partial(self._import, {}, Lock(), workers > 1)
+        counts: Counter = Counter()
+        pages = size = 0
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # import archives in this thread if there's a single worker
+            run = pool.map if workers > 1 else map
+            for archive, (status, result) in zip(archives, run(func, archives)):
+                counts[status] += 1
+                name = archive.path.relative_to(root)
+                if status == 'failed':
+                    self.stderr.write(f'- Failed {name}: {result}')
+                elif status == 'imported':
+                    pages += int(result)
+                    size += archive.path.stat().st_size
+                    self.stdout.write(f'- Imported {name}')
+        elapsed = max(perf_counter() - start, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {counts["imported"]} archives ({pages} pages, '
+            f'{filesizeformat(size)}), skipped {counts["skipped"]}, '
+            f'failed {counts["failed"]} in {elapsed:.2f}s.'
+        ))
+        self.stdout.write(
+            f'Throughput: {counts["imported"] / elapsed:.1f} archives/s, '
+            f'{pages / elapsed:.1f} pages/s, '
+            f'{filesizeformat(size / elapsed)}/s.'
+        )
+
+    def _scan(self, root: Path) -> Iterator[_Archive]:
+        seen = set()
+        slugs: Dict[str, str] = {}
+        files = natsort(str(f) for f in root.rglob('*'))
+        for file in map(Path, files):
+            if file.suffix.lower() not in _EXTENSIONS or not file.is_file():
+                continue
+            rel = file.relative_to(root)
+            if len(rel.parts) < 2 or not (
+                match := _CHAPTER_RE.match(file.stem)
+            ):
+                self.stderr.write(f'- Skipped {rel}: unknown layout')
+                continue
+            slug = slugify(rel.parts[0])
+            if slugs.setdefault(slug, rel.parts[0]) != rel.parts[0]:
+                self.stderr.write(
+                    f'- Skipped {rel}: the slug "{slug}" is'
+                    f' already used by {slugs[slug]}'
+                )
+                continue
+            volume = None
+            for part in rel.parts[1:-1]:
+                if vol := _VOLUME_RE.match(part):
+                    volume = int(vol[1]) or None
+            number = float(match[1])
+            key = (rel.parts[0], volume, number)
+            if key in seen:
+                self.stderr.write(f'- Skipped {rel}: duplicate chapter')
+                continue
+            seen.add(key)
+            title = match[2].strip() or f'Chapter {number:g}'
+            yield _Archive(
+                file, rel.parts[0], slug, volume, number, title
+            )
+
+    @staticmethod
+    def _get_series(cache: Dict[str, Series], lock: Lock,
+                    archive: _Archive) -> Series:
+        with lock:
+            if archive.slug not in cache:
+                cache[archive.slug] = Series.objects.get_or_create(
+                    slug=archive.slug, defaults={'title': archive.series}
+                )[0]
+            return cache[archive.slug]
+
+    @classmethod
+    def _import(cls, series: Dict[str, Series], lock: Lock,
+                threaded: bool, archive: _Archive) -> Tuple[str, object]:
+        try:
+            chapter = Chapter.objects.filter(
+                series__slug=archive.slug,
+                volume=archive.volume, number=archive.number
+            ).first()
+            with open(archive.path, 'rb') as f:
+                file = File(f)
+                if chapter is not None:
+                    current = [p._file_name for p in chapter.pages.all()]
+                    # skip archives that have already been imported
+                    if current == ingest.page_names(file):
+                        return 'skipped', 0
+                    file.seek(0)
+                # the staged directory is removed along with the file
+                staged = ingest.stage(file)
+                if chapter is None:
+                    chapter = Chapter(
+                        series=cls._get_series(series, lock, archive),
+                        title=archive.title,
+                        volume=archive.volume, number=archive.number
+                    )
+                cls._replace(chapter, staged)
+            return 'imported', len(staged.pages)
+        except ValidationError as exc:
+            return 'failed', ' '.join(exc.messages)
+        except Exception as exc:
+            return 'failed', exc
+        finally:
+            if threaded:
+                close_old_connections()
+
+    @staticmethod
+    def _replace(chapter: Chapter, staged: ingest.Staged):
+        created = chapter.pk is None
+        try:
+            # a new chapter is only kept if its pages are saved
+            with transaction.atomic():
+                if created:
+                    chapter.save()
+                chapter.replace_pages(staged)
+        except Exception:
+            if created:
+                rmtree(
+                    settings.MEDIA_ROOT / chapter.get_directory(),
+                    ignore_errors=True
+                )
+            raise
+
+
+__all__ = ['Command']
@@ -0,0 +1,81 @@
+"""Chapter ingestion command."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from reader import ingest
+from reader.models import IngestJob, IngestStatus
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+
+class Command(BaseCommand):
+    """Command used to process the chapter ingestion queue."""
+    help = 'Processes uploaded chapter archives.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when there are no pending jobs.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='The number of seconds to wait for new jobs.'
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.CONFIG['INGEST_WORKERS'],
+            help='The number of jobs to process concurrently.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        workers = max(int(options['workers']), 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # process jobs in this thread if there's a single worker
+            run = pool.map if workers > 1 else map
+            ingest.recover()
+            while True:
+                pending = list(IngestJob.objects.filter(
+                    status=IngestStatus.PENDING
+                ).values_list('pk', flat=True)[:workers * 4])
+                if not pending:
+                    if options['once']:
+                        break
+                    sleep(float(options['interval']))
+                    # requeue the jobs of crashed workers
+                    ingest.recover()
+                    continue
+                func = ingest.run if workers > 1 else ingest.process
+                for job_id, claimed in zip(pending, run(func, pending)):
+                    if claimed:
+                        self._report(job_id)
+
+    def _report(self, job_id: int):
+        job = IngestJob.objects.select_related('chapter__series').get(
+            pk=job_id
+        )
+        if job.status == IngestStatus.FAILED:
+            self.stderr.write(f'{job.chapter}: {job.error}')
+        else:
+            self.stdout.write(f'{job.chapter}: {job.get_status_display()}')
+
+
+__all__ = ['Command']
@@ -0,0 +1,52 @@
+"""Series statistics rebuild command."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reader.models import Series, SeriesStats
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+
+class Command(BaseCommand):
+    """Command used to rebuild the statistics of the series."""
+    help = 'Recomputes the denormalized statistics of the series.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            'slugs', nargs='*', metavar='slug',
+            help='The slugs of the series. Defaults to all series.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        ids = ()
+        if slugs := options['slugs']:
+            ids = tuple(Series.objects.filter(
+                slug__in=slugs
+            ).values_list('id', flat=True))
+            if not ids:
+                raise CommandError('No matching series found.')
+        with transaction.atomic():
+            count = SeriesStats.objects.refresh(*ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the statistics of {count} series.'
+        ))
+
+
+__all__ = ['Command']
@@ -0,0 +1,23 @@
+"""Scheduled chapter release command."""
+
+from django.core.management import BaseCommand
+
+from reader.models import Chapter
+
+
+class Command(BaseCommand):
+    """Command used to release the scheduled chapters."""
+    help = 'Releases the chapters whose publication date has passed.'
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        count = Chapter.objects.release()
+        self.stdout.write(self.style.SUCCESS(f'Released {count} chapters.'))
+
+
+__all__ = ['Command']
@@ -0,0 +1,74 @@
+"""Chapter view statistics rollup command."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING, Dict
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone as tz
+
+from reader.models import ViewCount, ViewPeriod
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+    from datetime import date
+
+
+class Command(BaseCommand):
+    """Command used to roll up and prune the chapter view statistics."""
+    help = 'Rolls up old daily chapter views into weekly & monthly buckets.'
+
+    def add_arguments(self, parser: ArgumentParser):
+        """
+        Add arguments to the command.
+
+        :param parser: An ``ArgumentParser`` instance.
+        """
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='The number of days to keep the daily buckets for.'
+        )
+        parser.add_argument(
+            '--weeks', type=int, default=52,
+            help='The number of weeks to keep the weekly buckets for.'
+        )
+
+    def handle(self, *args: str, **options: str):
+        """
+        Execute the command.
+
+        :param args: The arguments of the command.
+        :param options: The options of the command.
+        """
+        today = tz.localdate()
+        days = today - timedelta(days=max(int(options['days']), 1))
+        weeks = today - timedelta(weeks=max(int(options['weeks']), 1))
+        daily = ViewCount.objects.filter(period=ViewPeriod.DAY, date__lt=days)
+        with transaction.atomic():
+            rolled = daily.count()
+            for period, trunc in (
+                (ViewPeriod.WEEK, TruncWeek),
+                (ViewPeriod.MONTH, TruncMonth)
+            ):
+                buckets: Dict[date, Dict[int, int]] = {}
+                for row in daily.values('chapter_id', bucket=trunc('date')) \
+                        .annotate(total=Sum('views')).order_by():
+                    bucket = buckets.setdefault(row['bucket'], {})
+                    bucket[row['chapter_id']] = row['total']
+                for start, deltas in buckets.items():
+                    ViewCount.objects.add(deltas, period, start)
+            daily.delete()
+            pruned, _ = ViewCount.objects.filter(
+                period=ViewPeriod.WEEK, date__lt=weeks
+            ).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {rolled} daily buckets, '
+            f'pruned {pruned} weekly buckets.'
+        ))
+
+
+__all__ = ['Command']
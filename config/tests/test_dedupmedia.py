@@ -0,0 +1,35 @@
+from io import StringIO
+from os.path import samefile
+
+from django.core.management import call_command
+
+from MangAdventure.tests.utils import get_multi_page_zip
+
+from reader import ingest
+from reader.models import Chapter, Series
+
+from . import ConfigTestBase
+
+
+class TestDedupMedia(ConfigTestBase):
+    def test_dedup(self):
+        series = Series.objects.create(title='Series')
+        for number in (1, 2):
+            chapter = Chapter(series=series, number=number, title='Chapter')
+            chapter.file = get_multi_page_zip(2)
+            chapter.save()
+        page1, page2 = (c.pages.first() for c in series.chapters.all())
+        out = StringIO()
+        call_command('dedupmedia', '--dry-run', stdout=out)
+        assert '2 duplicates would be linked' in out.getvalue()
+        assert not samefile(page1.image.path, page2.image.path)
+        out = StringIO()
+        call_command('dedupmedia', stdout=out)
+        assert '2 duplicates were linked' in out.getvalue()
+        assert samefile(page1.image.path, page2.image.path)
+        assert samefile(
+            page1.image.path, ingest.store_path(page1._file_name)
+        )
+        out = StringIO()
+        call_command('dedupmedia', stdout=out)
+        assert '0 duplicates were linked' in out.getvalue()
@@ -1,6 +1,7 @@
 from io import StringIO
 from pathlib import Path
 from shutil import rmtree
+from unittest.mock import patch
 
 from django.core.management import call_command
 
@@ -40,6 +41,65 @@ class TestFS2Import(ConfigTestBase):
         assert Series.objects.count() == 1
         assert Chapter.objects.count() == 1
         assert Page.objects.count() == 1
+        page = Page.objects.get()
+        assert (page.width, page.height) == (655, 1002)
+        assert page.mime_type == 'image/jpeg'
+        assert page.size == page.image.size
+
+    def test_fs2_import_resume(self):
+        call_command(
+            'fs2import', str(self.fs2_root),
+            str(self.fs2_xml), '--noinput', stdout=StringIO()
+        )
+        Page.objects.all().delete()
+        out = StringIO()
+        call_command(
+            'fs2import', str(self.fs2_root), str(self.fs2_xml),
+            '--resume', '--batch-size', '1', stdout=out
+        )
+        assert '- Imported 1/1 pages' in out.getvalue()
+        assert 'Found Series' not in out.getvalue()
+        assert Series.objects.count() == 1
+        assert Chapter.objects.count() == 1
+        assert Page.objects.get().number == 1
+
+    def test_backfill_pages(self):
+        call_command(
+            'fs2import', str(self.fs2_root),
+            str(self.fs2_xml), '--noinput', stdout=StringIO()
+        )
+        Page.objects.update(width=None, size=None, mime_type='')
+        out = StringIO()
+        with patch('reader.models.invalidate_tags') as invalidate:
+            call_command('backfillpages', '--workers', '1', stdout=out)
+        assert 'Updated 1 pages (0 failed).' in out.getvalue()
+        page = Page.objects.get()
+        assert f'chapter.{page.chapter_id}' in invalidate.call_args.args
+        assert (page.width, page.height) == (655, 1002)
+        assert page.mime_type == 'image/jpeg'
+        assert page.crc32 is not None
+
+    def test_encode_pages(self):
+        call_command(
+            'fs2import', str(self.fs2_root),
+            str(self.fs2_xml), '--noinput', stdout=StringIO()
+        )
+        out = StringIO()
+        with patch('reader.models.invalidate_tags') as invalidate:
+            call_command('encodepages', '--workers', '1', stdout=out)
+        assert 'Encoded 1 pages (0 failed).' in out.getvalue()
+        page = Page.objects.get()
+        assert 0 < page.webp_size < page.size
+        assert page.variant_formats == 'webp'
+        assert f'chapter.{page.chapter_id}' in invalidate.call_args.args
+        # the pages that were already tried are skipped
+        out = StringIO()
+        call_command('encodepages', '--workers', '1', stdout=out)
+        assert 'Encoded 0 pages (0 failed).' in out.getvalue()
+        out = StringIO()
+        call_command('encodepages', '--report', stdout=out)
+        assert 'Encoded' not in out.getvalue()
+        assert f'- {page.chapter}: ' in out.getvalue()
 
     def teardown_method(self):
         super().teardown_method()
@@ -0,0 +1,61 @@
+from io import StringIO
+from shutil import copyfileobj
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from MangAdventure.tests.utils import (
+    get_multi_page_zip, get_zip_with_invalid_images
+)
+
+from reader.models import Chapter, Series
+
+from . import ConfigTestBase
+
+
+class TestImportArchives(ConfigTestBase):
+    def test_import(self, tmp_path):
+        files = {
+            'My Series/Vol 1/Ch 1.cbz': get_multi_page_zip(2),
+            'My Series/Vol 1/Ch 2 - Title.cbz': get_multi_page_zip(3),
+            'My Series/Vol 2/Chapter 10.5.zip': get_multi_page_zip(1),
+            'Other/3.cbz': get_zip_with_invalid_images(),
+            'My-Series/Ch 4.cbz': get_multi_page_zip(1),
+            'notes.cbz': get_multi_page_zip(1)
+        }
+        for name, src in files.items():
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path / name, 'wb') as dst:
+                copyfileobj(src, dst)
+        out, err = StringIO(), StringIO()
+        call_command('importarchives', str(tmp_path), '--workers', '1',
+                     stdout=out, stderr=err)
+        assert 'Imported 3 archives (6 pages' in out.getvalue()
+        assert 'failed 1' in out.getvalue()
+        assert 'notes.cbz: unknown layout' in err.getvalue()
+        assert '"my-series" is already used by My Series' in err.getvalue()
+        series = Series.objects.get(title='My Series')
+        chapter = series.chapters.get(volume=1, number=2)
+        assert chapter.title == 'Title'
+        assert chapter.pages.count() == 3
+        assert series.chapters.get(volume=2).number == 10.5
+        assert not series.chapters.filter(number=4).exists()
+        # series are only created once one of their archives is imported
+        assert not Series.objects.filter(title='Other').exists()
+        out = StringIO()
+        call_command('importarchives', str(tmp_path), '--workers', '1',
+                     stdout=out, stderr=StringIO())
+        assert 'Imported 0 archives' in out.getvalue()
+        assert 'skipped 3' in out.getvalue()
+
+    def test_import_rollback(self, tmp_path):
+        (tmp_path / 'Series').mkdir()
+        with open(tmp_path / 'Series' / 'Ch 1.cbz', 'wb') as dst:
+            copyfileobj(get_multi_page_zip(2), dst)
+        err = StringIO()
+        with patch.object(Chapter, 'replace_pages', side_effect=OSError):
+            call_command('importarchives', str(tmp_path), '--workers', '1',
+                         stdout=StringIO(), stderr=err)
+        assert 'Failed Series/Ch 1.cbz' in err.getvalue()
+        # the chapter isn't left without pages
+        assert not Chapter.objects.exists()
@@ -7,7 +7,6 @@ from typing import TYPE_CHECKING, Iterable, cast
 from django.conf import settings
 from django.contrib.syndication.views import Feed
 from django.db.models import Prefetch
-from django.utils import timezone as tz
 from django.utils.decorators import method_decorator
 from django.utils.feedgenerator import Atom1Feed
 from django.views.decorators.cache import cache_control
@@ -42,7 +41,7 @@ class GroupRSS(Feed):
             'published', 'modified', 'series__slug',
             'series__title', 'series__format'
         ).select_related('series').filter(
-            published__lte=tz.now(),
+            released=True,
             series__licensed=False
         ).order_by('-published')
         return Group.objects.prefetch_related(
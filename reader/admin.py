@@ -6,8 +6,9 @@ from hashlib import blake2b
 from typing import TYPE_CHECKING, Optional, Tuple, Type
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.contenttypes.admin import GenericStackedInline
-from django.db.models import Q, QuerySet, Sum
+from django.db.models import F, Q, QuerySet
 from django.forms.models import BaseInlineFormSet, ModelForm
 from django.forms.widgets import HiddenInput
 from django.utils import timezone as tz
@@ -15,9 +16,13 @@ from django.utils.safestring import mark_safe
 
 from MangAdventure import filters, utils
 
-from .models import Alias, Artist, Author, Category, Chapter, Page, Series
+from . import ingest
+from .models import (
+    Alias, Artist, Author, Category, Chapter, IngestStatus, Page, Series
+)
 
 if TYPE_CHECKING:  # pragma: no cover
+    from django.core.files import File
     from django.http import HttpRequest
 
 
@@ -32,6 +37,21 @@ class DateFilter(admin.DateFieldListFilter):
         }),)
 
 
+class ChapterChangeList(ChangeList):
+    """
+    Admin changelist of chapters.
+
+    The recent views are only annotated here, so the change
+    form and the other views of the chapters don't join them.
+    """
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        # the ordering may use the annotations, so the root is annotated
+        if 'recent_views' not in self.root_queryset.query.annotations:
+            self.root_queryset = self.root_queryset.with_recent_views(7)
+        return super().get_queryset(request)
+
+
 class PageFormset(BaseInlineFormSet):  # pragma: no cover
     """Formset for :class:`~reader.admin.PageInline`."""
 
@@ -92,15 +112,38 @@ class PageInline(admin.TabularInline):
         return utils.img_tag(obj._thumb, 'preview', height=150)
 
 
+class ChapterForm(ModelForm):
+    """Admin form for :class:`~reader.models.Chapter`."""
+
+    def clean_file(self) -> Optional[File]:
+        """
+        Extract the uploaded archive while the form is validated.
+
+        :return: The uploaded archive.
+
+        .. seealso:: :func:`reader.ingest.prepare`
+        """
+        file = self.cleaned_data.get('file')
+        if file and 'file' in self.changed_data:
+            ingest.prepare(file)
+        return file
+
+    class Meta:
+        model = Chapter
+        fields = '__all__'
+
+
 class ChapterAdmin(admin.ModelAdmin):
     """Admin model for :class:`~reader.models.Chapter`."""
+    form = ChapterForm
     inlines = (PageInline,)
     date_hierarchy = 'published'
     list_display = (
-        'preview', 'title', 'series', 'volume', '_number',
-        'published', 'modified', 'views', 'final'
+        'preview', 'title', 'series', 'volume', '_number', 'published',
+        'modified', 'views', 'recent_views', 'trend', 'final', 'status'
     )
     list_display_links = ('title',)
+    list_select_related = ('series', 'job')
     ordering = ('-modified',)
     sortable_by = (
         'title', 'series', 'volume', 'number',
@@ -123,6 +166,45 @@ class ChapterAdmin(admin.ModelAdmin):
     def _number(self, obj: Chapter) -> str:
         return f'{obj.number:g}'
 
+    @admin.display(ordering='recent_views', description='views (7 days)')
+    def recent_views(self, obj: Chapter) -> int:
+        """
+        Get the views of the chapter in the last week.
+
+        :param obj: A ``Chapter`` model instance.
+
+        :return: The sum of the chapter's views in the last 7 days.
+        """
+        return getattr(obj, 'recent_views')
+
+    @admin.display(ordering='trend')
+    def trend(self, obj: Chapter) -> int:
+        """
+        Get the growth of the chapter's views.
+
+        :param obj: A ``Chapter`` model instance.
+
+        :return: The views of the last week minus those of the week before.
+        """
+        return getattr(obj, 'trend')
+
+    def get_changelist(self, request: HttpRequest,
+                       **kwargs) -> Type[ChangeList]:
+        return ChapterChangeList
+
+    @admin.display(ordering='job__status')
+    def status(self, obj: Chapter) -> str:
+        """
+        Get the ingestion status of the chapter.
+
+        :param obj: A ``Chapter`` model instance.
+
+        :return: The status of the chapter's archive.
+        """
+        if obj.ingest_status == IngestStatus.FAILED:
+            return f'Failed: {obj.job.error}'
+        return IngestStatus(obj.ingest_status).label
+
     def preview(self, obj: Chapter) -> str:
         """
         Get the first image of the chapter as an HTML ``<img>``.
@@ -259,7 +341,7 @@ class SeriesAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request: HttpRequest) -> QuerySet:
         return super().get_queryset(request).annotate(
-            views=Sum('chapters__views', distinct=True)
+            views=F('stats__total_views')
         )
 
     @admin.display(ordering='views')
@@ -5,8 +5,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Type
 from warnings import filterwarnings
 
-from django.db.models import Count, F, Max, Prefetch, Q, Sum
-from django.utils import timezone as tz
+from django.db.models import F, Prefetch
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_control
 
@@ -20,7 +19,7 @@ from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
-from api.v2.mixins import METHODS, CORSMixin
+from api.v2.mixins import METHODS, CORSMixin, ETagMixin
 from api.v2.pagination import DummyPagination, PageLimitPagination
 from api.v2.schema import OpenAPISchema
 from groups.models import Group
@@ -113,7 +112,7 @@ class PageViewSet(CreateModelMixin, DestroyModelMixin, ListModelMixin,
 
 
 @method_decorator(cache_control(public=True, max_age=600), 'dispatch')
-class ChapterViewSet(CORSMixin, ModelViewSet):
+class ChapterViewSet(ETagMixin, CORSMixin, ModelViewSet):
     """
     API endpoints for chapters.
 
@@ -127,6 +126,8 @@ class ChapterViewSet(CORSMixin, ModelViewSet):
     serializer_class = serializers.ChapterSerializer
     filter_backends = filters.CHAPTER_FILTERS
     parser_classes = (MultiPartParser,)
+    etag_totals = ('views',)
+    etag_tag = 'chapter.{}'
     http_method_names = METHODS
 
     @action(methods=['get'], detail=True, name='Chapter Pages',
@@ -137,7 +138,7 @@ class ChapterViewSet(CORSMixin, ModelViewSet):
         """Get the pages of the chapter."""
         try:
             instance = models.Chapter.objects.filter(
-                published__lte=tz.now()
+                released=True
             ).select_related('series').only(
                 'series__slug', 'volume',
                 'series__licensed', 'number'
@@ -154,12 +155,34 @@ class ChapterViewSet(CORSMixin, ModelViewSet):
         )
         return self.get_paginated_response(serializer.data)
 
+    @action(methods=['get'], detail=False, name='Trending Chapters',
+            pagination_class=PageLimitPagination,
+            filter_backends=filters.POPULARITY_FILTERS)
+    def trending(self, request: Request) -> Response:
+        """List the chapters with the highest growth in views."""
+        return self._popular()
+
+    @action(methods=['get'], detail=False, name='Most Read Chapters',
+            url_path='most-read', pagination_class=PageLimitPagination,
+            filter_backends=filters.POPULARITY_FILTERS)
+    def most_read(self, request: Request) -> Response:
+        """List the chapters with the most views in a period."""
+        return self._popular()
+
+    def _popular(self) -> Response:
+        queryset = self.filter_queryset(
+            self.get_queryset().filter(series__licensed=False)
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(methods=['get'], detail=True, name='Read Chapter')
     def read(self, request: Request, pk: int) -> Response:
         """Redirect to the reader."""
         try:
             instance = models.Chapter.objects.filter(
-                published__lte=tz.now()
+                released=True
             ).select_related('series').only(
                 'series__slug', 'volume',
                 'series__licensed', 'number'
@@ -173,20 +196,19 @@ class ChapterViewSet(CORSMixin, ModelViewSet):
         url = request.build_absolute_uri(instance.get_absolute_url())
         return Response(status=308, headers={'Location': url})
 
-    def retrieve(self, request: Request, *args, **kwargs) -> Response:
-        instance = self.get_object()
+    def get_object(self) -> models.Chapter:
+        instance = super().get_object()
         if instance.series.licensed:
             raise _LegalException()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return instance
 
     def get_queryset(self) -> QuerySet:
-        return models.Chapter.objects.select_related('series') \
-            .filter(published__lte=tz.now()).order_by('-published')
+        return models.Chapter.objects.select_related('series', 'job') \
+            .filter(released=True).order_by('-published')
 
 
 @method_decorator(cache_control(public=True, max_age=300), 'dispatch')
-class SeriesViewSet(CORSMixin, ModelViewSet):
+class SeriesViewSet(ETagMixin, CORSMixin, ModelViewSet):
     """
     API endpoints for series.
 
@@ -205,6 +227,9 @@ class SeriesViewSet(CORSMixin, ModelViewSet):
     pagination_class = PageLimitPagination
     ordering = ('title',)
     lookup_field = 'slug'
+    etag_fields = ('modified', 'chapters__modified')
+    etag_totals = ('stats__total_views',)
+    etag_tag = 'series.{}'
     http_method_names = METHODS
 
     @action(methods=['get'], detail=True, name='Series Chapters',
@@ -214,16 +239,13 @@ class SeriesViewSet(CORSMixin, ModelViewSet):
     def chapters(self, request: Request, slug: str) -> Response:
         """Get the chapters of the series."""
         try:
-            now = tz.now()
             groups = Group.objects.only('name')
             chapters = models.Chapter.objects.filter(
-                published__lte=now
-            ).order_by('-published')
-            instance = models.Series.objects.annotate(
-                chapter_count=Count('chapters', filter=Q(
-                    chapters__published__lte=now
-                )),
-            ).filter(chapter_count__gt=0).prefetch_related(
+                released=True
+            ).select_related('job').order_by('-published')
+            instance = models.Series.objects.filter(
+                stats__chapter_count__gt=0
+            ).prefetch_related(
                 Prefetch('chapters', queryset=chapters),
                 Prefetch('chapters__groups', queryset=groups)
             ).only('title', 'slug').get(slug=slug)
@@ -238,12 +260,11 @@ class SeriesViewSet(CORSMixin, ModelViewSet):
         return self.get_paginated_response(serializer.data)
 
     def get_queryset(self) -> QuerySet:
-        q = Q(chapters__published__lte=tz.now())
         return models.Series.objects.annotate(
-            chapter_count=Count('chapters', filter=q),
-            latest_upload=Max('chapters__published', filter=q),
-            views=Sum('chapters__views', distinct=True)
-        ).filter(chapter_count__gt=0).distinct()
+            chapter_count=F('stats__chapter_count'),
+            latest_upload=F('stats__latest_upload'),
+            views=F('stats__total_views')
+        ).filter(stats__chapter_count__gt=0)
 
     def get_serializer_class(self) -> Type[serializers.SeriesSerializer]:
         return serializers.SeriesSerializer[self.action]  # type: ignore
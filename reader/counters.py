@@ -0,0 +1,152 @@
+"""Buffered counters for the reader app."""
+
+from __future__ import annotations
+
+from atexit import register
+from collections import Counter
+from functools import reduce
+from importlib.util import find_spec
+from logging import getLogger
+from operator import or_
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Value, When
+
+from MangAdventure.cache import invalidate_tags
+
+from .models import Chapter, SeriesStats, ViewCount
+
+if find_spec('sentry_sdk'):  # pragma: no cover
+    from sentry_sdk import capture_exception
+else:
+    def capture_exception(_): pass  # noqa: E704
+
+#: The number of pending views that triggers a flush.
+MAX_PENDING = 1000
+
+#: A chapter ID, or the slug of its series, its volume, and its number.
+Key = Union[int, Tuple[str, Optional[int], float]]
+
+_logger = getLogger('django.db.models')
+
+
+class ViewCounter:
+    """
+    A per-process buffer of chapter views.
+
+    The views are added up in memory and written to
+    :attr:`Chapter.views <reader.models.Chapter.views>`,
+    the daily :class:`~reader.models.ViewCount` rows
+    and the :class:`~reader.models.SeriesStats`
+    in a single transaction once every
+    :const:`VIEWS_FLUSH_INTERVAL <MangAdventure.settings.CONFIG>`
+    seconds, or when :const:`MAX_PENDING` views are pending.
+    The pending views are also written when the process exits.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._pending: Counter = Counter()
+        self._count = 0
+        self._last = monotonic()
+
+    def __len__(self) -> int:
+        """
+        Get the number of pending views.
+
+        :return: The sum of the pending views.
+        """
+        return self._count
+
+    def add(self, key: Key):
+        """
+        Count a view of a chapter.
+
+        :param key: The ID of the chapter, or the slug
+                    of its series, its volume and its number.
+        """
+        interval = settings.CONFIG['VIEWS_FLUSH_INTERVAL']
+        with self._lock:
+            self._pending[key] += 1
+            self._count += 1
+            if monotonic() - self._last < interval and \
+                    self._count < MAX_PENDING:
+                return
+        self.flush()
+
+    def flush(self) -> int:
+        """
+        Write the pending views to the database.
+
+        If the query fails, the views are kept for the next flush.
+
+        :return: The number of updated chapters.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._count = 0
+            self._last = monotonic()
+        if not pending:
+            return 0
+        try:
+            return self._update(pending)
+        except Exception as exc:
+            _logger.exception(exc)
+            capture_exception(exc)
+            with self._lock:
+                self._pending.update(pending)
+                self._count += sum(pending.values())
+            return 0
+
+    @staticmethod
+    def _update(pending: Counter) -> int:
+        deltas: Dict[int, int] = {}
+        lookups = {}
+        for key, count in pending.items():
+            if isinstance(key, int):
+                deltas[key] = deltas.get(key, 0) + count
+            else:
+                lookups[key] = count
+        if lookups:
+            q = reduce(or_, (
+                Q(series__slug=slug, volume=vol, number=num)
+                for slug, vol, num in lookups
+            ))
+            for pk, *key in Chapter.objects.filter(q).values_list(
+                'id', 'series__slug', 'volume', 'number'
+            ):
+                count = lookups.get(tuple(key), 0)  # type: ignore
+                deltas[pk] = deltas.get(pk, 0) + count
+        valid = dict(Chapter.objects.filter(
+            id__in=deltas, series__licensed=False
+        ).values_list('id', 'series_id'))
+        deltas = {pk: deltas[pk] for pk in valid}
+        if not deltas:
+            return 0
+        series: Counter = Counter()
+        for pk, count in deltas.items():
+            series[valid[pk]] += count
+        with transaction.atomic():
+            ViewCount.objects.add(deltas)
+            SeriesStats.objects.add_views(series)
+            updated = Chapter.objects.filter(id__in=deltas).update(
+                views=F('views') + Case(
+                    *(When(id=pk, then=Value(n)) for pk, n in deltas.items()),
+                    default=Value(0), output_field=PositiveIntegerField()
+                )
+            )
+        # the entity tags of the API depend on the views
+        invalidate_tags('views')
+        return updated
+
+
+#: The views of the chapters in this process.
+chapter_views = ViewCounter()
+
+register(chapter_views.flush)
+
+__all__ = ['MAX_PENDING', 'Key', 'ViewCounter', 'chapter_views']
@@ -2,16 +2,20 @@
 
 from __future__ import annotations
 
+from functools import partial
 from mimetypes import guess_type
 from typing import TYPE_CHECKING, Iterable, Optional
 
 from django.conf import settings
 from django.contrib.syndication.views import Feed
 from django.db.models import F, Prefetch
-from django.utils import timezone as tz
 from django.utils.decorators import method_decorator
 from django.utils.feedgenerator import Atom1Feed
 from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from MangAdventure.cache import get_or_compute
+from MangAdventure.etags import queryset_etag
 
 from .models import Category, Chapter, Series
 
@@ -22,6 +26,27 @@ if TYPE_CHECKING:  # pragma: no cover
 _max = settings.CONFIG['MAX_RELEASES']
 
 
+def _library_etag(request: HttpRequest) -> str:
+    return get_or_compute(
+        f'reader.etag.{request.path}',
+        partial(queryset_etag, Series.objects.all(), request.path),
+        86400, tags=('library',)
+    )
+
+
+def _releases_etag(request: HttpRequest, slug: Optional[str] = None) -> str:
+    chapters = Chapter.objects.all()
+    if slug is not None:
+        chapters = chapters.filter(series__slug=slug)
+    return get_or_compute(
+        f'reader.etag.{request.path}', partial(
+            queryset_etag, chapters.released(), request.path,
+            fields=('modified', 'series__modified')
+        ), 86400, tags=('library',) if slug is None else (f'series.{slug}',)
+    )
+
+
+@method_decorator(condition(etag_func=_library_etag), '__call__')
 @method_decorator(cache_control(public=True, max_age=600), '__call__')
 class LibraryRSS(Feed):
     """RSS feed for the series library."""
@@ -124,6 +149,7 @@ class LibraryAtom(LibraryRSS):
     subtitle = LibraryRSS.description
 
 
+@method_decorator(condition(etag_func=_releases_etag), '__call__')
 @method_decorator(cache_control(public=True, max_age=600), '__call__')
 class ReleasesRSS(Feed):
     """RSS feed for chapter releases."""
@@ -148,7 +174,7 @@ class ReleasesRSS(Feed):
             'title', 'volume', 'number',
             'published', 'modified', 'series'
         ).filter(
-            published__lte=tz.now(),
+            released=True,
             series__licensed=False
         ).order_by(F('volume').asc(nulls_last=True), 'number')
         return Series.objects.only(
@@ -208,7 +234,7 @@ class ReleasesRSS(Feed):
             'title', 'volume', 'number', 'published', 'modified',
             'series__slug', 'series__title', 'series__format'
         ).select_related('series').filter(
-            published__lte=tz.now(), series__licensed=False
+            released=True, series__licensed=False
         ).order_by('-published')[:_max]
 
     def item_description(self, item: Chapter) -> str:
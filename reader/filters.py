@@ -9,7 +9,8 @@ from rest_framework.filters import (
     BaseFilterBackend, OrderingFilter, SearchFilter
 )
 
-from reader.models import Chapter, Status
+from reader.counters import chapter_views
+from reader.models import Status
 
 if TYPE_CHECKING:  # pragma no cover
     from django.db.models.query import QuerySet  # isort:skip
@@ -210,6 +211,40 @@ class DateFormat(BaseFilterBackend):
         }]
 
 
+class PopularityFilter(BaseFilterBackend):
+    """Chapter popularity filter."""
+    description = 'The length of the period in days.'
+    _defaults = {'trending': 7, 'most_read': 30}
+
+    def filter_queryset(self, request: Request, queryset: QuerySet,
+                        view: ViewSet) -> QuerySet:
+        if (default := self._defaults.get(view.action)) is None:
+            return queryset
+        days = request.query_params.get('days', default)
+        try:
+            if not 0 < (days := int(days)) <= 365:  # type: ignore
+                raise ValueError
+        except ValueError:
+            raise ValidationError(detail={
+                'error': f'Invalid number of days: {days}'
+            })
+        return getattr(queryset, view.action)(days)
+
+    def get_schema_operation_parameters(self, view: ViewSet) -> List[Dict]:
+        return [{
+            'name': 'days',
+            'required': False,
+            'in': 'query',
+            'description': self.description,
+            'schema': {
+                'type': 'integer',
+                'default': self._defaults.get(view.action, 7),
+                'minimum': 1,
+                'maximum': 365
+            }
+        }]
+
+
 class ChapterFilter(SearchFilter):
     """Chapter series filter."""
     search_param = 'series'
@@ -274,11 +309,7 @@ class PageFilter(BaseFilterBackend):
                 'error': f'Invalid number: {request.query_params["number"]}'
             })
         if request.query_params.get('track') == 'true':
-            Chapter.track_view(
-                series__slug=series,
-                series__licensed=False,
-                volume=volume, number=number
-            )
+            chapter_views.add((series, volume, number))
         return queryset.filter(
             chapter__series__slug=series,
             chapter__series__licensed=False,
@@ -348,8 +379,14 @@ SERIES_FILTERS = [
 #: The filters used in the chapters endpoint.
 CHAPTER_FILTERS = [ChapterFilter, DateFormat]
 
+#: The filters used in the popular chapters endpoints.
+POPULARITY_FILTERS = [PopularityFilter, DateFormat]
+
 #: The filters used in the pages endpoint.
 PAGE_FILTERS = [PageFilter]
 
 
-__all__ = ['SERIES_FILTERS', 'CHAPTER_FILTERS', 'PAGE_FILTERS']
+__all__ = [
+    'SERIES_FILTERS', 'CHAPTER_FILTERS',
+    'POPULARITY_FILTERS', 'PAGE_FILTERS'
+]
@@ -0,0 +1,963 @@
+"""
+Chapter archive ingestion.
+
+Archives are validated and extracted in a single pass:
+every member is decompressed once, hashed and verified
+while it's being written to a staging directory, which
+is then moved to the directory of the chapter.
+
+Depending on :const:`INGEST_MODE <MangAdventure.settings.CONFIG>`,
+this happens during the request (``sync``), in a pool of background
+threads (``thread``) or in a separate worker process (``queue``)
+that runs the :mod:`~config.management.commands.ingest` command.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from functools import partial
+from hashlib import blake2b
+from importlib.util import find_spec
+from logging import getLogger
+from multiprocessing import get_context
+from os import link, path, remove
+from pathlib import Path
+from secrets import token_hex
+from shutil import copyfile, rmtree
+from threading import Event, Lock, Thread
+from time import time
+from typing import (
+    IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator,
+    List, NamedTuple, Optional, Tuple, Union
+)
+from weakref import finalize
+from zipfile import BadZipfile, ZipFile
+from zlib import crc32
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone as tz
+
+from PIL import Image
+
+from MangAdventure.utils import natsort
+
+if TYPE_CHECKING:  # pragma: no cover
+    from zipfile import ZipInfo  # isort:skip
+    from django.core.files import File  # isort:skip
+    from .models import Chapter, IngestJob  # isort:skip
+
+if find_spec('sentry_sdk'):  # pragma: no cover
+    from sentry_sdk import capture_exception
+else:
+    def capture_exception(_): pass  # noqa: E704
+
+_logger = getLogger('django.db.models')
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+_executor_lock = Lock()
+
+#: The size of the buffer used when extracting pages.
+CHUNK_SIZE = 1 << 16
+
+#: The name of the staging directory inside
+#: :const:`~MangAdventure.settings.MEDIA_ROOT`.
+STAGING_DIR = '.staging'
+
+#: The number of seconds after which a staging directory
+#: is considered abandoned by a process that has crashed.
+STAGING_TIMEOUT = 86400
+
+#: The name of the shared page store inside
+#: :const:`~MangAdventure.settings.MEDIA_ROOT`.
+STORE_DIR = 'store'
+
+#: The number of seconds between the heartbeats of a processing job.
+HEARTBEAT_INTERVAL = 60
+
+#: The number of seconds without a heartbeat
+#: after which a processing job is requeued.
+STALE_TIMEOUT = 600
+
+#: The encoder options of each page variant format.
+VARIANT_OPTIONS = {
+    'webp': {'quality': 85, 'method': 4},
+    'avif': {'quality': 60, 'speed': 6}
+}
+
+_MESSAGES = (
+    'The file cannot contain more than 1 subfolder.',
+    'The file must only contain image files.',
+    'The file must be in zip/cbz format.'
+)
+
+_CODES = ('no_multiple_subfolders', 'only_images', 'invalid_format')
+
+
+class ImageInfo(NamedTuple):
+    """
+    The metadata of an image.
+
+    :cvar width: The width of the image in pixels.
+    :cvar height: The height of the image in pixels.
+    :cvar size: The size of the image in bytes.
+    :cvar mime_type: The MIME type of the image.
+    :cvar crc32: The CRC-32 checksum of the image.
+    """
+    width: int
+    height: int
+    size: int
+    mime_type: str
+    crc32: int
+
+
+class ExtractedPage(NamedTuple):
+    """
+    A page that has been extracted from an archive.
+
+    :cvar name: The name of the page in the archive.
+    :cvar filename: The file name of the extracted page.
+    :cvar info: The metadata of the extracted page.
+    """
+    name: str
+    filename: str
+    info: ImageInfo
+
+
+class Variants(NamedTuple):
+    """
+    The sizes of the variants of an image.
+
+    A size is ``None`` if the variant is disabled
+    or if it isn't smaller than the original image.
+
+    :cvar webp_size: The size of the WebP variant in bytes.
+    :cvar avif_size: The size of the AVIF variant in bytes.
+    :cvar variant_formats: The formats that were tried,
+                           separated by commas.
+    """
+    webp_size: Optional[int] = None
+    avif_size: Optional[int] = None
+    variant_formats: str = ''
+
+
+class Staged(NamedTuple):
+    """
+    An archive that has been extracted to a staging directory.
+
+    :cvar directory: The absolute path of the staging directory.
+    :cvar pages: The extracted pages in natural order.
+    """
+    directory: Path
+    pages: List[ExtractedPage]
+
+
+def _remove_file(file: File):
+    try:
+        remove(file.path)  # type: ignore
+    except FileNotFoundError:
+        pass
+
+
+def _error(file: File, idx: int) -> ValidationError:
+    if hasattr(file, 'path'):
+        _remove_file(file)
+    return ValidationError(_MESSAGES[idx], code=_CODES[idx])
+
+
+def _copy_hashed(src: IO[bytes], dst: IO[bytes], dgst: Any):
+    while chunk := src.read(CHUNK_SIZE):
+        dgst.update(chunk)
+        dst.write(chunk)
+
+
+def file_digest(name: Union[str, Path]) -> str:
+    """
+    Get the digest that is used as the file name of a page.
+
+    :param name: The path of the file.
+
+    :return: The hex digest of the file's contents.
+    """
+    dgst = blake2b(digest_size=16)
+    with open(name, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            dgst.update(chunk)
+    return dgst.hexdigest()
+
+
+def file_crc32(file: Union[str, Path, IO[bytes]]) -> int:
+    """
+    Get the CRC-32 checksum of a file, as stored in zip archives.
+
+    :param file: The path or file object of the file.
+
+    :return: The checksum of the file's contents.
+    """
+    crc = 0
+    with open(file, 'rb') if isinstance(file, (str, Path)) \
+            else nullcontext(file) as f:
+        while chunk := f.read(CHUNK_SIZE):
+            crc = crc32(chunk, crc)
+    return crc
+
+
+def _mime_type(img: Image.Image) -> str:
+    return img.get_format_mimetype() or 'application/octet-stream'
+
+
+def probe(file: Union[str, Path, IO[bytes]]) -> Tuple[int, int, str]:
+    """
+    Read the dimensions and MIME type of an image.
+
+    Only the header of the image is decoded.
+
+    :param file: The path or file object of the image.
+
+    :return: The width, height and MIME type of the image.
+
+    :raises Exception: If the file is not a valid image.
+    """
+    with Image.open(file) as img:
+        return img.width, img.height, _mime_type(img)
+
+
+def _probe_path(name: str) -> Optional[ImageInfo]:
+    # runs in the worker processes of probe_files
+    try:
+        width, height, mime = probe(name)
+        return ImageInfo(
+            width, height, path.getsize(name), mime, file_crc32(name)
+        )
+    except Exception:
+        return None
+
+
+def probe_files(paths: Iterable[str], workers: int = 1) \
+        -> Iterator[Optional[ImageInfo]]:
+    """
+    Read the metadata of many images in parallel.
+
+    :param paths: The paths of the images.
+    :param workers: The number of worker processes.
+
+    :return: The metadata of each image in the order of ``paths``,
+             or ``None`` for the images that could not be read.
+    """
+    if workers < 2:
+        yield from map(_probe_path, paths)
+        return
+    ctx = get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        yield from pool.map(_probe_path, paths, chunksize=32)
+
+
+def _extract_page(zf: ZipFile, info: ZipInfo, dest: Path) -> ExtractedPage:
+    """
+    Extract, hash, verify and probe an archive member.
+
+    The member is decompressed in chunks of :const:`CHUNK_SIZE`
+    bytes and is written to a temporary file which is renamed
+    to its digest once the image has been verified.
+
+    :param zf: The archive that contains the member.
+    :param info: The info of the member.
+    :param dest: The directory where the page will be written.
+
+    :return: The extracted page.
+
+    :raises Exception: If the member is not a valid image.
+    """
+    dgst = blake2b(digest_size=16)
+    tmp = dest / f'.{info.header_offset}.part'
+    try:
+        with zf.open(info) as src, open(tmp, 'wb') as dst:
+            _copy_hashed(src, dst, dgst)
+            size = dst.tell()
+        with Image.open(tmp) as img:
+            width, height = img.size
+            mime = _mime_type(img)
+            img.verify()
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+    filename = dgst.hexdigest() + path.splitext(info.filename)[-1]
+    tmp.replace(dest / filename)
+    # the checksum of the member was verified while reading it
+    return ExtractedPage(info.filename, filename, ImageInfo(
+        width, height, size, mime, info.CRC
+    ))
+
+
+def _extract_members(archive: str, names: List[str],
+                     dest: str) -> List[ExtractedPage]:
+    # runs in the worker processes of the pool
+    with ZipFile(archive) as zf:
+        return [_extract_page(zf, zf.getinfo(n), Path(dest)) for n in names]
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if (workers := settings.CONFIG['INGEST_PROCESSES']) < 2:
+        return None
+    with _executor_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context('spawn')
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _executor_lock:
+        if _pool is not None:
+            # the futures of a broken pool have already failed
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _archive_path(file: File) -> Optional[str]:
+    # the workers can only open archives that exist on disk
+    owner = _owner(file)
+    if hasattr(owner, 'temporary_file_path'):
+        return owner.temporary_file_path()
+    name = getattr(owner, 'name', None)
+    if isinstance(name, str) and path.isabs(name) and path.isfile(name):
+        return name
+    return None
+
+
+def _extract_parallel(pool: ProcessPoolExecutor, archive: str,
+                      members: List[str], dest: Path) -> List[ExtractedPage]:
+    """
+    Extract archive members in a pool of worker processes.
+
+    The members are split into contiguous chunks, each of
+    which is extracted by a worker that opens the archive.
+
+    :param pool: The process pool.
+    :param archive: The path of the archive.
+    :param members: The names of the members.
+    :param dest: The directory where the pages will be written.
+
+    :return: The extracted pages in the order of ``members``.
+
+    :raises Exception: If any of the members is not a valid image.
+    """
+    chunks = settings.CONFIG['INGEST_PROCESSES'] * 2
+    size = -(-len(members) // chunks)
+    futures = [
+        pool.submit(_extract_members, archive,
+                    members[i:i + size], str(dest))
+        for i in range(0, len(members), size)
+    ]
+    try:
+        return [page for fut in futures for page in fut.result()]
+    except BaseException:
+        # don't let running workers write to a removed directory
+        for fut in futures:
+            fut.cancel()
+        wait(futures)
+        raise
+
+
+def extract(file: File, dest: Path) -> List[ExtractedPage]:
+    """
+    Validate and extract a chapter archive in a single pass.
+
+    * It must be a valid :class:`~zipfile.ZipFile`.
+    * It must only contain image files.
+    * It cannot contain more than 1 subfolder.
+
+    If :const:`INGEST_PROCESSES <MangAdventure.settings.CONFIG>` is
+    greater than 1 and the archive is on disk, the pages are extracted
+    in parallel by a :class:`~concurrent.futures.ProcessPoolExecutor`.
+
+    :param file: The archive to be extracted.
+    :param dest: The directory where the pages will be written.
+                 It's removed if the archive is invalid.
+
+    :return: The extracted pages in natural order.
+
+    :raises ValidationError: If any of the validations failed.
+    """
+    try:
+        zf = ZipFile(file)
+    except BadZipfile as err:
+        raise _error(file, 2) from err
+    dest.mkdir(parents=True, exist_ok=True)
+    names = {}
+    try:
+        with zf:
+            infos = [i for i in zf.infolist() if not i.is_dir()]
+            if len(zf.infolist()) - len(infos) > 1:
+                raise _error(file, 0)
+            pool = _get_pool() if len(infos) > 1 else None
+            archive = _archive_path(file) if pool else None
+            if pool and archive:
+                members = [i.filename for i in infos]
+                try:
+                    names = dict(zip(members, _extract_parallel(
+                        pool, archive, members, dest
+                    )))
+                except BrokenProcessPool as exc:  # pragma: no cover
+                    # fall back to extracting the pages in this process
+                    _logger.warning('Restarting the ingest pool: %s', exc)
+                    _reset_pool()
+                    rmtree(dest, ignore_errors=True)
+                    dest.mkdir(parents=True)
+                except Exception as exc:
+                    raise _error(file, 1) from exc
+                else:
+                    infos = []
+            for info in infos:
+                try:
+                    names[info.filename] = _extract_page(zf, info, dest)
+                except Exception as exc:
+                    raise _error(file, 1) from exc
+    except ValidationError:
+        rmtree(dest, ignore_errors=True)
+        raise
+    return [names[n] for n in natsort(names)]
+
+
+def page_names(file: File) -> List[str]:
+    """
+    Get the file names of the pages of an archive without extracting it.
+
+    :param file: The archive to be hashed.
+
+    :return: The file names the pages would get, in natural order.
+
+    :raises BadZipfile: If the file is not a valid zip file.
+    """
+    names = {}
+    with ZipFile(file) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            dgst = blake2b(digest_size=16)
+            with zf.open(info) as src:
+                while chunk := src.read(CHUNK_SIZE):
+                    dgst.update(chunk)
+            ext = path.splitext(info.filename)[-1]
+            names[info.filename] = dgst.hexdigest() + ext
+    return [names[n] for n in natsort(names)]
+
+
+def _owner(file: File) -> Any:
+    # FieldFile objects are recreated when the model is saved,
+    # so the staged archive is attached to the underlying file
+    return getattr(file, '_file', None) or file
+
+
+def _prune_staging():
+    limit = time() - STAGING_TIMEOUT
+    root = settings.MEDIA_ROOT / STAGING_DIR
+    for entry in root.iterdir() if root.exists() else ():
+        try:
+            if entry.stat().st_mtime < limit:
+                rmtree(entry, ignore_errors=True)
+        except FileNotFoundError:  # pragma: no cover
+            pass
+
+
+def stage(file: File) -> Staged:
+    """
+    Extract an archive to a new staging directory.
+
+    The result is memoized on the file object, so archives that
+    have already been validated are not decompressed again, and
+    the directory is removed when the file is garbage collected,
+    so a reference to it must be kept until it's committed.
+    The directories left behind by crashed processes are
+    removed after :const:`STAGING_TIMEOUT` seconds.
+
+    :param file: The archive to be extracted.
+
+    :return: The staged archive.
+
+    :raises ValidationError: If the archive is invalid.
+    """
+    owner = _owner(file)
+    if (result := getattr(owner, '_staged', None)) is not None:
+        if result.directory.exists():
+            return result
+    _prune_staging()
+    dest = settings.MEDIA_ROOT / STAGING_DIR / token_hex(16)
+    result = Staged(dest, extract(file, dest))
+    try:
+        setattr(owner, '_staged', result)
+        finalize(owner, rmtree, str(dest), True)
+    except (AttributeError, TypeError):  # pragma: no cover
+        pass
+    return result
+
+
+def staged(file: File) -> Optional[Staged]:
+    """
+    Get the staged archive of a file if it exists.
+
+    :param file: A file that may have been staged.
+
+    :return: The staged archive or ``None``.
+    """
+    if (result := getattr(_owner(file), '_staged', None)) is None:
+        return None
+    return result if result.directory.exists() else None
+
+
+def prepare(file: File) -> Optional[Staged]:
+    """
+    Stage an uploaded archive that has passed validation.
+
+    It's called by the forms & serializers of the app, so that the
+    archive doesn't have to be decompressed again when the chapter
+    is saved. Nothing is extracted if archives are extracted in
+    the background, since the images are verified then.
+
+    :param file: The uploaded archive.
+
+    :return: The staged archive, if it was extracted.
+
+    :raises ValidationError: If the archive contains invalid images.
+    """
+    return None if is_async() else stage(file)
+
+
+def store_path(filename: str) -> Path:
+    """
+    Get the path of a page in the shared store.
+
+    The store is sharded by the first two bytes of the digest.
+
+    :param filename: The file name of the page.
+
+    :return: The absolute path of the shared file.
+    """
+    return settings.MEDIA_ROOT / STORE_DIR / \
+        filename[:2] / filename[2:4] / filename
+
+
+def _link_shared(src: Path, target: Path):
+    shared = store_path(target.name)
+    if not shared.exists():
+        shared.parent.mkdir(parents=True, exist_ok=True)
+        src.replace(shared)
+    try:
+        link(shared, target)
+    except OSError:  # pragma: no cover
+        # the filesystem doesn't support hardlinks
+        copyfile(shared, target)
+
+
+def commit(archive: Staged, dest: Path) -> List[str]:
+    """
+    Move a staged archive to its final directory.
+
+    Pages are content-addressed, so files that already exist in
+    the directory are kept and only new pages are moved into it.
+
+    If :const:`DEDUP_PAGES <MangAdventure.settings.CONFIG>` is enabled,
+    the pages are moved to the shared store and hardlinked instead.
+
+    :param archive: The staged archive.
+    :param dest: The final directory.
+
+    :return: The file names of the pages that were added.
+    """
+    dest.mkdir(parents=True, exist_ok=True)
+    dedup = settings.CONFIG['DEDUP_PAGES']
+    added = []
+    for page in archive.pages:
+        if (target := dest / page.filename).exists():
+            continue
+        if dedup:
+            _link_shared(archive.directory / page.filename, target)
+        else:
+            (archive.directory / page.filename).replace(target)
+        added.append(page.filename)
+    rmtree(archive.directory, ignore_errors=True)
+    return added
+
+
+def prune(dest: Path, keep: Iterable[str]) -> List[str]:
+    """
+    Remove the files of a directory that are no longer used.
+
+    Hidden files are never removed and the variants
+    of the kept pages share their names, so they are kept too.
+
+    :param dest: The directory of a chapter.
+    :param keep: The file names of the current pages.
+
+    :return: The file names that were removed.
+    """
+    stems = {path.splitext(name)[0] for name in keep}
+    removed = []
+    for entry in dest.iterdir():
+        if entry.is_file() and entry.name[0] != '.' \
+                and entry.stem not in stems:
+            entry.unlink(missing_ok=True)
+            removed.append(entry.name)
+    collect(removed)
+    return removed
+
+
+def collect(filenames: Optional[Iterable[str]] = None) -> Tuple[int, int]:
+    """
+    Remove the shared files that are no longer linked to any chapter.
+
+    The link count of a shared file is its reference count,
+    so a file is only removed once its last page is gone.
+
+    :param filenames: The file names of the pages that were removed.
+                      If ``None``, the whole store is checked.
+
+    :return: The number and total size of the removed files.
+    """
+    if filenames is None:
+        files: Iterable[Path] = (settings.MEDIA_ROOT / STORE_DIR).glob('*/*/*')
+    else:
+        files = map(store_path, filenames)
+    count = size = 0
+    for file in files:
+        try:
+            if (stat := file.stat()).st_nlink == 1:
+                file.unlink()
+                count += 1
+                size += stat.st_size
+        except FileNotFoundError:
+            continue
+    return count, size
+
+
+def _can_encode(fmt: str) -> bool:
+    Image.init()
+    return fmt in VARIANT_OPTIONS and fmt.upper() in Image.SAVE
+
+
+def encode_variants(file: Union[str, Path],
+                    formats: Iterable[str]) -> Variants:
+    """
+    Write smaller variants of an image next to it.
+
+    Each variant has the same name as the image with the extension of
+    its format. Existing variants are kept and variants that are not
+    smaller than the image are discarded. Animated images are skipped.
+
+    :param file: The path of the image.
+    :param formats: The formats of the variants (``webp``, ``avif``).
+
+    :return: The sizes of the variants.
+    """
+    file, formats = Path(file), tuple(formats)
+    tried = ','.join(formats)
+    limit = file.stat().st_size
+    sizes: Dict[str, Optional[int]] = {}
+    missing = []
+    for fmt in formats:
+        target = file.with_suffix('.' + fmt)
+        if target == file or not _can_encode(fmt):
+            continue
+        if target.exists():
+            sizes[fmt] = target.stat().st_size
+        else:
+            missing.append(fmt)
+    if missing:
+        with Image.open(file) as img:
+            if getattr(img, 'is_animated', False):
+                return Variants(variant_formats=tried)
+            if (img.format or '').lower() in missing:
+                missing.remove(img.format.lower())
+            if img.mode not in ('RGB', 'RGBA'):
+                alpha = 'A' in img.mode or 'transparency' in img.info
+                img = img.convert('RGBA' if alpha else 'RGB')
+            for fmt in missing:
+                target = file.with_suffix('.' + fmt)
+                tmp = target.with_name(f'.{target.name}.part')
+                try:
+                    img.save(tmp, fmt.upper(), **VARIANT_OPTIONS[fmt])
+                    if (size := tmp.stat().st_size) < limit:
+                        tmp.replace(target)
+                        sizes[fmt] = size
+                finally:
+                    tmp.unlink(missing_ok=True)
+    return Variants(
+        **{f'{k}_size': v for k, v in sizes.items()},
+        variant_formats=tried
+    )
+
+
+def _encode_path(formats: Tuple[str, ...],
+                 name: Union[str, Path]) -> Optional[Variants]:
+    # runs in the worker processes of the pool
+    try:
+        return encode_variants(name, formats)
+    except Exception:
+        return None
+
+
+def encode_files(paths: Iterable[Union[str, Path]], workers: int = 1,
+                 formats: Optional[Iterable[str]] = None) \
+        -> Iterator[Optional[Variants]]:
+    """
+    Write the variants of many images in parallel.
+
+    :param paths: The paths of the images.
+    :param workers: The number of worker processes.
+    :param formats: The formats of the variants. Defaults to
+                    :const:`PAGE_VARIANTS <MangAdventure.settings.CONFIG>`.
+
+    :return: The sizes of the variants of each image in the order
+             of ``paths``, or ``None`` for the images that failed.
+    """
+    if formats is None:
+        formats = settings.CONFIG['PAGE_VARIANTS']
+    func = partial(_encode_path, tuple(formats))
+    if workers < 2:
+        yield from map(func, paths)
+        return
+    ctx = get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        yield from pool.map(func, paths, chunksize=8)
+
+
+def encode(dest: Path, filenames: List[str]) -> List[Variants]:
+    """
+    Write the variants of the pages of a chapter.
+
+    The pages are encoded in the pool of
+    :const:`INGEST_PROCESSES <MangAdventure.settings.CONFIG>`
+    processes if it's enabled. Failures are logged and ignored
+    since the original images can always be served instead.
+
+    :param dest: The directory of the chapter.
+    :param filenames: The file names of the pages.
+
+    :return: The sizes of the variants of each page.
+    """
+    formats = tuple(settings.CONFIG['PAGE_VARIANTS'])
+    if not formats:
+        return [Variants()] * len(filenames)
+    func = partial(_encode_path, formats)
+    paths = [dest / name for name in filenames]
+    results: List[Optional[Variants]]
+    if (pool := _get_pool()) is None or len(paths) < 2:
+        results = list(map(func, paths))
+    else:
+        try:
+            results = list(pool.map(func, paths))
+        except BrokenProcessPool:
+            _reset_pool()
+            results = list(map(func, paths))
+    for name, result in zip(filenames, results):
+        if result is None:
+            _logger.warning('Failed to encode the variants of %s', name)
+    return [r or Variants() for r in results]
+
+
+def is_async() -> bool:
+    """
+    Check whether archives are extracted in the background.
+
+    :return: ``True`` unless :const:`INGEST_MODE
+             <MangAdventure.settings.CONFIG>` is ``sync``.
+    """
+    return settings.CONFIG['INGEST_MODE'] != 'sync'
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CONFIG['INGEST_WORKERS'],
+                thread_name_prefix='ingest'
+            )
+        return _executor
+
+
+def _enqueue(job_id: int):
+    if settings.CONFIG['INGEST_MODE'] == 'thread':
+        transaction.on_commit(partial(_get_executor().submit, run, job_id))
+
+
+def submit(chapter: Chapter) -> IngestJob:
+    """
+    Submit the archive of a chapter to the ingestion queue.
+
+    If the chapter already has a pending job, its archive is replaced.
+    A job that is being processed is left alone, and the new archive
+    is submitted by :func:`process` once the job is finished.
+
+    :param chapter: A chapter with a newly uploaded archive.
+
+    :return: The ingestion job of the chapter.
+    """
+    from .models import IngestJob, IngestStatus
+    archive = chapter.file.name
+    job, created = IngestJob.objects.get_or_create(
+        chapter_id=chapter.id, defaults={'archive': archive}
+    )
+    if not created:
+        if job.status == IngestStatus.PROCESSING or job.archive == archive:
+            return job
+        # the job may have been claimed in the meantime
+        if not IngestJob.objects.filter(
+            pk=job.pk, status=job.status, archive=job.archive
+        ).update(
+            archive=archive, status=IngestStatus.PENDING,
+            error='', started=None, heartbeat=None, finished=None
+        ):
+            return job
+        if job.status == IngestStatus.PENDING:
+            chapter.file.storage.delete(job.archive)
+        job.refresh_from_db()
+    _enqueue(job.pk)
+    return job
+
+
+def recover(timeout: int = STALE_TIMEOUT) -> int:
+    """
+    Requeue the jobs that were interrupted.
+
+    Processing jobs whose heartbeat has stopped are reset
+    to pending, and in ``thread`` mode the pending jobs are
+    submitted again, since they're only queued in memory.
+
+    :param timeout: The number of seconds without a heartbeat
+                    after which a processing job is considered stale.
+
+    :return: The number of requeued jobs.
+    """
+    from .models import IngestJob, IngestStatus
+    cutoff = tz.now() - timedelta(seconds=timeout)
+    IngestJob.objects.filter(
+        Q(heartbeat__lt=cutoff) | Q(heartbeat=None, started__lt=cutoff),
+        status=IngestStatus.PROCESSING
+    ).update(status=IngestStatus.PENDING, started=None, heartbeat=None)
+    pending = list(IngestJob.objects.filter(
+        status=IngestStatus.PENDING
+    ).values_list('pk', flat=True))
+    for job_id in pending:
+        _enqueue(job_id)
+    return len(pending)
+
+
+def _beat(job_id: int, stop: Event):
+    from .models import IngestJob, IngestStatus
+    try:
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            IngestJob.objects.filter(
+                pk=job_id, status=IngestStatus.PROCESSING
+            ).update(heartbeat=tz.now())
+    finally:
+        connections.close_all()
+
+
+@contextmanager
+def _heartbeat(job_id: int) -> Iterator[None]:
+    stop = Event()
+    thread = Thread(
+        target=_beat, args=(job_id, stop),
+        name=f'ingest-heartbeat-{job_id}', daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def process(job_id: int) -> bool:
+    """
+    Process a pending ingestion job.
+
+    The job is claimed atomically, so it's safe
+    to run multiple workers at the same time.
+    While it's running, its heartbeat is renewed every
+    :const:`HEARTBEAT_INTERVAL` seconds so that it isn't
+    requeued by :func:`recover`.
+
+    :param job_id: The ID of the job.
+
+    :return: ``True`` if the job was processed by this worker.
+    """
+    from .models import Chapter, IngestJob, IngestStatus
+    claimed = IngestJob.objects.filter(
+        pk=job_id, status=IngestStatus.PENDING
+    ).update(
+        status=IngestStatus.PROCESSING,
+        started=tz.now(), heartbeat=tz.now()
+    )
+    if not claimed:
+        return False
+    job = IngestJob.objects.select_related('chapter__series').get(pk=job_id)
+    storage = Chapter.file.field.storage
+    status, error = IngestStatus.READY, ''
+    try:
+        with _heartbeat(job_id), storage.open(job.archive) as file:
+            job.chapter.replace_pages(stage(file))
+    except ValidationError as exc:
+        status, error = IngestStatus.FAILED, ' '.join(exc.messages)
+    except Exception as exc:
+        _logger.exception(exc)
+        capture_exception(exc)
+        status, error = IngestStatus.FAILED, str(exc)
+    # a new archive may have been uploaded in the meantime
+    IngestJob.objects.filter(pk=job_id, archive=job.archive).update(
+        status=status, error=error, finished=tz.now()
+    )
+    Chapter.objects.filter(pk=job.chapter_id, file=job.archive).update(
+        file='', modified=tz.now()
+    )
+    storage.delete(job.archive)
+    # an archive that was uploaded while the job was processing
+    if upload := Chapter.objects.filter(pk=job.chapter_id).exclude(
+        file=''
+    ).exclude(file=job.archive).values_list('file', flat=True).first():
+        IngestJob.objects.filter(pk=job_id).update(
+            archive=upload, status=IngestStatus.PENDING,
+            error='', started=None, heartbeat=None, finished=None
+        )
+        _enqueue(job_id)
+    return True
+
+
+def run(job_id: int) -> bool:
+    """
+    Process an ingestion job in a worker thread.
+
+    :param job_id: The ID of the job.
+
+    :return: ``True`` if the job was processed by this worker.
+    """
+    close_old_connections()
+    try:
+        return process(job_id)
+    finally:
+        close_old_connections()
+
+
+__all__ = [
+    'CHUNK_SIZE', 'STAGING_DIR', 'STAGING_TIMEOUT',
+    'STORE_DIR', 'VARIANT_OPTIONS',
+    'ImageInfo', 'ExtractedPage', 'Variants', 'Staged',
+    'file_digest', 'file_crc32',
+    'probe', 'probe_files', 'extract', 'page_names', 'stage', 'staged',
+    'prepare', 'store_path', 'commit', 'prune', 'collect',
+    'encode_variants', 'encode_files', 'encode',
+    'HEARTBEAT_INTERVAL', 'STALE_TIMEOUT', 'is_async',
+    'submit', 'recover', 'process', 'run'
+]
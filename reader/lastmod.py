@@ -0,0 +1,110 @@
+"""
+A registry of the modification dates of the reader.
+
+The dates of the site, each series, and each published chapter are kept
+in the cache, so conditional requests can be answered with a single
+cache lookup. The entries are cleared by the receivers of the app
+when the series or chapters change, including when a scheduled
+chapter is released, and once more when the transaction commits.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from MangAdventure.cache import get_or_compute
+
+from .models import Chapter, Series
+
+#: The maximum number of seconds an entry is cached for.
+TIMEOUT = 86400
+
+_SITE_KEY = 'lastmod.site'
+
+_SERIES_KEY = 'lastmod.series.{}'
+
+_Series = Tuple[Optional[float], Dict[Tuple[int, float], float]]
+
+
+def _timestamp(date: Optional[datetime]) -> Optional[float]:
+    return None if date is None else date.timestamp()
+
+
+def _date(timestamp: Optional[float]) -> Optional[datetime]:
+    return None if timestamp is None else \
+        datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _site() -> Optional[float]:
+    q = Q(chapters__released=True)
+    latest = Series.objects.alias(
+        chapter_count=Count('chapters', filter=q)
+    ).filter(chapter_count__gt=0).aggregate(latest=Max('modified'))
+    return _timestamp(latest['latest'])
+
+
+def _series(slug: str) -> _Series:
+    series, chapters = None, {}
+    for vol, num, modified, series_modified in Chapter.objects.filter(
+        series__slug=slug, released=True
+    ).values_list('volume', 'number', 'modified', 'series__modified'):
+        chapters[(vol or 0, num)] = modified.timestamp()
+        series = series_modified.timestamp()
+    return series, chapters
+
+
+def site_modified() -> Optional[datetime]:
+    """
+    Get the last time a series with published chapters was modified.
+
+    :return: The modification date, if there are any published chapters.
+    """
+    return _date(get_or_compute(_SITE_KEY, _site, TIMEOUT))
+
+
+def series_modified(slug: str, vol: Optional[int] = None,
+                    num: Optional[float] = None) -> Optional[datetime]:
+    """
+    Get the modification date of a series, one of its volumes, or a chapter.
+
+    :param slug: The slug of the series.
+    :param vol: The volume, or ``None`` for the whole series.
+    :param num: The number of the chapter,
+                or ``None`` for the whole volume.
+
+    :return: The modification date, if there are any
+             matching chapters that have been published.
+    """
+    series, chapters = get_or_compute(
+        _SERIES_KEY.format(slug), partial(_series, slug), TIMEOUT
+    )
+    if vol is None:
+        return _date(series)
+    if num is None:
+        return _date(max((
+            ts for (v, _), ts in chapters.items() if v == (vol or 0)
+        ), default=None))
+    return _date(chapters.get((vol or 0, num)))
+
+
+def clear(slug: str):
+    """
+    Remove the dates of a series and the site from the registry.
+
+    The dates are removed again after the current transaction is
+    committed, since they can be computed from the old rows until then.
+
+    :param slug: The slug of the series.
+    """
+    keys = [_SITE_KEY, _SERIES_KEY.format(slug)]
+    cache.delete_many(keys)
+    transaction.on_commit(partial(cache.delete_many, keys))
+
+
+__all__ = ['TIMEOUT', 'site_modified', 'series_modified', 'clear']
@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0011_series_status')]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestJob',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True,
+                    serialize=False, verbose_name='ID'
+                )),
+                ('archive', models.CharField(max_length=255)),
+                ('status', models.CharField(
+                    choices=[
+                        ('pending', 'Pending'),
+                        ('processing', 'Processing'),
+                        ('ready', 'Ready'),
+                        ('failed', 'Failed')
+                    ],
+                    db_index=True, default='pending', max_length=10
+                )),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('chapter', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='job', to='reader.chapter'
+                )),
+            ],
+            options={'ordering': ('created',)}
+        )
+    ]
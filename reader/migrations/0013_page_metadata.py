@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0012_ingestjob')]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='width',
+            field=models.PositiveIntegerField(editable=False, null=True)
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='height',
+            field=models.PositiveIntegerField(editable=False, null=True)
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='size',
+            field=models.PositiveIntegerField(editable=False, null=True)
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='mime_type',
+            field=models.CharField(blank=True, editable=False, max_length=32)
+        )
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0013_page_metadata')]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='webp_size',
+            field=models.PositiveIntegerField(editable=False, null=True)
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='avif_size',
+            field=models.PositiveIntegerField(editable=False, null=True)
+        )
+    ]
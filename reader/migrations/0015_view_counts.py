@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0014_page_variants')]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewCount',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True,
+                    serialize=False, verbose_name='ID'
+                )),
+                ('period', models.CharField(
+                    choices=[
+                        ('day', 'Day'),
+                        ('week', 'Week'),
+                        ('month', 'Month')
+                    ],
+                    default='day', max_length=5
+                )),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('chapter', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='view_counts', to='reader.chapter'
+                )),
+            ],
+            options={
+                'indexes': [models.Index(
+                    fields=['period', 'date'],
+                    name='view_count_period_date'
+                )],
+                'constraints': [models.UniqueConstraint(
+                    fields=('chapter', 'period', 'date'),
+                    name='unique_chapter_view_count'
+                )]
+            }
+        )
+    ]
@@ -0,0 +1,64 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+from django.utils import timezone as tz
+
+
+def populate_stats(apps, schema_editor):
+    series = apps.get_model('reader', 'Series')
+    chapter = apps.get_model('reader', 'Chapter')
+    stats = apps.get_model('reader', 'SeriesStats')
+    now = tz.now()
+    published = models.Q(chapters__published__lte=now)
+    last = chapter.objects.filter(
+        series_id=models.OuterRef('id'), published__lte=now
+    ).order_by('-published').values('id')[:1]
+    rows = series.objects.annotate(
+        stats_count=models.Count('chapters', filter=published),
+        stats_latest=models.Max('chapters__published', filter=published),
+        stats_views=Coalesce(models.Sum('chapters__views'), 0),
+        stats_next=models.Min('chapters__published', filter=~published),
+        stats_last=models.Subquery(last)
+    ).values_list(
+        'id', 'stats_count', 'stats_latest',
+        'stats_views', 'stats_next', 'stats_last'
+    ).order_by()
+    stats.objects.bulk_create(stats(
+        series_id=pk, chapter_count=count, latest_upload=latest,
+        total_views=views, next_release=upcoming, last_chapter_id=last_id
+    ) for pk, count, latest, views, upcoming, last_id in rows)
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0015_view_counts')]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeriesStats',
+            fields=[
+                ('series', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True, related_name='stats',
+                    serialize=False, to='reader.series'
+                )),
+                ('chapter_count', models.PositiveIntegerField(
+                    db_index=True, default=0
+                )),
+                ('latest_upload', models.DateTimeField(
+                    db_index=True, null=True
+                )),
+                ('total_views', models.PositiveIntegerField(
+                    db_index=True, default=0
+                )),
+                ('next_release', models.DateTimeField(
+                    db_index=True, null=True
+                )),
+                ('last_chapter', models.ForeignKey(
+                    null=True, related_name='+', to='reader.chapter',
+                    on_delete=django.db.models.deletion.SET_NULL
+                )),
+            ],
+            options={'verbose_name_plural': 'series stats'}
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop)
+    ]
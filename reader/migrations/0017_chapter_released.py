@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.utils import timezone as tz
+
+
+def populate_released(apps, schema_editor):
+    chapter = apps.get_model('reader', 'Chapter')
+    chapter.objects.filter(published__gt=tz.now()).update(released=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0016_series_stats')]
+
+    operations = [
+        migrations.AddField(
+            model_name='chapter',
+            name='released',
+            field=models.BooleanField(
+                db_index=True, default=True, editable=False,
+                help_text=(
+                    'Whether the publication date of the chapter has passed.'
+                )
+            )
+        ),
+        migrations.RunPython(populate_released, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,13 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0017_chapter_released')]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='crc32',
+            field=models.PositiveBigIntegerField(editable=False, null=True)
+        )
+    ]
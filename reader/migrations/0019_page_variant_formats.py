@@ -0,0 +1,13 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0018_page_crc32')]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='variant_formats',
+            field=models.CharField(blank=True, editable=False, max_length=32)
+        )
+    ]
@@ -0,0 +1,13 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reader', '0019_page_variant_formats')]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='heartbeat',
+            field=models.DateTimeField(blank=True, null=True)
+        )
+    ]
@@ -9,17 +9,14 @@ Database models for the reader app.
 
 from __future__ import annotations
 
+from datetime import date, datetime, timedelta
 from hashlib import blake2b
 from importlib.util import find_spec
-from io import BytesIO
 from logging import getLogger
 from os import path, remove
-from pathlib import PurePath
-from shutil import rmtree
-from threading import Lock, Thread
-from typing import Any, Dict, List, Optional, Tuple, Union
+from pathlib import Path, PurePath
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 from xml.etree import ElementTree as ET
-from zipfile import ZipFile
 
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -27,26 +24,31 @@ from django.contrib.contenttypes.fields import (
     GenericForeignKey, GenericRelation
 )
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.db.models.expressions import F
+from django.db import connections, models
+from django.db.models import (
+    Case, Count, F, Max, Min, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
 from django.db.models.query_utils import Q
 from django.urls import reverse
 from django.utils import timezone as tz
 from django.utils.functional import cached_property
 from django.utils.text import slugify
 
-from MangAdventure import __version__ as VERSION, storage, utils, validators
+from MangAdventure import __version__ as VERSION, storage, validators
+from MangAdventure.cache import invalidate_tags
+from MangAdventure.zipstream import ZipMember, ZipStream
 
 from groups.models import Group
 
+from . import ingest
+
 if find_spec('sentry_sdk'):  # pragma: no cover
     from sentry_sdk import capture_exception
 else:
     def capture_exception(_): pass  # noqa: E704
 
-_update_lock = Lock()
 _logger = getLogger('django.db.models')
 
 
@@ -306,6 +308,121 @@ class Series(models.Model):
         return self.title
 
 
+class ChapterQuerySet(models.QuerySet):
+    """A :class:`~django.db.models.QuerySet` for chapters."""
+
+    @staticmethod
+    def _views_since(start: date) -> Coalesce:
+        # every view is either in a daily or in a weekly bucket
+        return Coalesce(Sum('view_counts__views', filter=Q(
+            view_counts__period__in=(ViewPeriod.DAY, ViewPeriod.WEEK),
+            view_counts__date__gte=start
+        )), 0)
+
+    def with_recent_views(self, days: int = 7) -> ChapterQuerySet:
+        """
+        Annotate the chapters with their views in a period.
+
+        Views older than the daily buckets are counted by week,
+        so the start of the period is rounded to a Monday.
+
+        :param days: The length of the period in days.
+
+        :return: The chapters annotated with their ``recent_views``
+                 and their ``trend``, i.e. the difference between
+                 the views of the period and the period before it.
+        """
+        start = tz.localdate() - timedelta(days=days)
+        before = start - timedelta(days=days)
+        return self.annotate(
+            recent_views=self._views_since(start),
+            trend=F('recent_views') * 2 - self._views_since(before)
+        )
+
+    def most_read(self, days: int = 30) -> ChapterQuerySet:
+        """
+        Get the chapters with the most views in a period.
+
+        :param days: The length of the period in days.
+
+        :return: The chapters that have been read in the period.
+        """
+        return self.with_recent_views(days).filter(
+            recent_views__gt=0
+        ).order_by('-recent_views', '-views')
+
+    def trending(self, days: int = 7) -> ChapterQuerySet:
+        """
+        Get the chapters with the highest growth in views.
+
+        :param days: The length of the period in days.
+
+        :return: The chapters that have been read in the period.
+        """
+        return self.with_recent_views(days).filter(
+            recent_views__gt=0
+        ).order_by('-trend', '-recent_views')
+
+    def released(self) -> ChapterQuerySet:
+        """
+        Get the chapters that have been released.
+
+        :return: The chapters whose ``released`` flag is set.
+        """
+        return self.filter(released=True)
+
+    def invalidate(self):
+        """
+        Invalidate the cached values of the chapters and their series.
+
+        This is needed when their pages are updated in bulk,
+        since the receivers of the app are not called then.
+        """
+        tags = set()
+        for pk, slug in self.values_list('id', 'series__slug'):
+            tags.update((f'chapter.{pk}', f'series.{slug}'))
+        if tags:
+            invalidate_tags(*tags)
+
+    def release(self) -> int:
+        """
+        Release the scheduled chapters whose publication date has passed.
+
+        The chapters are updated in a single query, then the cached
+        values, dates and stats of their series are refreshed.
+
+        :return: The number of released chapters.
+        """
+        from . import lastmod
+        now = tz.now()
+        chapters = list(self.filter(
+            released=False, published__lte=now
+        ).values_list('id', 'series_id', 'series__slug'))
+        if not chapters:
+            return 0
+        Chapter.objects.filter(id__in=[c[0] for c in chapters]) \
+            .update(released=True, modified=now)
+        slugs = {c[2] for c in chapters}
+        invalidate_tags(
+            'library', *(f'series.{slug}' for slug in slugs),
+            *(f'chapter.{c[0]}' for c in chapters)
+        )
+        for slug in slugs:
+            lastmod.clear(slug)
+        SeriesStats.objects.refresh(*{c[1] for c in chapters})
+        return len(chapters)
+
+    def next_release(self) -> Optional[datetime]:
+        """
+        Get the publication date of the next scheduled chapter.
+
+        :return: The earliest publication date
+                 of the unreleased chapters, if any.
+        """
+        return self.filter(released=False) \
+            .aggregate(next=Min('published'))['next']
+
+
 class Chapter(models.Model):
     """A model representing a chapter."""
     #: The title of the chapter.
@@ -348,6 +465,11 @@ class Chapter(models.Model):
             ' the publication of the chapter.'
         ), default=tz.now
     )
+    #: Whether the chapter has been released.
+    released = models.BooleanField(
+        default=True, db_index=True, editable=False,
+        help_text='Whether the publication date of the chapter has passed.'
+    )
     #: The modification date of the chapter.
     modified = models.DateTimeField(auto_now=True, db_index=True)
     #: The groups that worked on this chapter.
@@ -360,6 +482,8 @@ class Chapter(models.Model):
         help_text='The total views of the chapter.'
     )
 
+    objects = ChapterQuerySet.as_manager()
+
     class Meta:
         # BUG: ordering with F() seems to be broken
         # ordering = ('series', F('volume').asc(nulls_last=True), 'number')
@@ -379,31 +503,42 @@ class Chapter(models.Model):
             )
         )
 
-    @classmethod
-    def track_view(cls, **kwargs):  # pragma: no cover
+    def save(self, *args, **kwargs):
         """
-        Increment the chapter views in a new thread.
+        Save the current instance.
 
-        :param kwargs: The arguments given to the queryset filter.
+        If a new archive was uploaded, it's extracted
+        now or submitted to the ingestion queue,
+        depending on :const:`INGEST_MODE
+        <MangAdventure.settings.CONFIG>`.
+        """
+        # the archive may have been staged by its validator; keep a
+        # reference to the upload since the staged directory is
+        # removed when it's collected and the field is replaced
+        upload = getattr(self.file, '_file', None)
+        staged = ingest.staged(upload) if upload else None
+        # an archive that is already stored has been submitted before
+        uploaded = bool(self.file) and not self.file._committed
+        # scheduled chapters are released by ChapterQuerySet.release
+        self.released = self.published <= tz.now()
+        super().save(*args, **kwargs)
+        if uploaded:
+            if staged is None and ingest.is_async():
+                ingest.submit(self)
+            else:
+                self.unzip(staged)
+
+    @property
+    def ingest_status(self) -> str:
         """
-        def run():
-            cls.objects.filter(**kwargs).update(views=F('views') + 1)
+        Get the status of the chapter's ingestion job.
 
-        _update_lock.acquire()
+        :return: One of the :class:`IngestStatus` values.
+        """
         try:
-            Thread(target=run, daemon=True, name='track_view').start()
-        except Exception as exc:
-            _logger.exception(exc)
-            capture_exception(exc)
-        finally:
-            _update_lock.release()
-
-    def save(self, *args, **kwargs):
-        """Save the current instance."""
-        super().save(*args, **kwargs)
-        if self.file:
-            validators.zipfile_validator(self.file)
-            self.unzip()
+            return self.job.status
+        except IngestJob.DoesNotExist:
+            return IngestStatus.READY
 
     def get_absolute_url(self) -> str:
         """
@@ -425,67 +560,145 @@ class Chapter(models.Model):
         return self.series.get_directory() / \
             str(self.volume or 0) / f'{self.number:g}'
 
-    def unzip(self):
-        """Unzip the chapter and save its images."""
-        counter = 0
-        pages = []
-        dir_path = path.join(
-            'series', self.series.slug,
-            str(self.volume or 0), f'{self.number:g}'
-        )
-        full_path = settings.MEDIA_ROOT / dir_path
-        if full_path.exists():
-            rmtree(full_path)
-        full_path.mkdir(parents=True)
-        with ZipFile(self.file) as zf:
-            for name in utils.natsort(zf.namelist()):
-                if zf.getinfo(name).is_dir():
-                    continue
-                counter += 1
-                data = zf.read(name)
-                dgst = blake2b(data, digest_size=16).hexdigest()
-                filename = dgst + path.splitext(name)[-1]
-                file_path = path.join(dir_path, filename)
-                (full_path / filename).write_bytes(data)
-                pages.append(Page(
-                    chapter_id=self.id, number=counter, image=file_path
-                ))
-        self.pages.all().delete()
-        self.pages.bulk_create(pages)
+    def unzip(self, staged: Optional[ingest.Staged] = None):
+        """
+        Unzip the chapter and save its images.
+
+        :param staged: The archive of the chapter, if it has already
+                       been extracted by :func:`~reader.ingest.stage`.
+
+        :raises ValidationError: If the archive is invalid.
+        """
+        if staged is None:
+            staged = ingest.stage(self.file)
+        self.replace_pages(staged)
         self.file.delete(save=True)
-        cache.delete(f'chapter.cbz.{self.id}')
 
-    def zip(self) -> BytesIO:
+    def replace_pages(self, staged: ingest.Staged):
+        """
+        Replace the pages of the chapter with those of an archive.
+
+        Only new pages are written to the directory of the chapter,
+        existing rows are updated in place and unused files are removed.
+
+        :param staged: An archive extracted by :func:`~reader.ingest.stage`.
+        """
+        dir_path = self.get_directory()
+        dest = settings.MEDIA_ROOT / dir_path
+        ingest.commit(staged, dest)
+        variants = ingest.encode(dest, [p.filename for p in staged.pages])
+        current = {p.number: p for p in self.pages.all()}
+        created, updated = [], []
+        for num, page in enumerate(staged.pages, 1):
+            fields = {
+                'image': str(dir_path / page.filename),
+                **page.info._asdict(),
+                **variants[num - 1]._asdict()
+            }
+            if (old := current.pop(num, None)) is None:
+                created.append(Page(chapter_id=self.id, number=num, **fields))
+            elif any(getattr(old, k) != v for k, v in fields.items()):
+                for k, v in fields.items():
+                    setattr(old, k, v)
+                updated.append(old)
+        if current:
+            self.pages.filter(id__in=[p.id for p in current.values()]) \
+                .delete()
+        if updated:
+            Page.objects.bulk_update(updated, (
+                'image', *ingest.ImageInfo._fields,
+                *ingest.Variants._fields
+            ))
+        if created:
+            Page.objects.bulk_create(created)
+        ingest.prune(dest, (p.filename for p in staged.pages))
+        if current or updated or created:
+            from . import lastmod
+            self._clear_archives()
+            self.modified = tz.now()
+            Chapter.objects.filter(id=self.id) \
+                .update(modified=self.modified)
+            invalidate_tags(
+                'library', f'series.{self.series.slug}', f'chapter.{self.id}'
+            )
+            lastmod.clear(self.series.slug)
+
+    def cbz(self) -> Tuple[Path, ZipStream]:
+        """
+        Get the ``.cbz`` file of this chapter and a stream that generates it.
+
+        The file is kept in a directory of the chapter under
+        :const:`~MangAdventure.settings.ARCHIVE_ROOT`, which is
+        not served publicly, under a name derived from its pages
+        & metadata, so a new file is used whenever they change
+        and the files of the previous versions are removed.
+
+        The pages are stored uncompressed and ``ComicInfo.xml``
+        is written last, so the stream produces the exact
+        same bytes as the file without reading it first.
+
+        :return: The absolute path of the file, which may not exist yet,
+                 and a :class:`~MangAdventure.zipstream.ZipStream`.
+        """
+        all_pages = list(self.pages.all())
+        info = self.comicinfo()
+        pages = ET.SubElement(info, 'Pages')
+        members = []
+        for page in all_pages:
+            size = page.size or page.image.size
+            ET.SubElement(pages, 'Page', {
+                'Image': str(page.number),
+                'ImageSize': str(size),
+                'ImageWidth': str(page.width or page.image.width),
+                'ImageHeight': str(page.height or page.image.height)
+            })
+            img = page.image.path
+            name = f'{page.number:03d}' + path.splitext(img)[-1]
+            members.append(ZipMember(name, size, img, crc=page.crc32))
+        xml = ET.tostring(info, encoding='UTF-8', xml_declaration=True)
+        members.append(ZipMember.from_bytes('ComicInfo.xml', xml))
+        dgst = blake2b(xml, digest_size=16)
+        for page in all_pages:
+            dgst.update(page.image.name.encode())
+        dest = self._archive_directory()
+        target = dest / f'{dgst.hexdigest()}.cbz'
+        if not target.exists():
+            dest.mkdir(parents=True, exist_ok=True)
+            self._clear_archives()
+        return target, ZipStream(members, self.published)
+
+    def archive(self) -> Path:
         """
-        Generate a zip file containing the pages of this chapter.
+        Get the prebuilt ``.cbz`` file of this chapter.
 
-        :return: The file-like object of the generated file.
+        The file is built on first use and is
+        written straight to disk, without
+        buffering the archive in memory.
+
+        :return: The absolute path of the file.
+
+        .. seealso:: :meth:`cbz`
         """
-        buf = cache.get(f'chapter.cbz.{self.id}', BytesIO())
-        if not buf.getvalue():
-            info = self.comicinfo()
-            pages = ET.SubElement(info, 'Pages')
+        target, stream = self.cbz()
+        if not target.exists():
+            stream.save(target)
+        return target
 
-            with ZipFile(buf, 'a', compression=8) as zf:
-                for page in self.pages.all():
-                    img = page.image.path
-                    name = f'{page.number:03d}'
-                    ext = path.splitext(img)[-1]
-                    zf.write(img, name + ext)
+    def zip(self) -> BinaryIO:
+        """
+        Open the ``.cbz`` file of this chapter.
 
-                    ET.SubElement(pages, 'Page', {
-                        'Image': str(page.number),
-                        'ImageSize': str(page.image.size),
-                        'ImageWidth': str(page.image.width),
-                        'ImageHeight': str(page.image.height)
-                    })
+        :return: The file object of :meth:`archive`.
+        """
+        return open(self.archive(), 'rb')
+
+    def _archive_directory(self) -> Path:
+        # keyed by ID, so the archives survive renamed series
+        return settings.ARCHIVE_ROOT / 'chapters' / str(self.id)
 
-                zf.writestr('ComicInfo.xml', ET.tostring(
-                    info, encoding='UTF-8', xml_declaration=True
-                ))
-            buf.seek(0)
-            cache.add(f'chapter.cbz.{self.id}', buf)
-        return buf
+    def _clear_archives(self):
+        for file in self._archive_directory().glob('*.cbz'):
+            file.unlink(missing_ok=True)
 
     def comicinfo(self) -> ET.Element:
         """
@@ -681,7 +894,7 @@ class Page(models.Model):
     .. admonition:: TODO
        :class: warning
 
-       Add page type, double page, width/height fields.
+       Add page type, double page fields.
     """
     #: The chapter this page belongs to.
     chapter = models.ForeignKey(
@@ -691,6 +904,25 @@ class Page(models.Model):
     image = models.ImageField(storage=storage.CDNStorage(), max_length=255)
     #: The number of the page.
     number = _NonZeroIntegerField()
+    #: The width of the image in pixels.
+    width = models.PositiveIntegerField(null=True, editable=False)
+    #: The height of the image in pixels.
+    height = models.PositiveIntegerField(null=True, editable=False)
+    #: The size of the image in bytes.
+    size = models.PositiveIntegerField(null=True, editable=False)
+    #: The MIME type of the image.
+    mime_type = models.CharField(max_length=32, blank=True, editable=False)
+    #: The CRC-32 checksum of the image, used in the chapter archives.
+    crc32 = models.PositiveBigIntegerField(null=True, editable=False)
+    #: The size of the WebP variant of the image in bytes.
+    webp_size = models.PositiveIntegerField(null=True, editable=False)
+    #: The size of the AVIF variant of the image in bytes.
+    avif_size = models.PositiveIntegerField(null=True, editable=False)
+    #: The variant formats that were tried, including
+    #: the ones that weren't smaller than the image.
+    variant_formats = models.CharField(
+        max_length=32, blank=True, editable=False
+    )
 
     class Meta:
         ordering = ('chapter', 'number')
@@ -701,11 +933,37 @@ class Page(models.Model):
             ),
         )
 
+    def save(self, *args, **kwargs):
+        """Save the current instance and the metadata of a new image."""
+        if new_image := self.image and not self.image._committed:
+            self.image.seek(0)
+            self.width, self.height, self.mime_type = \
+                ingest.probe(self.image)
+            self.size = self.image.size
+            self.image.seek(0)
+            self.crc32 = ingest.file_crc32(self.image)
+            self.image.seek(0)
+        super().save(*args, **kwargs)
+        if new_image:
+            file = Path(self.image.path)
+            variants = ingest.encode(file.parent, [file.name])[0]
+            if any(variants):
+                for k, v in variants._asdict().items():
+                    setattr(self, k, v)
+                Page.objects.filter(id=self.id) \
+                    .update(**variants._asdict())
+
     def delete(self, using: Optional[str] = None,
                keep_parents: bool = False) -> Tuple[int, Dict[str, int]]:
-        if self.image:
+        # the same file may be used by another page of the chapter
+        if self.image and not Page.objects.filter(
+            image=self.image.name
+        ).exclude(id=self.id).exists():
             # XXX: can't use self.image.delete() for some reason
             self.image.storage.delete(self.image.name)
+            for name in self._variant_names.values():
+                self.image.storage.delete(name)
+            ingest.collect((self._file_name,))
         return super().delete()
 
     def get_absolute_url(self) -> str:
@@ -730,6 +988,38 @@ class Page(models.Model):
     def _file_name(self) -> str:
         return self.image.name.rsplit('/')[-1]
 
+    @cached_property
+    def _variant_names(self) -> Dict[str, str]:
+        stem = path.splitext(self.image.name)[0]
+        sizes = sorted(
+            (size, fmt) for fmt, size in
+            (('avif', self.avif_size), ('webp', self.webp_size)) if size
+        )
+        return {f'image/{fmt}': f'{stem}.{fmt}' for _, fmt in sizes}
+
+    @cached_property
+    def variants(self) -> Dict[str, str]:
+        """
+        Get the variants of the image that are smaller than it.
+
+        :return: The URL of each variant by MIME type, smallest first.
+        """
+        url = self.image.storage.url
+        return {m: url(n) for m, n in self._variant_names.items()}
+
+    def negotiate(self, accept: str) -> Tuple[str, str]:
+        """
+        Choose the smallest image type accepted by the client.
+
+        :param accept: The value of the ``Accept`` header.
+
+        :return: The URL & MIME type of the chosen image.
+        """
+        for mime, url in self.variants.items():
+            if mime in accept:
+                return url, mime
+        return self.image.url, self.mime_type
+
     def __str__(self) -> str:
         """
         Return a string representing the object.
@@ -830,7 +1120,234 @@ class Page(models.Model):
         return int(name, 16)
 
 
+class ViewPeriod(models.TextChoices):
+    """The possible :attr:`ViewCount.period` values."""
+    DAY = 'day', 'Day'
+    WEEK = 'week', 'Week'
+    MONTH = 'month', 'Month'
+
+
+class ViewCountManager(models.Manager):
+    """A :class:`~django.db.models.Manager` for view counts."""
+
+    def add(self, deltas: Dict[int, int], period: str = ViewPeriod.DAY,
+            start: Optional[date] = None) -> int:
+        """
+        Add views to the buckets of the given chapters.
+
+        The missing buckets are created before they are
+        incremented, so concurrent processes can add
+        views to the same bucket without losing any.
+
+        :param deltas: The views of each chapter ID.
+        :param period: The period of the buckets.
+        :param start: The first day of the buckets. Defaults to today.
+
+        :return: The number of updated buckets.
+        """
+        if not deltas:
+            return 0
+        start = start or tz.localdate()
+        self.bulk_create([
+            self.model(chapter_id=pk, period=period, date=start)
+            for pk in deltas
+        ], ignore_conflicts=True)
+        return self.filter(
+            chapter_id__in=deltas, period=period, date=start
+        ).update(views=F('views') + Case(
+            *(When(chapter_id=pk, then=Value(n)) for pk, n in deltas.items()),
+            default=Value(0), output_field=models.PositiveIntegerField()
+        ))
+
+
+class ViewCount(models.Model):
+    """A model representing the views of a chapter in a period."""
+    #: The chapter that was viewed.
+    chapter = models.ForeignKey(
+        Chapter, on_delete=models.CASCADE, related_name='view_counts'
+    )
+    #: The period of the bucket.
+    period = models.CharField(
+        max_length=5, choices=ViewPeriod.choices, default=ViewPeriod.DAY
+    )
+    #: The first day of the period.
+    date = models.DateField()
+    #: The views of the chapter in the period.
+    views = models.PositiveIntegerField(default=0)
+
+    objects = ViewCountManager()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('chapter', 'period', 'date'),
+                name='unique_chapter_view_count'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('period', 'date'),
+                name='view_count_period_date'
+            ),
+        )
+
+    def __str__(self) -> str:
+        """
+        Return a string representing the object.
+
+        :return: The chapter, the period, and the views.
+        """
+        return f'{self.chapter_id} ({self.period} of {self.date}): {self.views}'
+
+
+class SeriesStatsManager(models.Manager):
+    """A :class:`~django.db.models.Manager` for series statistics."""
+
+    def refresh(self, *ids: int) -> int:
+        """
+        Recompute the statistics of the given series.
+
+        :param ids: The IDs of the series. Defaults to all series.
+
+        :return: The number of refreshed series.
+        """
+        published = Q(chapters__released=True)
+        series = Series.objects.filter(id__in=ids) if ids else Series.objects
+        last = Chapter.objects.filter(
+            series_id=OuterRef('id'), released=True
+        ).order_by('-published').values('id')[:1]
+        rows = [self.model(
+            series_id=pk, chapter_count=count, latest_upload=latest,
+            total_views=views, last_chapter_id=last_id, next_release=upcoming
+        ) for pk, count, latest, views, upcoming, last_id in series.annotate(
+            stats_count=Count('chapters', filter=published),
+            stats_latest=Max('chapters__published', filter=published),
+            stats_views=Coalesce(Sum('chapters__views'), 0),
+            stats_next=Min('chapters__published', filter=~published),
+            stats_last=Subquery(last)
+        ).values_list(
+            'id', 'stats_count', 'stats_latest',
+            'stats_views', 'stats_next', 'stats_last'
+        ).order_by()]
+        # MySQL always upserts on the primary key
+        features = connections[self.db].features
+        unique = ('series',) if \
+            features.supports_update_conflicts_with_target else None
+        self.bulk_create(
+            rows, update_conflicts=True, unique_fields=unique,
+            update_fields=(
+                'chapter_count', 'latest_upload', 'total_views',
+                'last_chapter', 'next_release'
+            )
+        )
+        return len(rows)
+
+    def add_views(self, deltas: Dict[int, int]) -> int:
+        """
+        Add views to the statistics of the given series.
+
+        :param deltas: The views of each series ID.
+
+        :return: The number of updated series.
+        """
+        if not deltas:
+            return 0
+        return self.filter(series_id__in=deltas).update(
+            total_views=F('total_views') + Case(
+                *(When(series_id=pk, then=Value(n))
+                  for pk, n in deltas.items()),
+                default=Value(0), output_field=models.PositiveIntegerField()
+            )
+        )
+
+
+class SeriesStats(models.Model):
+    """
+    A model holding the denormalized statistics of a series.
+
+    The rows are kept up to date by the receivers of the app
+    and the view counter, and can be rebuilt with the
+    :mod:`~config.management.commands.rebuildstats` command.
+    """
+    #: The series of the statistics.
+    series = models.OneToOneField(
+        Series, primary_key=True, on_delete=models.CASCADE,
+        related_name='stats'
+    )
+    #: The number of published chapters.
+    chapter_count = models.PositiveIntegerField(default=0, db_index=True)
+    #: The publication date of the latest chapter.
+    latest_upload = models.DateTimeField(null=True, db_index=True)
+    #: The total views of the chapters.
+    total_views = models.PositiveIntegerField(default=0, db_index=True)
+    #: The latest published chapter.
+    last_chapter = models.ForeignKey(
+        Chapter, null=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    #: The publication date of the next scheduled chapter.
+    next_release = models.DateTimeField(null=True, db_index=True)
+
+    objects = SeriesStatsManager()
+
+    class Meta:
+        verbose_name_plural = 'series stats'
+
+    def __str__(self) -> str:
+        """
+        Return a string representing the object.
+
+        :return: The series, the chapters, and the views.
+        """
+        return f'{self.series_id}: {self.chapter_count} chapters, ' \
+            f'{self.total_views} views'
+
+
+class IngestStatus(models.TextChoices):
+    """The possible :attr:`IngestJob.status` values."""
+    PENDING = 'pending', 'Pending'
+    PROCESSING = 'processing', 'Processing'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Failed'
+
+
+class IngestJob(models.Model):
+    """A model representing the ingestion of a chapter archive."""
+    #: The chapter the archive belongs to.
+    chapter = models.OneToOneField(
+        Chapter, related_name='job', on_delete=models.CASCADE
+    )
+    #: The name of the archive in the storage.
+    archive = models.CharField(max_length=255)
+    #: The status of the job.
+    status = models.CharField(
+        max_length=10, choices=IngestStatus.choices,
+        default=IngestStatus.PENDING, db_index=True
+    )
+    #: The error message of the job, if it failed.
+    error = models.TextField(blank=True)
+    #: The date the job was created.
+    created = models.DateTimeField(auto_now_add=True)
+    #: The date the job was started.
+    started = models.DateTimeField(null=True, blank=True)
+    #: The date the job last reported that it's still running.
+    heartbeat = models.DateTimeField(null=True, blank=True)
+    #: The date the job was finished.
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('created',)
+
+    def __str__(self) -> str:
+        """
+        Return a string representing the object.
+
+        :return: The chapter and the status of the job.
+        """
+        return f'{self.chapter} ({self.get_status_display()})'
+
+
 __all__ = [
-    'Author', 'Artist', 'Series', 'Status',
-    'Chapter', 'Page', 'Category', 'Alias'
+    'Author', 'Artist', 'Series', 'Status', 'Chapter',
+    'Page', 'Category', 'Alias', 'IngestStatus', 'IngestJob',
+    'ChapterQuerySet', 'ViewPeriod', 'ViewCount', 'SeriesStats'
 ]
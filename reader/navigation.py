@@ -0,0 +1,400 @@
+"""
+Precomputed navigation of the reader.
+
+Every series with published chapters gets a :class:`NavigationIndex`
+that is built with a few queries and kept in the cache as tuples of
+plain values, so the pages of the reader can be rendered without
+touching the database while the index is cached.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import partial
+from posixpath import dirname, join, normpath, relpath
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from django.db.models import F, Prefetch
+
+from MangAdventure.cache import get_or_compute
+
+from .models import Page, Series
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any  # isort:skip
+
+#: The maximum number of seconds an index is cached for.
+TIMEOUT = 86400
+
+_KEY = 'reader.navigation.{}'
+
+
+class SeriesEntry:
+    """
+    The series of a :class:`NavigationIndex`.
+
+    :param slug: The slug of the series.
+    :param title: The title of the series.
+    :param url: The URL of the series.
+    :param cover: The URL of the cover of the series.
+    :param tags: The names of the categories of the series.
+    :param timestamp: The modification time of the series.
+    """
+    __slots__ = ('slug', 'title', 'url', 'cover', 'tags', 'timestamp')
+
+    def __init__(self, slug: str, title: str, url: str,
+                 cover: str, tags: str, timestamp: float):
+        self.slug = slug
+        self.title = title
+        self.url = url
+        self.cover = cover
+        self.tags = tags
+        self.timestamp = timestamp
+
+    @property
+    def modified(self) -> datetime:
+        """
+        Get the modification date of the series.
+
+        :return: A timezone-aware datetime.
+        """
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+    def get_absolute_url(self) -> str:
+        """
+        Get the absolute URL of the series.
+
+        :return: The URL of :func:`reader.views.series`.
+        """
+        return self.url
+
+    def __str__(self) -> str:
+        """
+        Return a string representing the series.
+
+        :return: The title of the series.
+        """
+        return self.title
+
+
+class PageEntry:
+    """
+    A page of a :class:`ChapterEntry`.
+
+    :param chapter: The chapter of the page.
+    :param number: The number of the page.
+    :param name: The file name of the image,
+                 relative to the chapter's directory.
+    :param width: The width of the image.
+    :param height: The height of the image.
+    :param mime_type: The MIME type of the image.
+    :param formats: The formats of the variants, smallest first.
+    """
+    __slots__ = (
+        'chapter', 'number', 'name', 'width',
+        'height', 'mime_type', 'formats'
+    )
+
+    def __init__(self, chapter: ChapterEntry, number: int, name: str,
+                 width: Optional[int], height: Optional[int],
+                 mime_type: str, formats: Tuple[str, ...]):
+        self.chapter = chapter
+        self.number = number
+        self.name = name
+        self.width = width
+        self.height = height
+        self.mime_type = mime_type
+        self.formats = formats
+
+    @property
+    def image(self) -> str:
+        """
+        Get the path of the image.
+
+        :return: A path relative to the storage of the pages.
+        """
+        return normpath(join(self.chapter.directory, self.name))
+
+    @property
+    def url(self) -> str:
+        """
+        Get the URL of the image.
+
+        :return: The URL of the image in the storage of the pages.
+        """
+        return Page.image.field.storage.url(self.image)
+
+    @property
+    def variants(self) -> Dict[str, str]:
+        """
+        Get the variants of the image that are smaller than it.
+
+        :return: The URL of each variant by MIME type, smallest first.
+        """
+        url = Page.image.field.storage.url
+        stem = self.image.rsplit('.', 1)[0]
+        return {f'image/{fmt}': url(f'{stem}.{fmt}') for fmt in self.formats}
+
+    def get_absolute_url(self) -> str:
+        """
+        Get the absolute URL of the page.
+
+        :return: The URL of :func:`reader.views.chapter_page`.
+        """
+        return f'{self.chapter.url}{self.number}/'
+
+
+class ChapterEntry:
+    """
+    A chapter of a :class:`NavigationIndex`.
+
+    :param index: The index of the chapter.
+    :param position: The position of the chapter, newest first.
+    :param title: The title of the chapter.
+    :param volume: The volume of the chapter.
+    :param number: The number of the chapter.
+    :param final: Whether this is the final chapter.
+    :param label: The chapter formatted according
+                  to the format of the series.
+    :param directory: The directory of the pages.
+    :param timestamp: The modification time of the chapter.
+    :param pages: The fields of the pages.
+    """
+    __slots__ = (
+        'index', 'position', 'title', 'volume', 'number',
+        'final', 'label', 'directory', 'timestamp', 'pages'
+    )
+
+    def __init__(self, index: NavigationIndex, position: int, title: str,
+                 volume: Optional[int], number: float, final: bool,
+                 label: str, directory: str, timestamp: float,
+                 pages: Tuple[tuple, ...]):
+        self.index = index
+        self.position = position
+        self.title = title
+        self.volume = volume
+        self.number = number
+        self.final = final
+        self.label = label
+        self.directory = directory
+        self.timestamp = timestamp
+        self.pages = tuple(PageEntry(self, *p) for p in pages)
+
+    @property
+    def url(self) -> str:
+        """
+        Get the URL of the chapter.
+
+        :return: The URL of :func:`reader.views.chapter_redirect`.
+        """
+        return f'{self.index.series.url}{self.volume or 0}/{self.number:g}/'
+
+    @property
+    def modified(self) -> datetime:
+        """
+        Get the modification date of the chapter.
+
+        :return: A timezone-aware datetime.
+        """
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+    @property
+    def series(self) -> SeriesEntry:
+        """
+        Get the series of the chapter.
+
+        :return: The series of the index.
+        """
+        return self.index.series
+
+    @property
+    def next(self) -> Optional[ChapterEntry]:
+        """
+        Get the chapter after this one.
+
+        :return: The next chapter, if there is one.
+        """
+        if self.position == 0:
+            return None
+        return self.index.chapters[self.position - 1]
+
+    @property
+    def prev(self) -> Optional[ChapterEntry]:
+        """
+        Get the chapter before this one.
+
+        :return: The previous chapter, if there is one.
+        """
+        if self.position + 1 == len(self.index.chapters):
+            return None
+        return self.index.chapters[self.position + 1]
+
+    def page(self, number: int) -> Optional[PageEntry]:
+        """
+        Get a page of the chapter.
+
+        :param number: The number of the page.
+
+        :return: The page, if it exists.
+        """
+        if 0 < number <= len(self.pages) and \
+                (page := self.pages[number - 1]).number == number:
+            return page
+        # the pages are not numbered consecutively
+        return next((p for p in self.pages if p.number == number), None)
+
+    def get_absolute_url(self) -> str:
+        """
+        Get the absolute URL of the chapter.
+
+        :return: The URL of :func:`reader.views.chapter_redirect`.
+        """
+        return self.url
+
+    def __str__(self) -> str:
+        """
+        Return a string representing the chapter.
+
+        :return: The chapter formatted according to the
+                 :attr:`~reader.models.Series.format`.
+        """
+        return self.label
+
+
+class NavigationIndex:
+    """
+    The published chapters of a series, in reading order.
+
+    The index is pickled as nested tuples of plain
+    values and the entries are recreated when loaded.
+
+    :param series: The fields of the series.
+    :param chapters: The fields of the chapters, newest first.
+    """
+    __slots__ = ('series', 'chapters', '_positions', '_state')
+
+    def __init__(self, series: tuple, chapters: Tuple[tuple, ...]):
+        self._state = (series, chapters)
+        self.series = SeriesEntry(*series)
+        self.chapters = tuple(
+            ChapterEntry(self, pos, *c) for pos, c in enumerate(chapters)
+        )
+        self._positions = {
+            (c.volume or 0, c.number): c.position for c in self.chapters
+        }
+
+    def __reduce__(self) -> Tuple[type, tuple]:
+        return self.__class__, self._state
+
+    def __len__(self) -> int:
+        """
+        Get the number of chapters.
+
+        :return: The number of published chapters.
+        """
+        return len(self.chapters)
+
+    def get(self, volume: Optional[int],
+            number: float) -> Optional[ChapterEntry]:
+        """
+        Find a chapter of the series.
+
+        :param volume: The volume of the chapter.
+        :param number: The number of the chapter.
+
+        :return: The chapter, if it has been published.
+        """
+        pos = self._positions.get((volume or 0, number))
+        return None if pos is None else self.chapters[pos]
+
+    @property
+    def modified(self) -> datetime:
+        """
+        Get the last time the series or its chapters were modified.
+
+        :return: The latest modification date.
+        """
+        return datetime.fromtimestamp(max(
+            (self.series.timestamp, *(c.timestamp for c in self.chapters))
+        ), timezone.utc)
+
+    @classmethod
+    def build(cls, slug: str) -> Optional[NavigationIndex]:
+        """
+        Build the index of a series.
+
+        :param slug: The slug of the series.
+
+        :return: The index, or ``None`` if the
+                 series is licensed or doesn't exist.
+        """
+        try:
+            series = Series.objects.only(
+                'slug', 'title', 'cover', 'format', 'modified'
+            ).get(slug=slug, licensed=False)
+        except Series.DoesNotExist:
+            return None
+        pages = Page.objects.only(
+            'chapter_id', 'number', 'image', 'width', 'height',
+            'mime_type', 'webp_size', 'avif_size'
+        )
+        chapters = []
+        for chapter in series.chapters.filter(released=True).only(
+            'series_id', 'title', 'volume', 'number',
+            'final', 'published', 'modified'
+        ).prefetch_related(Prefetch('pages', queryset=pages)).order_by(
+            F('volume').asc(nulls_last=True), 'number'
+        ).reverse():
+            chapter.series = series
+            all_pages = list(chapter.pages.all())
+            directory = dirname(all_pages[0].image.name) if all_pages else ''
+            chapters.append((
+                chapter.title, chapter.volume, chapter.number,
+                chapter.final, str(chapter), directory,
+                chapter.modified.timestamp(), tuple((
+                    p.number, relpath(p.image.name, directory or '.'),
+                    p.width, p.height, p.mime_type,
+                    tuple(m[6:] for m in p._variant_names)
+                ) for p in all_pages)
+            ))
+        tags = series.categories.values_list('name', flat=True)
+        return cls((
+            series.slug, series.title, series.get_absolute_url(),
+            series.cover.url if series.cover else '',
+            ','.join(tags), series.modified.timestamp()
+        ), tuple(chapters))
+
+    @classmethod
+    def get_cached(cls, slug: str) -> Optional[NavigationIndex]:
+        """
+        Get the index of a series from the cache, building it if needed.
+
+        :param slug: The slug of the series.
+
+        :return: The index, or ``None`` if the
+                 series is licensed or doesn't exist.
+
+        .. seealso:: :func:`~MangAdventure.cache.get_or_compute`
+        """
+        return get_or_compute(
+            _KEY.format(slug), partial(cls.build, slug),
+            TIMEOUT, tags=(f'series.{slug}',)
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Check whether this index is equal to another.
+
+        :param other: Any other object.
+
+        :return: ``True`` if the two indices have the same data.
+        """
+        if not isinstance(other, NavigationIndex):
+            return NotImplemented
+        return self._state == other._state
+
+
+__all__ = [
+    'TIMEOUT', 'SeriesEntry', 'PageEntry',
+    'ChapterEntry', 'NavigationIndex'
+]
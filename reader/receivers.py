@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, Type
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Type
 
 from django.conf import settings
 from django.contrib.redirects.models import Redirect
 from django.contrib.sites.models import Site
-from django.core.cache import cache
 from django.core.handlers.wsgi import WSGIHandler
 from django.core.signals import request_started
+from django.db import transaction
 from django.db.models import signals
 from django.dispatch import receiver
 from django.http.request import QueryDict
@@ -17,10 +18,44 @@ from django.urls.base import resolve
 from django.urls.exceptions import Resolver404
 from django.utils.text import slugify
 
-from .models import Chapter, Page, Series
+from MangAdventure.cache import invalidate_tags
+
+from groups.models import Group
+
+from . import ingest, lastmod, scheduler
+from .counters import chapter_views
+from .models import (
+    Artist, Author, Category, Chapter, Page, Series, SeriesStats
+)
 
 if TYPE_CHECKING:  # pragma: no cover
-    from os import PathLike
+    from os import PathLike  # isort:skip
+    from django.db.models import Model, QuerySet  # isort:skip
+
+_SERIES_FIELDS = {Author: 'authors', Artist: 'artists', Category: 'categories'}
+
+
+def _invalidate(*tags: str):
+    # once more after the commit, since the old rows
+    # can be cached again before the transaction ends
+    invalidate_tags(*tags)
+    transaction.on_commit(partial(invalidate_tags, *tags))
+
+
+def _invalidate_series(series: QuerySet):
+    chapters = Chapter.objects.filter(series__in=series)
+    _invalidate(
+        'library', *(f'series.{slug}' for slug in
+                     series.values_list('slug', flat=True)),
+        *(f'chapter.{pk}' for pk in chapters.values_list('id', flat=True))
+    )
+
+
+def _invalidate_chapters(chapters: QuerySet):
+    tags = {'library'}
+    for pk, slug in chapters.values_list('id', 'series__slug'):
+        tags.update((f'chapter.{pk}', f'series.{slug}'))
+    _invalidate(*tags)
 
 
 def _move(old_dir: PathLike, new_dir: PathLike):
@@ -69,6 +104,8 @@ def redirect_series(sender: Type[Series], instance: Series, **kwargs):
             for site_id in Site.objects.values_list('id', flat=True)
         ])
         _move(old_dir, new_dir)
+        invalidate_tags(f'series.{current.slug}')
+        lastmod.clear(current.slug)
         instance.cover = instance.cover.name.replace(
             str(old_dir), str(new_dir)
         )
@@ -129,30 +166,202 @@ def complete_series(sender: Type[Chapter], instance: Chapter, **kwargs):
         instance.series.save(update_fields=('status',))
 
 
+@receiver(signals.post_save, sender=Series)
+@receiver(signals.post_delete, sender=Series)
+def clear_series_cache(sender: Type[Series], instance: Series, **kwargs):
+    """
+    Receive a signal when a series has been saved or deleted.
+
+    Invalidate the cached values of the series and its chapters,
+    and clear its dates from the :mod:`~reader.lastmod` registry.
+
+    :param sender: The model class that sent the signal.
+    :param instance: The instance of the model.
+    """
+    lastmod.clear(instance.slug)
+    chapters = Chapter.objects.filter(series_id=instance.id)
+    _invalidate('library', f'series.{instance.slug}', *(
+        f'chapter.{pk}' for pk in chapters.values_list('id', flat=True)
+    ))
+
+
 @receiver(signals.post_save, sender=Chapter)
-def clear_chapter_cache(sender: Type[Chapter], instance:
-                        Chapter, created: bool, **kwargs):
+@receiver(signals.post_delete, sender=Chapter)
+def clear_chapter_cache(sender: Type[Chapter],
+                        instance: Chapter, **kwargs):
     """
-    Receive a signal when a chapter has been saved.
+    Receive a signal when a chapter has been saved or deleted.
 
-    Delete the relevant cache keys
+    Invalidate the cached values of the chapter and its series,
+    and clear their dates from the :mod:`~reader.lastmod` registry.
 
     :param sender: The model class that sent the signal.
     :param instance: The instance of the model.
-    :param created: Whether a new instance was created.
+    """
+    lastmod.clear(instance.series.slug)
+    _invalidate(
+        'library', f'series.{instance.series.slug}',
+        f'chapter.{instance.id}'
+    )
+
+
+@receiver(signals.post_save, sender=Series)
+def create_series_stats(sender: Type[Series], instance: Series,
+                        created: bool, **kwargs):
+    """
+    Receive a signal when a series has been saved.
+
+    Create the :class:`~reader.models.SeriesStats` of new series.
+
+    :param sender: The model class that sent the signal.
+    :param instance: The instance of the model.
+    :param created: Whether the series was created.
     """
     if created:
-        cache.delete(f'reader.chapters.{instance.series.slug}')
+        SeriesStats.objects.get_or_create(series=instance)
+
+
+@receiver(signals.post_save, sender=Chapter)
+@receiver(signals.post_delete, sender=Chapter)
+def update_series_stats(sender: Type[Chapter], instance: Chapter, **kwargs):
+    """
+    Receive a signal when a chapter has been saved or deleted.
+
+    Refresh the :class:`~reader.models.SeriesStats` of its
+    series, unless the chapter was deleted along with it.
+
+    :param sender: The model class that sent the signal.
+    :param instance: The instance of the model.
+    """
+    if isinstance(kwargs.get('origin'), Series):
+        return
+    SeriesStats.objects.refresh(instance.series_id)
+
+
+@receiver(signals.post_save, sender=Page)
+@receiver(signals.post_delete, sender=Page)
+def clear_page_cache(sender: Type[Page], instance: Page, **kwargs):
+    """
+    Receive a signal when a page has been saved or deleted.
+
+    Invalidate the cached values of its chapter and its series,
+    unless the page was deleted along with one of them.
+
+    :param sender: The model class that sent the signal.
+    :param instance: The instance of the model.
+    """
+    if not isinstance(kwargs.get('origin', instance), Page):
+        return
+    chapter = instance.chapter
+    _invalidate(
+        'library', f'series.{chapter.series.slug}', f'chapter.{chapter.id}'
+    )
+
+
+@receiver(signals.post_save, sender=Group)
+@receiver(signals.pre_delete, sender=Group)
+@receiver(signals.post_save, sender=Author)
+@receiver(signals.pre_delete, sender=Author)
+@receiver(signals.post_save, sender=Artist)
+@receiver(signals.pre_delete, sender=Artist)
+@receiver(signals.post_save, sender=Category)
+@receiver(signals.pre_delete, sender=Category)
+def clear_related_cache(sender: Type[Model], instance: Model, **kwargs):
+    """
+    Receive a signal when a related object has been saved or is deleted.
+
+    Invalidate the cached values of the chapters or series
+    that are related to a group, author, artist, or category.
+
+    :param sender: The model class that sent the signal.
+    :param instance: The instance of the model.
+    """
+    if sender is Group:
+        _invalidate_chapters(Chapter.objects.filter(groups=instance))
+    else:
+        field = _SERIES_FIELDS[sender]
+        _invalidate_series(Series.objects.filter(**{field: instance}))
+
+
+@receiver(signals.m2m_changed, sender=Chapter.groups.through)
+@receiver(signals.m2m_changed, sender=Series.authors.through)
+@receiver(signals.m2m_changed, sender=Series.artists.through)
+@receiver(signals.m2m_changed, sender=Series.categories.through)
+def clear_relation_cache(sender: Type[Model], instance: Model, action: str,
+                         reverse: bool, model: Type[Model],
+                         pk_set: Optional[Set], **kwargs):
+    """
+    Receive a signal when a many-to-many relation has changed.
+
+    Invalidate the cached values of the affected chapters or series.
+
+    :param sender: The intermediate model class of the relation.
+    :param instance: The instance whose relation was changed.
+    :param action: The type of the change.
+    :param reverse: Whether the relation was changed from the related side.
+    :param model: The class of the objects that were added or removed.
+    :param pk_set: The primary keys of the objects that were added or removed.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        model = type(instance)
+        lookup: Dict[str, Any] = {'id': instance.id}
+    elif pk_set is not None:
+        lookup = {'id__in': pk_set}
+    else:
+        field = next(
+            f.name for f in model._meta.many_to_many
+            if f.remote_field.through is sender
+        )
+        lookup = {field: instance}
+    if model is Chapter:
+        _invalidate_chapters(Chapter.objects.filter(**lookup))
+    else:
+        _invalidate_series(Series.objects.filter(**lookup))
+
+
+@receiver(request_started, sender=WSGIHandler)
+def recover_ingest_jobs(sender: Type[WSGIHandler], **kwargs):
+    """
+    Receive a signal when the first request of the process is processed.
+
+    Requeue the ingestion jobs that were interrupted when the
+    process was restarted, if :const:`INGEST_MODE
+    <MangAdventure.settings.CONFIG>` is ``thread``.
+
+    :param sender: The request handler class that sent the signal.
+
+    .. seealso:: :func:`reader.ingest.recover`
+    """
+    request_started.disconnect(recover_ingest_jobs, sender=WSGIHandler)
+    if settings.CONFIG['INGEST_MODE'] == 'thread':
+        ingest.recover()
+
+
+@receiver(request_started, sender=WSGIHandler)
+def release_chapters(sender: Type[WSGIHandler], **kwargs):
+    """
+    Receive a signal when a request is processed.
+
+    Release the scheduled chapters that are due.
+
+    :param sender: The request handler class that sent the signal.
+
+    .. seealso:: :func:`reader.scheduler.release_due`
+    """
+    scheduler.release_due()
 
 
-# TODO: figure out how to test this
 @receiver(request_started, sender=WSGIHandler)
 def track_view(sender: Type[WSGIHandler], environ:
-               Dict[str, str], **kwargs):  # pragma: no cover
+               Dict[str, str], **kwargs):
     """
     Receive a signal when a request is processed.
 
-    Track the chapter view if necessary.
+    Count the chapter view if necessary.
+    The views are buffered by
+    :obj:`~reader.counters.chapter_views`.
 
     :param sender: The request handler class that sent the signal.
     :param environ: The metadata dictionary provided to the request.
@@ -163,30 +372,24 @@ def track_view(sender: Type[WSGIHandler], environ:
         return
 
     if url.url_name == 'page':
-        try:
-            args_ = url.captured_kwargs  # type: ignore
-            if args_['page'] == 1:
-                Chapter.track_view(
-                    series__licensed=False,
-                    series__slug=args_['slug'],
-                    volume=args_['volume'] or None,
-                    number=args_['number']
-                )
-        except KeyError:
-            return
+        args_ = url.captured_kwargs  # type: ignore
+        if args_.get('page') == 1:
+            chapter_views.add(
+                (args_['slug'], args_['vol'] or None, args_['num'])
+            )
     elif url.url_name == 'chapters-pages':
         q = QueryDict(environ.get('QUERY_STRING', ''))
         if q.get('track', '') == 'true':
             try:
-                Chapter.track_view(
-                    series__licensed=False,
-                    id=int(url.captured_kwargs['pk'])  # type: ignore
-                )
+                chapter_views.add(int(url.captured_kwargs['pk']))
             except (KeyError, ValueError):
                 return
 
 
 __all__ = [
     'redirect_series', 'redirect_chapter',
-    'complete_series', 'track_view'
+    'complete_series', 'clear_series_cache', 'clear_chapter_cache',
+    'create_series_stats', 'update_series_stats',
+    'clear_page_cache', 'clear_related_cache', 'clear_relation_cache',
+    'recover_ingest_jobs', 'release_chapters', 'track_view'
 ]
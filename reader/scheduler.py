@@ -0,0 +1,62 @@
+"""
+The publication scheduler of the reader.
+
+Chapters with a future publication date are saved with their
+:attr:`~reader.models.Chapter.released` flag unset, so the read paths
+can filter on an indexed column instead of comparing the dates with
+the current time, and their cached results can be kept for as long as
+nothing changes. The chapters are released by :func:`release_due`,
+which is called at the start of every request, or by the
+:mod:`~config.management.commands.releasechapters` command.
+The chapters are released in bulk, and the cached values,
+dates and stats of their series are refreshed along with them.
+"""
+
+from __future__ import annotations
+
+from time import time
+from typing import Optional
+
+from django.core.cache import cache
+
+from MangAdventure.cache import LOCK_TIMEOUT, get_or_compute
+
+from .models import Chapter
+
+#: The maximum number of seconds the next release is cached for.
+TIMEOUT = 86400
+
+_KEY = 'reader.next_release'
+
+_LOCK = 'reader.release.lock'
+
+
+def _next_release() -> Optional[float]:
+    upcoming = Chapter.objects.next_release()
+    return None if upcoming is None else upcoming.timestamp()
+
+
+def release_due() -> int:
+    """
+    Release the scheduled chapters if the next release is due.
+
+    The date of the next release is cached until a chapter changes,
+    so this only costs a cache lookup while no chapter is due.
+
+    :return: The number of released chapters.
+    """
+    upcoming = get_or_compute(
+        _KEY, _next_release, TIMEOUT, tags=('library',)
+    )
+    if upcoming is None or upcoming > time():
+        return 0
+    # the other workers will see the chapters once they're released
+    if not cache.add(_LOCK, 1, LOCK_TIMEOUT):
+        return 0
+    try:
+        return Chapter.objects.release()
+    finally:
+        cache.delete(_LOCK)
+
+
+__all__ = ['TIMEOUT', 'release_due']
@@ -2,10 +2,12 @@
 
 from typing import Dict, Generic, List, Optional, Type, TypeVar
 
+from django.core.files import File
 from django.db.models import F
 
 from rest_framework.fields import (
-    CharField, DateTimeField, IntegerField, SerializerMethodField, URLField
+    CharField, ChoiceField, DateTimeField, DictField,
+    IntegerField, SerializerMethodField, URLField
 )
 from rest_framework.relations import (
     PrimaryKeyRelatedField, SlugRelatedField, StringRelatedField
@@ -13,7 +15,10 @@ from rest_framework.relations import (
 from rest_framework.serializers import ModelSerializer
 from rest_framework.validators import UniqueTogetherValidator
 
-from .models import Artist, Author, Category, Chapter, Page, Series
+from . import ingest
+from .models import (
+    Artist, Author, Category, Chapter, IngestStatus, Page, Series
+)
 
 
 class ArtistSerializer(ModelSerializer):
@@ -49,6 +54,10 @@ class ChapterSerializer(ModelSerializer):
         min_value=0, read_only=True,
         help_text='The total views of the chapter.'
     )
+    recent_views = IntegerField(
+        min_value=0, read_only=True,
+        help_text='The views of the chapter in the requested period.'
+    )
     series = SlugRelatedField(
         queryset=Series.objects.only('slug', 'title'),
         slug_field='slug', help_text='The series of the chapter.'
@@ -61,6 +70,24 @@ class ChapterSerializer(ModelSerializer):
         source='get_absolute_url', read_only=True,
         help_text='The absolute URL of the chapter.'
     )
+    status = ChoiceField(
+        source='ingest_status', read_only=True,
+        choices=IngestStatus.choices,
+        help_text='The processing status of the uploaded archive.'
+    )
+
+    def validate_file(self, value: File) -> File:
+        """
+        Extract the uploaded archive while it's validated.
+
+        :param value: The uploaded archive.
+
+        :return: The uploaded archive.
+
+        .. seealso:: :func:`reader.ingest.prepare`
+        """
+        ingest.prepare(value)
+        return value
 
     def to_representation(self, instance: Chapter) -> Dict:
         rep = super().to_representation(instance)
@@ -82,7 +109,8 @@ class ChapterSerializer(ModelSerializer):
         model = Chapter
         fields = (
             'id', 'title', 'number', 'volume', 'published', 'views',
-            'final', 'series', 'groups', 'full_title', 'url', 'file'
+            'recent_views', 'final', 'series', 'groups', 'full_title',
+            'url', 'file', 'status'
         )
         extra_kwargs = {
             'file': {'write_only': True}
@@ -101,13 +129,24 @@ class PageSerializer(ModelSerializer):
         source='get_absolute_url', read_only=True,
         help_text='The absolute URL of the page.'
     )
+    variants = DictField(
+        read_only=True, child=URLField(),
+        help_text='The URLs of smaller variants of the image by MIME type.'
+    )
 
     class Meta:
         model = Page
-        fields = ('id', 'chapter', 'image', 'number', 'url')
+        fields = (
+            'id', 'chapter', 'image', 'number', 'url', 'width',
+            'height', 'size', 'mime_type', 'variants'
+        )
         extra_kwargs = {
             'image': {'help_text': 'The image of the page.'},
-            'number': {'help_text': 'The number of the page.'}
+            'number': {'help_text': 'The number of the page.'},
+            'width': {'help_text': 'The width of the image in pixels.'},
+            'height': {'help_text': 'The height of the image in pixels.'},
+            'size': {'help_text': 'The size of the image in bytes.'},
+            'mime_type': {'help_text': 'The MIME type of the image.'}
         }
         validators = (
             UniqueTogetherValidator(
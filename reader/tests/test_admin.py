@@ -2,12 +2,14 @@ from django.contrib.admin import AdminSite
 from django.contrib.auth.models import User
 from django.http import HttpRequest
 
-from MangAdventure.tests.utils import get_test_image
+from MangAdventure.tests.utils import get_test_image, get_valid_zip_file
 
+from reader import ingest
 from reader.admin import (
-    ArtistAdmin, AuthorAdmin, CategoryAdmin, ChapterAdmin, SeriesAdmin
+    ArtistAdmin, AuthorAdmin, CategoryAdmin,
+    ChapterAdmin, ChapterForm, SeriesAdmin
 )
-from reader.models import Artist, Author, Category, Chapter, Series
+from reader.models import Artist, Author, Category, Chapter, Series, ViewCount
 
 from . import ReaderTestBase
 
@@ -34,6 +36,28 @@ class TestChapterAdmin(ReaderAdminTestBase):
     def test_number(self):
         assert self.admin._number(self.chapter) == '1.5'
 
+    def test_recent_views(self):
+        ViewCount.objects.add({self.chapter.id: 3})
+        assert not hasattr(
+            self.admin.get_queryset(self.request).get(), 'recent_views'
+        )
+        self.request.GET = {}
+        changelist = self.admin.get_changelist_instance(self.request)
+        chapter = changelist.get_queryset(self.request).get()
+        assert self.admin.recent_views(chapter) == 3
+        self.request.GET = {'o': '-8'}
+        changelist = self.admin.get_changelist_instance(self.request)
+        chapter = changelist.get_queryset(self.request).get()
+        assert self.admin.recent_views(chapter) == 3
+        assert self.admin.trend(chapter) == 3
+
+    def test_form_staged(self):
+        file = get_valid_zip_file()
+        form = ChapterForm(instance=self.chapter, files={'file': file})
+        form.cleaned_data = {'file': file}
+        assert form.clean_file() is file
+        assert ingest.staged(file) is not None
+
     def test_preview_page(self):
         self.chapter.pages.create(number=1, image=get_test_image())
         assert self.admin.preview(self.chapter).startswith('<img src="')
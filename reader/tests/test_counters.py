@@ -0,0 +1,119 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone as tz
+
+from reader.counters import ViewCounter, chapter_views
+from reader.models import Chapter, Series, SeriesStats, ViewCount, ViewPeriod
+from reader.receivers import track_view
+
+from . import ReaderTestBase
+
+
+class TestViewCounter(ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+        self.chapter = self.series.chapters.create(title='chapter', number=1)
+        self.counter = ViewCounter()
+        self.config = patch.dict(
+            settings.CONFIG, VIEWS_FLUSH_INTERVAL=3600
+        )
+        self.config.start()
+
+    def teardown_method(self):
+        super().teardown_method()
+        self.config.stop()
+
+    def _views(self) -> int:
+        return Chapter.objects.get(id=self.chapter.id).views
+
+    def test_flush(self):
+        for _ in range(3):
+            self.counter.add(self.chapter.id)
+        self.counter.add(('series', None, 1.0))
+        self.counter.add(('series', None, 2.0))
+        assert len(self.counter) == 5
+        assert self._views() == 0
+        assert self.counter.flush() == 1
+        assert self._views() == 4
+        assert ViewCount.objects.get(period=ViewPeriod.DAY).views == 4
+        assert SeriesStats.objects.get(series=self.series).total_views == 4
+        assert len(self.counter) == 0
+        assert self.counter.flush() == 0
+
+    def test_interval(self):
+        with patch.dict(settings.CONFIG, VIEWS_FLUSH_INTERVAL=0):
+            self.counter.add(self.chapter.id)
+        assert self._views() == 1
+
+    def test_failure(self):
+        self.counter.add(self.chapter.id)
+        with patch.object(ViewCounter, '_update', side_effect=OSError):
+            assert self.counter.flush() == 0
+        assert len(self.counter) == 1
+        self.counter.flush()
+        assert self._views() == 1
+
+    def test_licensed(self):
+        self.series.licensed = True
+        self.series.save()
+        self.counter.add(self.chapter.id)
+        assert self.counter.flush() == 0
+
+    def test_receiver(self):
+        url = reverse('reader:page', kwargs={
+            'slug': 'series', 'vol': 0, 'num': 1, 'page': 1
+        })
+        track_view(WSGIHandler, {'PATH_INFO': url})
+        url = reverse('api:v2:chapters-pages', kwargs={'pk': self.chapter.id})
+        track_view(WSGIHandler, {
+            'PATH_INFO': url, 'QUERY_STRING': 'track=true'
+        })
+        assert len(chapter_views) == 2
+        chapter_views.flush()
+        assert self._views() == 2
+
+
+class TestViewStats(ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+        self.old = self.series.chapters.create(title='old', number=1)
+        self.new = self.series.chapters.create(title='new', number=2)
+        today = tz.localdate()
+        self.week_ago = today - timedelta(days=8)
+        ViewCount.objects.add({self.old.id: 10}, start=self.week_ago)
+        ViewCount.objects.add({self.old.id: 5, self.new.id: 4})
+
+    def test_most_read(self):
+        chapters = list(Chapter.objects.most_read(30))
+        assert chapters == [self.old, self.new]
+        assert chapters[0].recent_views == 15
+        assert list(Chapter.objects.most_read(7)) == [self.old, self.new]
+
+    def test_trending(self):
+        chapters = list(Chapter.objects.trending(7))
+        assert chapters == [self.new, self.old]
+        assert chapters[0].trend == 4
+        assert chapters[1].trend == -5
+
+    def test_rollup(self):
+        out = StringIO()
+        call_command('rollupviews', days=1, stdout=out)
+        assert 'Rolled up 1 daily buckets' in out.getvalue()
+        assert not ViewCount.objects.filter(
+            period=ViewPeriod.DAY, date=self.week_ago
+        ).exists()
+        week = ViewCount.objects.get(period=ViewPeriod.WEEK)
+        assert week.views == 10
+        assert week.date.weekday() == 0
+        month = ViewCount.objects.get(period=ViewPeriod.MONTH)
+        assert month.views == 10 and month.date.day == 1
+        # the weekly buckets are still counted
+        assert Chapter.objects.most_read(30)[0].recent_views == 15
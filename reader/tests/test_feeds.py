@@ -1,4 +1,5 @@
 from django.http import HttpRequest
+from django.urls import reverse
 from django.utils.feedgenerator import Atom1Feed
 
 from MangAdventure.tests.utils import get_test_image
@@ -109,3 +110,13 @@ class TestReleases(FeedsTestBase):
         self._test_feed(feed, self.chapter2)
         r = feed(self.request, self.series2.slug)
         assert '<guid isPermaLink="true"' in str(r.content)
+
+    def test_not_modified(self):
+        url = reverse('releases.atom')
+        etag = self.client.get(url)['ETag']
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 304
+        self.chapter1.save()
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 200
+        assert r['ETag'] != etag
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone as tz
+
+from MangAdventure.tests.base import CacheTestMixin
+
+from reader import lastmod
+from reader.models import Chapter, Series
+
+from . import ReaderTestBase
+
+
+def _close(a: datetime, b: datetime) -> bool:
+    return abs((a - b).total_seconds()) < 0.001
+
+
+class TestLastModified(CacheTestMixin, ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+        self.chapter = self.series.chapters.create(
+            title='chapter', number=1, volume=1
+        )
+
+    def test_dates(self):
+        self.series.refresh_from_db()
+        assert _close(lastmod.site_modified(), self.series.modified)
+        assert _close(lastmod.series_modified('series'), self.series.modified)
+        for date in (
+            lastmod.series_modified('series', 1),
+            lastmod.series_modified('series', 1, 1)
+        ):
+            assert _close(date, self.chapter.modified)
+        assert lastmod.series_modified('series', 0) is None
+        assert lastmod.series_modified('series', 1, 2) is None
+        assert lastmod.series_modified('missing') is None
+
+    def test_cached(self, django_assert_num_queries):
+        lastmod.site_modified()
+        lastmod.series_modified('series')
+        with django_assert_num_queries(0):
+            lastmod.site_modified()
+            lastmod.series_modified('series', 1, 1)
+
+    def test_save(self):
+        assert lastmod.series_modified('series', 1, 2) is None
+        chapter = self.series.chapters.create(
+            title='chapter', number=2, volume=1
+        )
+        assert lastmod.series_modified('series', 1, 2) == chapter.modified
+        chapter.delete()
+        assert lastmod.series_modified('series', 1, 2) is None
+
+    def test_commit(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            lastmod.clear('series')
+            # a concurrent request caches the old date
+            lastmod.series_modified('series')
+        assert cache.get('lastmod.series.series') is None
+
+    def test_scheduled(self):
+        other = Series.objects.create(title='other')
+        chapter = other.chapters.create(
+            title='chapter', number=1,
+            published=tz.now() + timedelta(hours=1)
+        )
+        assert lastmod.series_modified('other') is None
+        Chapter.objects.filter(id=chapter.id).update(published=tz.now())
+        assert Chapter.objects.release() == 1
+        assert lastmod.series_modified('other') is not None
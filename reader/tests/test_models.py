@@ -1,16 +1,31 @@
-from os.path import exists
-
+from datetime import timedelta
+from io import StringIO
+from os import utime
+from os.path import exists, getmtime, samefile, splitext
+from pathlib import Path
+from unittest.mock import Mock, patch
+from zipfile import ZipFile
+from zlib import crc32
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone as tz
 
 from pytest import raises
 
 from MangAdventure.tests.utils import (
-    get_multi_subdir_zip, get_random_file, get_test_image,
-    get_valid_zip_file, get_zip_with_invalid_images
+    get_multi_page_zip, get_multi_subdir_zip, get_random_file,
+    get_test_image, get_valid_zip_file, get_zip_with_invalid_images
 )
+from MangAdventure.validators import zipfile_validator
 
-from reader.models import Artist, Author, Category, Chapter, Page, Series
+from reader import ingest
+from reader.models import (
+    Artist, Author, Category, Chapter, IngestJob,
+    IngestStatus, Page, Series, SeriesStats
+)
 
 from . import ReaderTestBase
 
@@ -145,8 +160,114 @@ class TestChapter(ReaderTestBase):
         chapter = self.create_chapter()
         chapter.file = get_valid_zip_file()
         chapter.save()
-        assert chapter.pages.count() == 1
-        assert chapter.zip()
+        page = chapter.pages.get()
+        assert (page.width, page.height) == (200, 200)
+        assert page.size == page.image.size
+        assert page.mime_type == 'image/jpeg'
+        with page.image.open('rb') as img:
+            assert page.crc32 == crc32(img.read())
+        with chapter.zip() as f:
+            assert f.read(4) == b'PK\x03\x04'
+
+    def test_archive(self):
+        chapter = self.create_chapter()
+        chapter.file = get_multi_page_zip(2)
+        chapter.save()
+        archive = chapter.archive()
+        assert settings.ARCHIVE_ROOT in archive.parents
+        assert chapter.archive() == archive
+        with ZipFile(archive) as zf:
+            assert zf.namelist() == ['001.png', '002.png', 'ComicInfo.xml']
+        chapter.file = get_multi_page_zip(2, changed=(2,))
+        chapter.save()
+        assert not archive.exists()
+        assert chapter.archive() != archive
+
+    def test_file_replace(self):
+        chapter = self.create_chapter()
+        chapter.file = get_multi_page_zip(3)
+        chapter.save()
+        old = {p.number: p for p in chapter.pages.all()}
+        old_path = old[3].image.path
+        mtime = getmtime(old[1].image.path)
+        chapter.file = get_multi_page_zip(3, changed=(3,))
+        chapter.save()
+        new = {p.number: p for p in chapter.pages.all()}
+        assert [p.id for p in new.values()] == [p.id for p in old.values()]
+        assert new[1].image == old[1].image
+        assert getmtime(new[1].image.path) == mtime
+        assert new[3].image != old[3].image
+        assert not exists(old_path)
+        assert exists(new[3].image.path)
+
+    def test_file_variants(self):
+        chapter = self.create_chapter()
+        chapter.file = get_multi_page_zip(2)
+        chapter.save()
+        page = chapter.pages.first()
+        webp = Path(page.image.path).with_suffix('.webp')
+        assert page.webp_size == webp.stat().st_size
+        assert page.webp_size < page.size
+        assert page.avif_size is None
+        assert list(page.variants) == ['image/webp']
+        assert page.negotiate('image/webp,*/*')[1] == 'image/webp'
+        assert page.negotiate('*/*') == (page.image.url, 'image/png')
+        chapter.file = get_multi_page_zip(2, changed=(1,))
+        chapter.save()
+        assert not webp.exists()
+
+    def test_file_dedup(self):
+        with patch.dict(settings.CONFIG, DEDUP_PAGES=True):
+            chapter1 = self.create_chapter(number=1)
+            chapter1.file = get_multi_page_zip(2)
+            chapter1.save()
+            chapter2 = self.create_chapter(number=2)
+            chapter2.file = get_multi_page_zip(2)
+            chapter2.save()
+            page1, page2 = chapter1.pages.last(), chapter2.pages.last()
+            shared = ingest.store_path(page1._file_name)
+            assert samefile(page1.image.path, page2.image.path)
+            assert samefile(page1.image.path, shared)
+            chapter2.file = get_multi_page_zip(2, changed=(2,))
+            chapter2.save()
+            assert exists(shared)
+            page1.delete()
+            assert not exists(shared)
+
+    def test_file_staged(self):
+        chapter = self.create_chapter()
+        file = get_valid_zip_file()
+        zipfile_validator(file)
+        assert ingest.staged(file) is None
+        ingest.prepare(file)
+        staged = ingest.staged(file)
+        assert staged and len(staged.pages) == 1
+        chapter.file = file
+        chapter.save()
+        assert not staged.directory.exists()
+        page = chapter.pages.get()
+        assert page.image.name.endswith(staged.pages[0].filename)
+        assert exists(page.image.path)
+
+    def test_staging_pruned(self):
+        old = settings.MEDIA_ROOT / ingest.STAGING_DIR / 'old'
+        old.mkdir(parents=True)
+        mtime = getmtime(old) - ingest.STAGING_TIMEOUT - 1
+        utime(old, (mtime, mtime))
+        ingest.stage(get_valid_zip_file())
+        assert not old.exists()
+
+    def test_file_parallel(self):
+        serial = ingest.stage(get_multi_page_zip())
+        with patch.dict(settings.CONFIG, INGEST_PROCESSES=2):
+            chapter = self.create_chapter()
+            chapter.file = get_multi_page_zip()
+            staged = ingest.stage(chapter.file)
+            assert staged.pages == serial.pages
+            chapter.save()
+        assert [p.image.name.split('/')[-1] for p in chapter.pages.all()] \
+            == [p.filename for p in serial.pages]
+        assert chapter.pages.last().number == 12
 
     def test_file_invalid(self):
         chapter = self.create_chapter()
@@ -168,6 +289,107 @@ class TestChapter(ReaderTestBase):
         assert info.find('./Number').text == '2.5'
 
 
+class TestIngestJob(ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.config = patch.dict(settings.CONFIG, INGEST_MODE='queue')
+        self.config.start()
+
+    def teardown_method(self):
+        self.config.stop()
+        super().teardown_method()
+
+    def test_queue(self):
+        chapter = TestChapter.create_chapter()
+        chapter.file = get_valid_zip_file()
+        chapter.save()
+        archive = chapter.job.archive
+        assert chapter.ingest_status == IngestStatus.PENDING
+        assert chapter.pages.count() == 0
+        out = StringIO()
+        call_command('ingest', '--once', '--workers', '1', stdout=out)
+        assert 'Ready' in out.getvalue()
+        chapter.refresh_from_db()
+        assert chapter.job.status == IngestStatus.READY
+        assert chapter.pages.count() == 1
+        assert not chapter.file
+        assert not exists(settings.MEDIA_ROOT / archive)
+        assert not ingest.process(chapter.job.pk)
+
+    def test_failed(self):
+        chapter = TestChapter.create_chapter()
+        chapter.file = get_zip_with_invalid_images()
+        chapter.save()
+        err = StringIO()
+        call_command('ingest', '--once', '--workers', '1', stderr=err)
+        chapter.job.refresh_from_db()
+        assert chapter.job.status == IngestStatus.FAILED
+        assert chapter.job.error in err.getvalue()
+        assert chapter.pages.count() == 0
+        with raises(ValidationError):
+            zipfile_validator(get_multi_subdir_zip())
+        # the failed archive is not submitted again
+        chapter.refresh_from_db()
+        chapter.save()
+        assert chapter.job.status == IngestStatus.FAILED
+
+    def test_processing(self):
+        chapter = TestChapter.create_chapter()
+        chapter.file = get_valid_zip_file()
+        chapter.save()
+        job = chapter.job
+        IngestJob.objects.filter(pk=job.pk).update(
+            status=IngestStatus.PROCESSING
+        )
+        chapter.save()
+        chapter.file = get_valid_zip_file()
+        chapter.save()
+        job.refresh_from_db()
+        assert job.status == IngestStatus.PROCESSING
+        assert job.archive != chapter.file.name
+        # the new archive is queued once the job is finished
+        IngestJob.objects.filter(pk=job.pk).update(
+            status=IngestStatus.PENDING
+        )
+        assert ingest.process(job.pk)
+        job.refresh_from_db()
+        assert job.status == IngestStatus.PENDING
+        assert job.archive == chapter.file.name
+
+    def test_recover(self):
+        chapter = TestChapter.create_chapter()
+        chapter.file = get_valid_zip_file()
+        chapter.save()
+        IngestJob.objects.filter(pk=chapter.job.pk).update(
+            status=IngestStatus.PROCESSING, started=tz.now()
+        )
+        assert ingest.recover() == 0
+        stale = tz.now() - timedelta(seconds=ingest.STALE_TIMEOUT + 1)
+        # long jobs are kept while their heartbeat is renewed
+        IngestJob.objects.filter(pk=chapter.job.pk).update(
+            started=stale, heartbeat=tz.now()
+        )
+        assert ingest.recover() == 0
+        IngestJob.objects.filter(pk=chapter.job.pk).update(heartbeat=stale)
+        assert ingest.recover() == 1
+        chapter.job.refresh_from_db()
+        assert chapter.job.status == IngestStatus.PENDING
+
+    def test_heartbeat(self):
+        chapter = TestChapter.create_chapter()
+        chapter.file = get_valid_zip_file()
+        chapter.save()
+        IngestJob.objects.filter(pk=chapter.job.pk).update(
+            status=IngestStatus.PROCESSING
+        )
+        stop = Mock(**{'wait.side_effect': (False, True)})
+        with patch('reader.ingest.connections') as connections:
+            ingest._beat(chapter.job.pk, stop)
+        connections.close_all.assert_called_once()
+        chapter.job.refresh_from_db()
+        assert chapter.job.heartbeat is not None
+
+
 class TestPage(ReaderTestBase):
     @staticmethod
     def create_page(number: int = 1):
@@ -179,13 +401,16 @@ class TestPage(ReaderTestBase):
         page = self.create_page()
         assert str(page) == 'My Series - 1/0.5 #001'
         assert hash(page) > 0
+        assert (page.width, page.height) == (200, 200)
+        assert page.mime_type == 'image/png'
 
     def test_delete(self):
         page = self.create_page()
         path = page.image.path
-        assert exists(path)
+        webp = splitext(path)[0] + '.webp'
+        assert exists(path) and exists(webp)
         page.delete()
-        assert not exists(path)
+        assert not exists(path) and not exists(webp)
 
     def test_get_absolute_url(self):
         page = self.create_page()
@@ -209,3 +434,50 @@ class TestPage(ReaderTestBase):
         assert not page1 == page2
         assert page1 == 1
         assert not page1 == 'test'
+
+
+class TestSeriesStats(ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+
+    def _stats(self) -> SeriesStats:
+        return SeriesStats.objects.get(series=self.series)
+
+    def test_chapters(self):
+        assert self._stats().chapter_count == 0
+        first = self.series.chapters.create(title='first', number=1, views=3)
+        second = self.series.chapters.create(title='second', number=2, views=3)
+        stats = self._stats()
+        assert stats.chapter_count == 2
+        assert stats.total_views == 6
+        assert stats.latest_upload == second.published
+        assert stats.last_chapter == second
+        second.delete()
+        stats = self._stats()
+        assert stats.chapter_count == 1
+        assert stats.last_chapter == first
+        self.series.delete()
+        assert not SeriesStats.objects.exists()
+
+    def test_scheduled(self):
+        self.series.chapters.create(
+            title='chapter', number=1,
+            published=tz.now() + timedelta(hours=1)
+        )
+        assert self._stats().chapter_count == 0
+        assert self._stats().next_release is not None
+        assert Chapter.objects.release() == 0
+        Chapter.objects.update(published=tz.now())
+        assert Chapter.objects.release() == 1
+        assert self._stats().chapter_count == 1
+        assert self._stats().next_release is None
+
+    def test_rebuild(self):
+        self.series.chapters.create(title='chapter', number=1)
+        SeriesStats.objects.update(chapter_count=0, total_views=5)
+        out = StringIO()
+        call_command('rebuildstats', 'series', stdout=out)
+        assert 'statistics of 1 series' in out.getvalue()
+        assert self._stats().chapter_count == 1
+        assert self._stats().total_views == 0
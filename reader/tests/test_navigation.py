@@ -0,0 +1,60 @@
+from datetime import timedelta
+from pickle import dumps, loads
+
+from django.utils import timezone as tz
+
+from MangAdventure.tests.utils import get_valid_zip_file
+
+from reader.models import Chapter, Series
+from reader.navigation import NavigationIndex
+
+from . import ReaderTestBase
+
+
+class TestNavigationIndex(ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+        self.series.chapters.create(
+            title='first', number=1, file=get_valid_zip_file()
+        )
+        self.series.chapters.create(title='second', number=2, volume=1)
+        self.series.chapters.create(
+            title='third', number=3, volume=1,
+            published=tz.now() + timedelta(hours=1)
+        )
+
+    def test_build(self):
+        index = NavigationIndex.build('series')
+        assert len(index) == 2
+        assert NavigationIndex.build('missing') is None
+        first, second = index.get(0, 1), index.get(1, 2)
+        # chapters without a volume are considered the latest
+        assert [c.title for c in index.chapters] == ['first', 'second']
+        assert second.next is first and first.prev is second
+        assert first.next is None and second.prev is None
+        assert index.get(1, 3) is None
+        assert str(first) == str(Chapter.objects.get(title='first'))
+        assert first.page(1).get_absolute_url() == f'{first.url}1/'
+        assert first.page(1).image == \
+            Chapter.objects.get(title='first').pages.get(number=1).image.name
+        assert first.page(len(first.pages) + 1) is None
+
+    def test_pickle(self):
+        index = NavigationIndex.build('series')
+        data = dumps(index)
+        assert loads(data) == index
+        chapters = list(Chapter.objects.released().select_related(
+            'series'
+        ).only(
+            'title', 'number', 'volume', 'published',
+            'final', 'series__slug', 'series__cover',
+            'series__title', 'series__format'
+        ))
+        assert len(data) * 2 < len(dumps(chapters))
+
+    def test_release(self):
+        Chapter.objects.filter(title='third').update(published=tz.now())
+        assert len(NavigationIndex.build('series')) == 2
+        Chapter.objects.release()
+        assert len(NavigationIndex.build('series')) == 3
@@ -2,11 +2,12 @@ from typing import List, Tuple
 
 from django.conf import settings
 from django.contrib.redirects.models import Redirect
-from django.core.cache import cache
 
+from MangAdventure.tests.base import CacheTestMixin
 from MangAdventure.tests.utils import get_test_image, get_valid_zip_file
 
-from reader.models import Series
+from reader.models import Category, Series
+from reader.navigation import NavigationIndex
 
 from . import ReaderTestBase
 
@@ -87,12 +88,44 @@ class TestCompleteSeries(ReaderTestBase):
         assert self.series.status == 'completed'
 
 
-class TestClearChapterCache(ReaderTestBase):
+class TestClearCache(CacheTestMixin, ReaderTestBase):
     def setup_method(self):
         super().setup_method()
         self.series = Series.objects.create(title='series')
-
-    def test_save(self):
-        cache.set(f'reader.chapters.{self.series.slug}', [])
-        self.series.chapters.create(title='Chapter', number=1)
-        assert f'reader.chapters.{self.series.slug}' not in cache
+        self.chapter = self.series.chapters.create(title='Chapter', number=1)
+
+    def _index(self) -> NavigationIndex:
+        return NavigationIndex.get_cached(self.series.slug)
+
+    def test_chapter(self):
+        assert self._index().get(0, 1).title == 'Chapter'
+        self.chapter.title = 'Edited'
+        self.chapter.save()
+        assert self._index().get(0, 1).title == 'Edited'
+        self.series.chapters.create(title='New', number=2)
+        assert len(self._index()) == 2
+        self.chapter.delete()
+        assert len(self._index()) == 1
+
+    def test_series(self):
+        assert str(self._index().get(0, 1)) == 'Ch. 1: Chapter'
+        self.series.format = '{title}'
+        self.series.save()
+        assert str(self._index().get(0, 1)) == 'Chapter'
+
+    def test_relations(self):
+        category = Category.objects.create(name='Action')
+        assert self._index().series.tags == ''
+        self.series.categories.add(category)
+        assert self._index().series.tags == 'Action'
+        category.name = 'Adventure'
+        category.save()
+        assert self._index().series.tags == 'Adventure'
+        category.series_set.clear()
+        assert self._index().series.tags == ''
+
+    def test_unchanged(self, django_assert_num_queries):
+        self._index()
+        Series.objects.create(title='other')
+        with django_assert_num_queries(0):
+            self._index()
@@ -0,0 +1,49 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone as tz
+
+from MangAdventure.tests.base import CacheTestMixin
+
+from reader.models import Chapter, Series
+from reader.scheduler import release_due
+
+from . import ReaderTestBase
+
+
+class TestScheduler(CacheTestMixin, ReaderTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series = Series.objects.create(title='series')
+        self.chapter = self.series.chapters.create(
+            title='chapter', number=1,
+            published=tz.now() + timedelta(hours=1)
+        )
+
+    def test_released(self):
+        assert not self.chapter.released
+        assert not Chapter.objects.released().exists()
+        self.chapter.published = tz.now()
+        self.chapter.save()
+        assert Chapter.objects.released().exists()
+
+    def test_release_due(self, django_assert_num_queries):
+        assert release_due() == 0
+        with django_assert_num_queries(0):
+            assert release_due() == 0
+        Chapter.objects.update(published=tz.now())
+        # the cached date of the next release is used
+        assert release_due() == 0
+        cache.clear()
+        assert release_due() == 1
+        assert Chapter.objects.released().count() == 1
+        assert release_due() == 0
+
+    def test_command(self):
+        Chapter.objects.update(published=tz.now())
+        out = StringIO()
+        call_command('releasechapters', stdout=out)
+        assert 'Released 1 chapters' in out.getvalue()
+        assert Chapter.objects.get(id=self.chapter.id).released
@@ -1,9 +1,15 @@
+from io import BytesIO
+from unittest.mock import patch
+from zipfile import ZipFile
+
+from django.conf import settings
 from django.core.cache import cache
-from django.http import FileResponse
+from django.http import FileResponse, StreamingHttpResponse
 from django.urls import reverse
 
 from pytest import mark
 
+from MangAdventure.tests.base import locmem_cache
 from MangAdventure.tests.utils import get_test_image, get_valid_zip_file
 
 from reader.models import Series
@@ -32,6 +38,41 @@ class TestDirectory(ReaderViewTestBase):
     def test_get(self):
         r = self.client.get(self.URL)
         assert r.status_code == 200
+        assert r.context['all_series'][0].latest_chapters[0].number == 1
+
+    def test_paginate(self):
+        other = Series.objects.create(
+            title='series 2', cover=get_test_image()
+        )
+        other.chapters.create(title='chapter', number=1)
+        with patch.dict(settings.CONFIG, MAX_SERIES=1):
+            r = self.client.get(self.URL)
+            assert r.context['all_series'] == [self.series]
+            assert not r.context['prev_cursor']
+            r = self.client.get(self.URL, {'after': r.context['next_cursor']})
+            assert r.context['all_series'] == [other]
+            assert not r.context['next_cursor']
+            r = self.client.get(self.URL, {'before': r.context['prev_cursor']})
+            assert r.context['all_series'] == [self.series]
+            assert r.context['next_cursor']
+
+    def test_get_invalid_cursor(self):
+        r = self.client.get(self.URL, {'after': 'invalid'})
+        assert r.status_code == 404
+
+    def test_get_latest_chapters(self):
+        self.series.chapters.create(title='chapter', number=2)
+        with patch.dict(settings.CONFIG, MAX_CHAPTERS=2):
+            r = self.client.get(self.URL)
+            chapters = r.context['all_series'][0].latest_chapters
+            assert [c.number for c in chapters] == [2, 1]
+
+    @locmem_cache()
+    def test_get_not_modified(self, django_assert_num_queries):
+        modified = self.client.get(self.URL)['Last-Modified']
+        with django_assert_num_queries(0):
+            r = self.client.get(self.URL, HTTP_IF_MODIFIED_SINCE=modified)
+        assert r.status_code == 304
 
 
 class TestSeries(ReaderViewTestBase):
@@ -40,6 +81,14 @@ class TestSeries(ReaderViewTestBase):
         r = self.client.get(url)
         assert r.status_code == 200
 
+    @locmem_cache()
+    def test_get_not_modified(self, django_assert_num_queries):
+        url = reverse('reader:series', kwargs={'slug': 'series'})
+        modified = self.client.get(url)['Last-Modified']
+        with django_assert_num_queries(0):
+            r = self.client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        assert r.status_code == 304
+
     def test_get_not_found(self):
         url = reverse('reader:series', kwargs={'slug': 'not-found'})
         r = self.client.get(url)
@@ -62,6 +111,32 @@ class TestChapterPage(ReaderViewTestBase):
         })
         r = self.client.get(url)
         assert r.status_code == 200
+        assert 'Accept' not in r.get('Vary', '')
+
+    def test_get_not_modified(self):
+        url = reverse('reader:page', kwargs={
+            'slug': 'series', 'vol': 0, 'num': 1, 'page': 1
+        })
+        etag = self.client.get(url)['ETag']
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 304
+        # the variants are chosen by the browser
+        r = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT='image/webp'
+        )
+        assert r.status_code == 304
+        self.client.force_login(self.user)
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 200
+
+    @locmem_cache()
+    def test_get_cached(self, django_assert_num_queries):
+        url = reverse('reader:page', kwargs={
+            'slug': 'series', 'vol': 0, 'num': 1, 'page': 1
+        })
+        assert self.client.get(url).status_code == 200
+        with django_assert_num_queries(0):
+            assert self.client.get(url).status_code == 200
 
     @mark.parametrize('values', _values)
     def test_get_not_found(self, values):
@@ -101,8 +176,69 @@ class TestChapterDownload(ReaderViewTestBase):
         self.client.force_login(self.user)
         r = self.client.get(url)
         assert r.status_code == 200
+        assert isinstance(r, StreamingHttpResponse)
+        content = b''.join(r.streaming_content)
+        assert len(content) == int(r['Content-Length'])
+        assert r['Content-Disposition'].endswith('c1.cbz"')
+        r = self.client.get(url)
         assert isinstance(r, FileResponse)
-        assert r.filename.endswith('c1.cbz')
+        assert r['Content-Disposition'].endswith('c1.cbz"')
+        assert b''.join(r.streaming_content) == content
+
+    def test_get_range(self):
+        url = reverse('reader:cbz', kwargs={
+            'slug': 'series', 'vol': 0, 'num': 1
+        })
+        self.client.force_login(self.user)
+        r = self.client.get(url, HTTP_RANGE='bytes=0-9')
+        assert r.status_code == 206
+        content = self.series.chapters.get().archive().read_bytes()
+        assert b''.join(r.streaming_content) == content[:10]
+        assert r['Content-Range'] == f'bytes 0-9/{len(content)}'
+        assert r['Accept-Ranges'] == 'bytes'
+        r = self.client.get(
+            url, HTTP_RANGE='bytes=0-1,-2', HTTP_IF_RANGE=r['ETag']
+        )
+        assert r.status_code == 206
+        body = b''.join(r.streaming_content)
+        assert len(body) == int(r['Content-Length'])
+        assert r['Content-Type'].startswith('multipart/byteranges')
+        assert content[:2] in body and content[-2:] in body
+        r = self.client.get(
+            url, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"outdated"'
+        )
+        assert r.status_code == 200
+        assert b''.join(r.streaming_content) == content
+        r = self.client.get(url, HTTP_RANGE=f'bytes={len(content)}-')
+        assert r.status_code == 416
+        assert r['Content-Range'] == f'bytes */{len(content)}'
+
+    def test_get_not_modified(self):
+        url = reverse('reader:cbz', kwargs={
+            'slug': 'series', 'vol': 0, 'num': 1
+        })
+        self.client.force_login(self.user)
+        etag = self.client.get(url)['ETag']
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert r.status_code == 304
+        assert r['ETag'] == etag
+
+    @mark.parametrize('server', ('nginx', 'apache'))
+    def test_get_sendfile(self, server):
+        url = reverse('reader:cbz', kwargs={
+            'slug': 'series', 'vol': 0, 'num': 1
+        })
+        self.client.force_login(self.user)
+        self.series.chapters.get().archive()
+        with patch.dict(settings.CONFIG, SENDFILE=server):
+            r = self.client.get(url)
+        assert r.status_code == 200
+        assert not r.content
+        assert r['Content-Disposition'].endswith('c1.cbz"')
+        if server == 'nginx':
+            assert r['X-Accel-Redirect'].startswith('/archives/chapters/')
+        else:
+            assert r['X-Sendfile'].endswith('.cbz')
 
     def test_get_not_found(self):
         self.series.chapters.all().delete()
@@ -120,3 +256,69 @@ class TestChapterDownload(ReaderViewTestBase):
         self.client.logout()
         r = self.client.get(url)
         assert r.status_code == 401
+
+
+class TestBulkDownload(ReaderViewTestBase):
+    def setup_method(self):
+        super().setup_method()
+        self.series.chapters.create(
+            title='volume', file=get_valid_zip_file(), number=2, volume=1
+        )
+
+    def _names(self, content):
+        with ZipFile(BytesIO(content)) as zf:
+            assert zf.testzip() is None
+            return sorted({n.split('/')[0] for n in zf.namelist()})
+
+    def test_get(self):
+        url = reverse('reader:series.cbz', kwargs={'slug': 'series'})
+        self.client.force_login(self.user)
+        # one of the chapters is read from its prebuilt archive
+        self.series.chapters.get(number=1).archive()
+        r = self.client.get(url)
+        assert r.status_code == 200
+        content = b''.join(r.streaming_content)
+        assert len(content) == int(r['Content-Length'])
+        assert r['Content-Disposition'].endswith('series.cbz"')
+        assert self._names(content) == ['c1', 'v1 c2']
+        r = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        assert r.status_code == 206
+        assert b''.join(r.streaming_content) == content[100:200]
+        assert r['Content-Range'] == f'bytes 100-199/{len(content)}'
+
+    def test_get_volume(self):
+        url = reverse('reader:volume.cbz', kwargs={'slug': 'series', 'vol': 1})
+        self.client.force_login(self.user)
+        r = self.client.get(url)
+        assert r.status_code == 200
+        assert r['Content-Disposition'].endswith('series - v1.cbz"')
+        assert self._names(b''.join(r.streaming_content)) == ['v1 c2']
+
+    def test_get_not_found(self):
+        url = reverse('reader:volume.cbz', kwargs={'slug': 'series', 'vol': 2})
+        self.client.force_login(self.user)
+        assert self.client.get(url).status_code == 404
+
+    def test_get_unauthorized(self):
+        url = reverse('reader:series.cbz', kwargs={'slug': 'series'})
+        self.client.logout()
+        assert self.client.get(url).status_code == 401
+
+    @locmem_cache()
+    def test_get_throttled(self):
+        url = reverse('reader:series.cbz', kwargs={'slug': 'series'})
+        self.client.force_login(self.user)
+        with patch.dict(settings.CONFIG, BULK_DL_RATE='1/h'):
+            etag = self.client.get(url, HTTP_RANGE='bytes=0-9')['ETag']
+            # resuming the counted download is not throttled
+            r = self.client.get(
+                url, HTTP_RANGE='bytes=100-', HTTP_IF_RANGE=etag
+            )
+            assert r.status_code == 206
+            # other ranges are throttled
+            assert self.client.get(
+                url, HTTP_RANGE='bytes=1-'
+            ).status_code == 429
+            r = self.client.get(url)
+        assert r.status_code == 429
+        assert int(r['Retry-After']) > 0
@@ -40,8 +40,11 @@ urlpatterns = [
 ]
 
 if settings.CONFIG['ALLOW_DLS']:
-    urlpatterns.append(
-        path(f'{_chapter[:-1]}.cbz', views.chapter_download, name='cbz')
-    )
+    urlpatterns += [
+        path(f'{_chapter[:-1]}.cbz', views.chapter_download, name='cbz'),
+        path(f'{_slug}<int:vol>.cbz', views.volume_download,
+             name='volume.cbz'),
+        path(f'{_slug[:-1]}.cbz', views.series_download, name='series.cbz'),
+    ]
 
 __all__ = ['app_name', 'urlpatterns']
@@ -2,86 +2,177 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from hashlib import blake2b
+from json import dumps, loads
+from typing import TYPE_CHECKING, List, Tuple
 
-from django.core.cache import cache
-from django.db.models import Count, F, Prefetch, Q
-from django.http import FileResponse, Http404
+from django.conf import settings
+from django.db.models import F, Prefetch, Q, prefetch_related_objects
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.urls.exceptions import NoReverseMatch
-from django.utils import timezone as tz
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    content_disposition_header, urlsafe_base64_decode, urlsafe_base64_encode
+)
 from django.views.decorators.cache import cache_control
 from django.views.decorators.http import condition
 
+from rest_framework.throttling import UserRateThrottle
+
 from MangAdventure import jsonld
-from MangAdventure.utils import HttpResponseUnauthorized
+from MangAdventure.etags import make_etag
+from MangAdventure.utils import HttpResponseUnauthorized, parse_range, sendfile
+from MangAdventure.zipstream import ZipStream
 
 from groups.models import Group
 
+from . import lastmod
 from .models import Category, Chapter, Series
+from .navigation import NavigationIndex
 
 if TYPE_CHECKING:  # pragma: no cover
     from datetime import datetime  # isort:skip
-    from typing import Optional, Union  # isort:skip
+    from typing import Optional  # isort:skip
     from django.http import (  # isort:skip
-        HttpRequest, HttpResponse, HttpResponsePermanentRedirect
+        HttpRequest, HttpResponsePermanentRedirect
     )
+    from django.http.response import HttpResponseBase  # isort:skip
+
+
+def _page_index(request: HttpRequest,
+                slug: str) -> Optional[NavigationIndex]:
+    # the conditions & the view share the same index
+    if not hasattr(request, '_navigation'):
+        request._navigation = NavigationIndex.get_cached(slug)
+    return request._navigation
 
 
 def _latest(request: HttpRequest, slug: Optional[str] = None,
             vol: Optional[int] = None, num: Optional[float] = None,
             page: Optional[int] = None) -> Optional[datetime]:
-    try:
-        if slug is None:
-            q = Q(chapters__published__lte=tz.now())
-            return Series.objects.only('modified').alias(
-                chapter_count=Count('chapters', filter=q)
-            ).filter(chapter_count__gt=0).latest().modified
-        if vol is None:
-            return Series.objects.only('modified').filter(
-                chapters__published__lte=tz.now(), slug=slug
-            ).distinct().get().modified
-        return Chapter.objects.only('modified').filter(
-            series__slug=slug, volume=vol or None,
-            number=num, published__lte=tz.now()
-        ).latest().modified
-    except (Series.DoesNotExist, Chapter.DoesNotExist):
+    if slug is None:
+        return lastmod.site_modified()
+    return lastmod.series_modified(slug, vol, num)
+
+
+class _ArchiveThrottle(UserRateThrottle):
+    scope = 'archives'
+
+    def get_rate(self) -> str:
+        return settings.CONFIG['BULK_DL_RATE']
+
+    def _download_key(self, request: HttpRequest, etag: str) -> str:
+        return f'{self.get_cache_key(request, None)}.{etag[1:-1]}'
+
+    def resumes(self, request: HttpRequest, etag: str) -> bool:
+        # only ranges of a download that was already counted are exempt
+        return request.headers.get('If-Range') == etag and \
+            self.cache.get(self._download_key(request, etag)) is not None
+
+    def count(self, request: HttpRequest, etag: str) -> bool:
+        if not self.allow_request(request, None):
+            return False
+        self.cache.set(self._download_key(request, etag), 1, self.duration)
+        return True
+
+
+def _page_etag(request: HttpRequest, slug: str, vol: int,
+               num: float, page: int) -> Optional[str]:
+    if not (index := _page_index(request, slug)):
         return None
+    # the page links to every chapter
+    return make_etag(
+        request.path, request.user.pk,
+        len(index), index.modified, weak=True
+    )
+
 
+def _encode_cursor(series: Series) -> str:
+    data = dumps([series.title, series.id], separators=(',', ':'))
+    return urlsafe_base64_encode(data.encode())
 
-def _cbz_etag(request: HttpRequest, slug: str, vol: int, num: float) -> str:
-    return 'W/"%x"' % (hash(f'{slug}-{vol}-{num}.cbz') & (1 << 64) - 1)
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        title, pk = loads(urlsafe_base64_decode(cursor))
+        return str(title), int(pk)
+    except (ValueError, TypeError):
+        raise Http404('Invalid cursor.')
+
+
+def _latest_chapters(series: List[Series]):
+    limit = settings.CONFIG['MAX_CHAPTERS']
+    if limit > 1:
+        chapters = Chapter.objects.defer(
+            'file', 'views', 'modified'
+        ).filter(released=True).order_by('-published')
+        prefetch_related_objects(series, Prefetch(
+            'chapters', queryset=chapters[:limit], to_attr='latest_chapters'
+        ))
+    else:
+        # the latest chapter is kept in the summary of the series
+        for s in series:
+            if latest := s.stats.last_chapter:
+                latest.series = s
+            s.latest_chapters = [latest] if latest else []
+    prefetch_related_objects(
+        [c for s in series for c in s.latest_chapters],
+        Prefetch('groups', queryset=Group.objects.only('name'))
+    )
 
 
 @condition(last_modified_func=_latest)
 @cache_control(max_age=600, stale_if_error=300, must_revalidate=True)
 def directory(request: HttpRequest) -> HttpResponse:
     """
-    View that serves a page which lists all the series.
+    View that serves a page which lists the series.
+
+    The series are sorted by title and split into pages of
+    :const:`MAX_SERIES <MangAdventure.settings.CONFIG>` series,
+    which are navigated with the ``after`` & ``before`` cursors.
 
     :param request: The original request.
 
-    :return: A response with the rendered ``all_series.html`` template.
+    :return: A response with the rendered ``directory.html`` template.
+
+    :raises Http404: If the cursor is invalid.
     """
-    now = tz.now()
-    chapters = Chapter.objects.defer(
-        'file', 'views', 'modified'
-    ).filter(published__lte=now).order_by('-published')
-    groups = Group.objects.only('name')
-    q = Q(chapters__published__lte=now)
-    series = list(Series.objects.alias(
-        chapter_count=Count('chapters', filter=q)
-    ).filter(chapter_count__gt=0).prefetch_related(
-        Prefetch('chapters', queryset=chapters),
-        Prefetch('chapters__groups', queryset=groups)
-    ).distinct().order_by('title').only(
-        'title', 'slug', 'format', 'cover'
-    ).exclude(licensed=True))
+    size = settings.CONFIG['MAX_SERIES']
+    queryset = Series.objects.filter(
+        licensed=False, stats__chapter_count__gt=0
+    ).select_related('stats__last_chapter').only(
+        'title', 'slug', 'format', 'cover', 'stats__last_chapter__title',
+        'stats__last_chapter__volume', 'stats__last_chapter__number',
+        'stats__last_chapter__final', 'stats__last_chapter__published',
+        'stats__last_chapter__series_id'
+    )
+    if after := request.GET.get('after'):
+        title, pk = _decode_cursor(after)
+        series = list(queryset.filter(
+            Q(title__gt=title) | Q(title=title, id__gt=pk)
+        ).order_by('title', 'id')[:size + 1])
+        has_prev, has_next = True, len(series) > size
+        series = series[:size]
+    elif before := request.GET.get('before'):
+        title, pk = _decode_cursor(before)
+        series = list(queryset.filter(
+            Q(title__lt=title) | Q(title=title, id__lt=pk)
+        ).order_by('-title', '-id')[:size + 1])
+        has_prev, has_next = len(series) > size, True
+        series = series[:size][::-1]
+    else:
+        series = list(queryset.order_by('title', 'id')[:size + 1])
+        has_prev, has_next = False, len(series) > size
+        series = series[:size]
+    _latest_chapters(series)
     uri = request.build_absolute_uri(request.path)
     crumbs = jsonld.breadcrumbs([('Reader', uri)])
     library = jsonld.carousel([s.get_absolute_url() for s in series])
     return render(request, 'directory.html', {
         'all_series': series,
+        'prev_cursor': has_prev and series and _encode_cursor(series[0]),
+        'next_cursor': has_next and series and _encode_cursor(series[-1]),
         'library': library,
         'breadcrumbs': crumbs
     })
@@ -104,7 +195,7 @@ def series(request: HttpRequest, slug: str) -> HttpResponse:
     :raises Http404: If there is no series with the specified ``slug``.
     """
     try:
-        qs = Chapter.objects.filter(published__lte=tz.now()).order_by(
+        qs = Chapter.objects.filter(released=True).order_by(
             'series', F('volume').asc(nulls_last=True), 'number'
         ).reverse().defer('file', 'views', 'modified')
         groups = Group.objects.only('name')
@@ -169,7 +260,7 @@ def series(request: HttpRequest, slug: str) -> HttpResponse:
     })
 
 
-@condition(last_modified_func=_latest)
+@condition(etag_func=_page_etag, last_modified_func=_latest)
 @cache_control(max_age=3600, stale_if_error=1800, must_revalidate=True)
 def chapter_page(request: HttpRequest, slug: str, vol: int,
                  num: float, page: int) -> HttpResponse:
@@ -188,41 +279,13 @@ def chapter_page(request: HttpRequest, slug: str, vol: int,
     """
     if page < 1:
         raise Http404('Page number must be positive')
-    chapters = cache.get_or_set(
-        f'reader.chapters.{slug}',
-        list(Chapter.objects.filter(
-            series__slug=slug,
-            series__licensed=False,
-            published__lte=tz.now()
-        ).select_related('series').only(
-            'title', 'number', 'volume', 'published',
-            'final', 'series__slug', 'series__cover',
-            'series__title', 'series__format'
-        ).order_by(
-            'series', F('volume').asc(nulls_last=True), 'number'
-        ).reverse()),
-        timeout=1800
-    )
-    if not chapters:
+    if not (index := _page_index(request, slug)):
         raise Http404('No chapters for this series')
-    max_, found = len(chapters) - 1, False
-    for idx, current in enumerate(chapters):
-        if current == (vol or float('inf'), num):
-            next_ = chapters[idx - 1] if idx > 0 else None
-            prev_ = chapters[idx + 1] if idx < max_ else None
-            found = True
-            break
-    if not found:
+    if (current := index.get(vol, num)) is None:
         raise Http404('No such chapter')
-    all_pages = list(current.pages.all())
-    try:
-        curr_page = next(p for p in all_pages if p.number == page)
-    except StopIteration as e:  # pragma: no cover
-        raise Http404('No such page') from e
-    prefetch = list(filter(
-        lambda p: curr_page < p < curr_page.number + 3, all_pages
-    ))
-    tags = current.series.categories.values_list('name', flat=True)
+    if (curr_page := current.page(page)) is None:
+        raise Http404('No such page')
+    prefetch = [p for p in current.pages if page < p.number < page + 3]
     url = request.path
     p_url = url.rsplit('/', 4)[0] + '/'
     p2_url = url.rsplit('/', 5)[0] + '/'
@@ -232,15 +295,15 @@ def chapter_page(request: HttpRequest, slug: str, vol: int,
         (current.title, request.build_absolute_uri(url))
     ])
     return render(request, 'chapter.html', {
-        'all_chapters': chapters,
+        'all_chapters': index.chapters,
         'curr_chapter': current,
-        'next_chapter': next_,
-        'prev_chapter': prev_,
-        'all_pages': all_pages,
+        'next_chapter': current.next,
+        'prev_chapter': current.prev,
+        'all_pages': current.pages,
         'curr_page': curr_page,
         'prefetch': prefetch,
         'breadcrumbs': crumbs,
-        'tags': ','.join(tags)
+        'tags': index.series.tags
     })
 
 
@@ -264,12 +327,17 @@ def chapter_redirect(request: HttpRequest, slug: str, vol: int,
         raise Http404 from e
 
 
-@condition(etag_func=_cbz_etag, last_modified_func=_latest)
+@condition(last_modified_func=_latest)
 @cache_control(max_age=3600, must_revalidate=True)
-def chapter_download(request: HttpRequest, slug: str, vol: int, num: float
-                     ) -> Union[FileResponse, HttpResponseUnauthorized]:
+def chapter_download(request: HttpRequest, slug: str,
+                     vol: int, num: float) -> HttpResponseBase:
     """
-    View that generates a ``.cbz`` file from a chapter.
+    View that sends the ``.cbz`` file of a chapter.
+
+    If the file has not been built yet, it's streamed
+    while it's being generated and saved to disk.
+    The bytes of the archive are always the same, so
+    interrupted downloads can be resumed with ranges.
 
     :param request: The original request.
     :param slug: The slug of the chapter's series.
@@ -297,7 +365,7 @@ def chapter_download(request: HttpRequest, slug: str, vol: int, num: float
             Prefetch('series__categories', queryset=categories)
         ).get(
             series__slug=slug, series__licensed=False,
-            volume=vol or None, number=num, published__lte=tz.now()
+            volume=vol or None, number=num, released=True
         )
     except Chapter.DoesNotExist as e:
         raise Http404 from e
@@ -305,13 +373,155 @@ def chapter_download(request: HttpRequest, slug: str, vol: int, num: float
         name = '{0.series} - v{0.volume} c{0.number:g}.cbz'.format(chapter)
     else:
         name = '{0.series} - c{0.number:g}.cbz'.format(chapter)
-    return FileResponse(
-        chapter.zip(), as_attachment=True, filename=name,
-        content_type='application/vnd.comicbook+zip'
-    )
+    ctype = 'application/vnd.comicbook+zip'
+    target, stream = chapter.cbz()
+    # the name of the archive is derived from its contents
+    etag = f'"{target.stem[1:]}"'
+    if response := get_conditional_response(request, etag=etag):
+        response['ETag'] = etag
+        return response
+    if not target.exists():
+        if 'Range' not in request.headers:
+            # send the archive while it's being built
+            response = StreamingHttpResponse(stream.tee(target), ctype)
+            response['Content-Length'] = len(stream)
+            response['Content-Disposition'] = \
+                content_disposition_header(True, name)
+            response['Accept-Ranges'] = 'bytes'
+            response['ETag'] = etag
+            return response
+        # ranges are served from the complete file
+        stream.save(target)
+    return sendfile(request, target, name, ctype, etag)
+
+
+def _bulk_download(request: HttpRequest, slug: str,
+                   vol: Optional[int] = None) -> HttpResponseBase:
+    if not request.user.is_authenticated:
+        return HttpResponseUnauthorized(
+            b'You must be logged in to download this file.',
+            content_type='text/plain', realm='chapter archive'
+        )
+    groups = Group.objects.only('name')
+    categories = Category.objects.only('name')
+    chapters = Chapter.objects.only(
+        'title', 'volume', 'number', 'published',
+        'series__format', 'series__title', 'series__slug'
+    ).select_related('series').prefetch_related(
+        'pages', 'series__authors', 'series__artists',
+        Prefetch('groups', queryset=groups),
+        Prefetch('series__categories', queryset=categories)
+    ).filter(
+        series__slug=slug, series__licensed=False, released=True
+    ).order_by(F('volume').asc(nulls_last=True), 'number')
+    if vol is not None:
+        chapters = chapters.filter(volume=vol or None)
+    if not (all_chapters := list(chapters)):
+        raise Http404
+    members, dgst = [], blake2b(digest_size=16)
+    for chapter in all_chapters:
+        target, stream = chapter.cbz()
+        dgst.update(target.stem.encode())
+        if chapter.volume:
+            folder = 'v{0.volume} c{0.number:g}/'.format(chapter)
+        else:
+            folder = 'c{0.number:g}/'.format(chapter)
+        built = target.exists()
+        for idx, member in enumerate(stream.members):
+            # read the pages from the prebuilt archive if there is one
+            if built and member.data is None:
+                member = member._replace(
+                    path=str(target), offset=stream.locate(idx)
+                )
+            members.append(member._replace(name=folder + member.name))
+    etag = f'"{dgst.hexdigest()}"'
+    if response := get_conditional_response(request, etag=etag):
+        response['ETag'] = etag
+        return response
+    published = max(c.published for c in all_chapters)
+    stream = ZipStream(members, published)
+    size = len(stream)
+    ctype = 'application/vnd.comicbook+zip'
+    ranges = None
+    if (header := request.headers.get('Range')) and \
+            request.headers.get('If-Range', etag) == etag:
+        ranges = parse_range(header, size)
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    # resumed downloads don't count as new ones
+    throttle = _ArchiveThrottle()
+    if not (ranges and throttle.resumes(request, etag)) and \
+            not throttle.count(request, etag):
+        response = HttpResponse(
+            b'Too many downloads. Please try again later.',
+            content_type='text/plain', status=429
+        )
+        response['Retry-After'] = int(throttle.wait() or 1)
+        return response
+    # multiple ranges would have to read the archive repeatedly
+    if ranges and len(ranges) == 1:
+        first, last = ranges[0]
+        response = StreamingHttpResponse(
+            stream.slice(first, last), ctype, 206
+        )
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Length'] = last - first + 1
+    else:
+        response = StreamingHttpResponse(stream, ctype)
+        response['Content-Length'] = size
+    series = all_chapters[0].series
+    name = f'{series} - v{vol}.cbz' if vol else f'{series}.cbz'
+    response['Content-Disposition'] = content_disposition_header(True, name)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
+
+
+@cache_control(max_age=3600, must_revalidate=True)
+def volume_download(request: HttpRequest, slug: str,
+                    vol: int) -> HttpResponseBase:
+    """
+    View that streams a ``.cbz`` file with all the chapters of a volume.
+
+    The pages of the chapters that have prebuilt archives are read from
+    them and every other page is read from its own file, so the archive
+    is generated while it's being sent without any temporary files.
+
+    The downloads are throttled per user according to
+    :const:`BULK_DL_RATE <MangAdventure.settings.CONFIG>`.
+
+    :param request: The original request.
+    :param slug: The slug of the series.
+    :param vol: The volume of the chapters.
+
+    :return: A response with the ``.cbz`` file if the user is logged in.
+
+    :raises Http404: If the volume does not have any chapters.
+    """
+    return _bulk_download(request, slug, vol)
+
+
+@cache_control(max_age=3600, must_revalidate=True)
+def series_download(request: HttpRequest, slug: str) -> HttpResponseBase:
+    """
+    View that streams a ``.cbz`` file with all the chapters of a series.
+
+    Each chapter is put in its own folder.
+    See :func:`volume_download` for details.
+
+    :param request: The original request.
+    :param slug: The slug of the series.
+
+    :return: A response with the ``.cbz`` file if the user is logged in.
+
+    :raises Http404: If the series does not have any chapters.
+    """
+    return _bulk_download(request, slug)
 
 
 __all__ = [
-    'directory', 'series', 'chapter_page',
-    'chapter_redirect', 'chapter_download'
+    'directory', 'series', 'chapter_page', 'chapter_redirect',
+    'chapter_download', 'volume_download', 'series_download'
 ]
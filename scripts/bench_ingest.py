@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark parallel chapter extraction.
+
+Measures the throughput of :func:`reader.ingest.extract`
+with a different number of :const:`INGEST_PROCESSES
+<MangAdventure.settings.CONFIG>` for the same archive.
+
+Usage: ``python scripts/bench_ingest.py [--workers 0 2 4 8]``
+"""
+
+from argparse import ArgumentParser
+from os import cpu_count
+from pathlib import Path
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from bench_unzip import _make_archive, _setup
+
+
+def _bench(archive: Path, dest: Path, workers: int, rounds: int) -> float:
+    from django.conf import settings
+    from django.core.files import File
+
+    from reader import ingest
+
+    settings.CONFIG['INGEST_PROCESSES'] = workers
+    # start the worker processes before measuring
+    ingest._reset_pool()
+    if (pool := ingest._get_pool()) is not None:
+        list(pool.map(abs, range(workers)))
+    best = float('inf')
+    for _ in range(rounds):
+        with open(archive, 'rb') as f:
+            start = perf_counter()
+            ingest.extract(File(f), dest)
+            best = min(best, perf_counter() - start)
+        rmtree(dest)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--workers', type=int, nargs='+',
+        default=sorted({0, 2, 4, cpu_count() or 1})
+    )
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1200)
+    parser.add_argument('--height', type=int, default=1800)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    _setup()
+    print(f'{"workers":>7} {"time (s)":>10} {"pages/s":>10} {"speedup":>8}')
+    with TemporaryDirectory() as tmp:
+        archive = _make_archive(Path(tmp), args.pages, args.width, args.height)
+        baseline = None
+        for workers in args.workers:
+            elapsed = _bench(archive, Path(tmp, 'out'), workers, args.rounds)
+            baseline = baseline or elapsed
+            print(f'{workers:>7} {elapsed:>10.3f} '
+                  f'{args.pages / elapsed:>10.1f} {baseline / elapsed:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
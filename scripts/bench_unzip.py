@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark chapter extraction.
+
+Compares the peak RSS and wall time of the single-pass
+extraction in :func:`reader.ingest.extract` against the
+previous implementation which validated the archive and
+then extracted it, reading every page in memory each time.
+
+Usage: ``python scripts/bench_unzip.py [--pages 50 100 500]``
+"""
+
+from argparse import ArgumentParser
+from hashlib import blake2b
+from multiprocessing import get_context
+from os import environ, path
+from pathlib import Path
+from resource import RUSAGE_SELF, getrusage
+from sys import path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from zipfile import ZipFile
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _setup():
+    sys_path.insert(0, str(ROOT))
+    environ.setdefault(
+        'DJANGO_SETTINGS_MODULE', 'MangAdventure.tests.settings'
+    )
+    __import__('django').setup()
+
+
+def _legacy(archive: Path, dest: Path) -> int:
+    from io import BytesIO
+
+    from PIL import Image
+
+    from MangAdventure.utils import natsort
+    counter = 0
+    with ZipFile(archive) as zf:
+        for name in zf.namelist():
+            if not zf.getinfo(name).is_dir():
+                Image.open(BytesIO(zf.read(name))).verify()
+    with ZipFile(archive) as zf:
+        for name in natsort(zf.namelist()):
+            if zf.getinfo(name).is_dir():
+                continue
+            counter += 1
+            data = zf.read(name)
+            dgst = blake2b(data, digest_size=16).hexdigest()
+            (dest / (dgst + path.splitext(name)[-1])).write_bytes(data)
+    return counter
+
+
+def _streaming(archive: Path, dest: Path) -> int:
+    from django.core.files import File
+
+    from reader.ingest import extract
+    with open(archive, 'rb') as f:
+        return len(extract(File(f), dest))
+
+
+def _run(impl: str, archive: str, dest: str, queue):
+    _setup()
+    func = _legacy if impl == 'legacy' else _streaming
+    base = getrusage(RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+    func(Path(archive), Path(dest))
+    elapsed = perf_counter() - start
+    queue.put((elapsed, getrusage(RUSAGE_SELF).ru_maxrss - base))
+
+
+def _make_archive(dest: Path, pages: int, width: int, height: int) -> Path:
+    from os import urandom
+
+    from PIL import Image
+
+    archive = dest / f'{pages}.cbz'
+    with ZipFile(archive, 'w') as zf:
+        zf.writestr('chapter/', '')
+        for i in range(1, pages + 1):
+            img = Image.frombytes('RGB', (width, height), urandom(
+                width * height * 3
+            ))
+            with zf.open(f'chapter/{i}.png', 'w') as f:
+                img.save(f, 'PNG', compress_level=1)
+    return archive
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 100, 500])
+    parser.add_argument('--width', type=int, default=1200)
+    parser.add_argument('--height', type=int, default=1800)
+    args = parser.parse_args()
+    ctx = get_context('spawn')
+    print(f'{"pages":>6} {"impl":>10} {"time (s)":>10} {"peak RSS (KiB)":>15}')
+    with TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            archive = _make_archive(Path(tmp), pages, args.width, args.height)
+            for impl in ('legacy', 'streaming'):
+                dest = Path(tmp, f'{pages}-{impl}')
+                dest.mkdir()
+                queue = ctx.Queue()
+                proc = ctx.Process(
+                    target=_run, args=(impl, str(archive), str(dest), queue)
+                )
+                proc.start()
+                elapsed, rss = queue.get()
+                proc.join()
+                print(f'{pages:>6} {impl:>10} {elapsed:>10.3f} {rss:>15}')
+            archive.unlink()
+
+
+if __name__ == '__main__':
+    main()
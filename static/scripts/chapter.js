@@ -2,7 +2,7 @@
   const changePage = (rel) =>
     document.querySelector(`.control[rel="${rel}"]`).href;
 
-  const img = ph.nextElementSibling;
+  const img = document.getElementById('page-image');
 
   if (img.complete) ph.remove();
   else img.addEventListener('load', () => ph.remove(), true);
@@ -8,7 +8,6 @@ from django.conf import settings
 from django.contrib.syndication.views import Feed
 from django.db.models import Subquery
 from django.http import HttpResponse
-from django.utils import timezone as tz
 from django.utils.cache import patch_vary_headers
 from django.utils.decorators import method_decorator
 from django.utils.feedgenerator import Atom1Feed
@@ -98,7 +97,7 @@ class BookmarksRSS(Feed):
             'published', 'modified', 'series__slug',
             'series__title', 'series__format'
         ).select_related('series').filter(
-            published__lte=tz.now(),
+            released=True,
             series__licensed=False,
             series_id__in=Subquery(
                 Bookmark.objects.filter(